@@ -0,0 +1,296 @@
+import asyncio
+from collections.abc import AsyncIterator
+import copy
+import getpass
+
+import aiohttp
+from cache import ResponseCache, normalize_url
+from objcache import ObjectCache
+import eas
+import json_backend
+from ratelimit import RateLimitScheduler, endpoint_key, token_key
+from retry import RetryPolicy
+from singleflight import AsyncSingleFlight
+from client import add_cached_objects, build_url, cached_objects, chunk_ids, page_params, raise_for_status, response_data, stored_lookups
+from query import PreparedQuery, prepare
+from store import LookupStore
+from objects.expansions import ArgExpansions
+from objects.fields import ArgFields
+from objects.resp_data import ResponseData, merge_response_dicts, order_by_ids, select_ids
+from objects.tweet import Tweet
+from objects.user import User
+
+
+async def prefetched[T](pages: AsyncIterator[T], prefetch: int) -> AsyncIterator[T]:
+    """
+    Runs an async iterator of pages in a task, ahead of the caller
+
+    Args:
+        pages: Async iterator fetching a page each time it is advanced
+        prefetch: Most pages fetched, or being fetched, that the caller hasn't taken yet
+
+    Returns:
+        Async iterator over the same pages; errors raised by pages are raised to the caller
+    """
+    buffer: asyncio.Queue = asyncio.Queue()
+    # A slot is taken before a page is fetched and given back when the caller takes the page
+    slots = asyncio.Semaphore(prefetch)
+    done = object()
+
+    async def produce() -> None:
+        try:
+            while True:
+                await slots.acquire()
+                page = await anext(pages, done)
+                if page is done:
+                    break
+                buffer.put_nowait(page)
+        except Exception as error:
+            buffer.put_nowait(error)
+        buffer.put_nowait(done)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            page = await buffer.get()
+            if page is done:
+                return
+            if isinstance(page, Exception):
+                raise page
+            slots.release()
+            yield page
+    finally:
+        producer.cancel()
+
+
+class AsyncClient:
+    def __init__(self, file_path: str, input_password: bool, *, max_concurrency: int = 100, pool_maxsize: int = 100, keep_alive: bool = True, timeout: float | None = 30, rate_limits: RateLimitScheduler = None, retry: RetryPolicy = None, response_cache: ResponseCache = None, store: LookupStore = None, object_cache: ObjectCache = None):
+        if input_password:
+            password = getpass.getpass("Enter password: ")
+        token = eas.decrypt_from_file(file_path, bytes.fromhex(password))
+        self.__bearer_token__ = token
+        self.__token_key__ = token_key(token)
+        # Pass the same scheduler to clients sharing a token so they share its limits
+        self.__rate_limits__ = rate_limits or RateLimitScheduler()
+        self.__retry__ = retry or RetryPolicy()
+        self.__cache__ = response_cache
+        self.__store__ = store
+        self.__object_cache__ = object_cache
+        # Identical requests, and lookups of the same ids, made concurrently share one API call
+        self.__flights__ = AsyncSingleFlight()
+        self.__id_flights__ = AsyncSingleFlight()
+        self.__timeout__ = aiohttp.ClientTimeout(total=timeout)
+        self.__pool_maxsize__ = pool_maxsize
+        self.__keep_alive__ = keep_alive
+        # Global limit on requests in flight, shared by every coroutine using this client
+        self.__semaphore__ = asyncio.Semaphore(max_concurrency)
+        # aiohttp sessions must be created inside a running event loop
+        self.__session__: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> 'AsyncClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Closes every pooled connection; the client must not be used afterwards"""
+        if self.__session__ is not None:
+            await self.__session__.close()
+            self.__session__ = None
+
+    def __headers__(self):
+        return {
+            "Authorization": f"Bearer {self.__bearer_token__}"
+        }
+
+    def __get_session__(self) -> aiohttp.ClientSession:
+        if self.__session__ is None:
+            connector = aiohttp.TCPConnector(limit=self.__pool_maxsize__, force_close=not self.__keep_alive__)
+            self.__session__ = aiohttp.ClientSession(connector=connector, timeout=self.__timeout__)
+        return self.__session__
+
+    def flight_stats(self) -> dict[str, dict[str, int]]:
+        """Returns hit/miss counters of request coalescing, for whole requests and for lookup ids"""
+        return {
+            "requests": self.__flights__.stats(),
+            "ids": self.__id_flights__.stats()
+        }
+
+    async def __send_once__(self, url: str, headers: dict) -> tuple[int, dict, bytes]:
+        # Conditional requests only coalesce with requests carrying the same validators
+        key = (normalize_url(url), headers.get("If-None-Match"), headers.get("If-Modified-Since"))
+        return await self.__flights__.do(key, lambda: self.__send__(url, headers))
+
+    async def __send__(self, url: str, headers: dict) -> tuple[int, dict, bytes]:
+        endpoint = endpoint_key(url)
+        budget = self.__retry__.budget()
+        while True:
+            # Wait outside the semaphore so queued requests don't hold concurrency slots
+            delay = self.__rate_limits__.reserve(self.__token_key__, endpoint)
+            if delay > 0:
+                if not budget.allows(delay):
+                    self.__rate_limits__.release(self.__token_key__, endpoint)
+                    raise TimeoutError(f"Rate limit of {endpoint} resets after the call deadline")
+                await asyncio.sleep(delay)
+            try:
+                async with self.__semaphore__:
+                    # An attempt may not run past the call deadline
+                    timeout = aiohttp.ClientTimeout(total=budget.timeout(self.__timeout__.total))
+                    async with self.__get_session__().get(url, headers=headers, timeout=timeout) as response:
+                        self.__rate_limits__.update(self.__token_key__, endpoint, response.headers)
+                        status_code = response.status
+                        if status_code in (200, 304):
+                            return status_code, response.headers, await response.read()
+                        # A 429 also marks the window exhausted, so the next attempt waits for its reset
+                        delay = budget.next_delay(status_code, response.headers)
+                        if delay is None:
+                            raise_for_status(status_code, response.headers)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = budget.next_delay(None)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+
+    async def __fetch__(self, url: str) -> dict | None:
+        cache = self.__cache__
+        headers = self.__headers__()
+        if cache is None:
+            status_code, _, body = await self.__send_once__(url, headers)
+            return json_backend.loads(body) if status_code == 200 else None
+        entry = cache.get(url)
+        if entry is not None:
+            if cache.is_fresh(entry):
+                return json_backend.loads(entry.body)
+            headers.update(entry.validators())
+        status_code, response_headers, body = await self.__send_once__(url, headers)
+        if status_code == 304:
+            if entry is None:
+                return None
+            cache.refresh(url)
+            return json_backend.loads(entry.body)
+        cache.put(url, body, response_headers)
+        return json_backend.loads(body)
+
+    async def get[D](self, path: str, ids: list[str] = None, fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, other_params: dict = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[D]:
+        url = build_url(path, ids, fields, expansions, other_params)
+        return response_data(await self.__fetch__(url), path, raw, fields, lazy, int_ids, expansions)
+
+    async def __lookup__[D](self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[D]:
+        cache = self.__object_cache__
+        query = prepare(fields, expansions)
+        if cache is None or raw or path not in stored_lookups or query.expansions:
+            return response_data(await self.__lookup_body__(path, ids, fields, expansions), path, raw, fields, lazy, int_ids, expansions)
+        ids = list(dict.fromkeys(map(str, ids)))
+        spec = (path, query.fragment, lazy, int_ids)
+        ttl = cache.lifetime(value.value for value in query.field_values(stored_lookups[path]))
+        found = cached_objects(cache, spec, ids)
+        missing = [item_id for item_id in ids if item_id not in found]
+        body = await self.__lookup_body__(path, missing, fields, expansions) if missing else None
+        return add_cached_objects(response_data(body, path, raw, fields, lazy, int_ids, expansions), found, ids, cache, spec, ttl)
+
+    async def __lookup_body__(self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None) -> dict | None:
+        # Ids may be ints, e.g. from int_ids responses, the bodies always hold strings
+        ids = list(dict.fromkeys(map(str, ids)))
+        store = self.__store__
+        query = prepare(fields, expansions)
+        if store is None or path not in stored_lookups or query.expansions:
+            return await self.__lookup_flights__(path, ids, fields, expansions)
+        requested = [value.value for value in query.field_values(stored_lookups[path])]
+        # SQLite may wait on another process's write, so it runs off the event loop
+        found = await asyncio.to_thread(store.get, path, requested, ids)
+        missing = [item_id for item_id in ids if item_id not in found]
+        page = await self.__lookup_flights__(path, missing, fields, expansions) if missing else None
+        if page is not None:
+            await asyncio.to_thread(store.put, path, requested, page.get('data') or [])
+        stored = {'data': list(found.values())} if found else None
+        return order_by_ids(merge_response_dicts([stored, page]), ids)
+
+    async def __lookup_flights__(self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None) -> dict | None:
+        # Ids are only shared between lookups asking for the same fields and expansions
+        spec = build_url(path, None, fields, expansions)
+        task, joined = self.__id_flights__.claim(
+            [(spec, item_id) for item_id in ids],
+            lambda keys: self.__lookup_pages__(path, [item_id for _, item_id in keys], fields, expansions)
+        )
+        # Group the joined ids by the call that answers them
+        shared: dict[asyncio.Future, set[str]] = {}
+        for (_, item_id), future in joined.items():
+            shared.setdefault(future, set()).add(item_id)
+        # Wait for every call at once, so each stays needed until this caller has its result
+        results = await self.__id_flights__.wait(([task] if task is not None else []) + list(shared))
+        pages = [results.pop(0)] if task is not None else []
+        for page, page_ids in zip(results, shared.values()):
+            # Other callers decode the shared body too, so take a private copy
+            pages.append(copy.deepcopy(select_ids(page, page_ids)))
+        return order_by_ids(merge_response_dicts(pages), ids)
+
+    async def __lookup_pages__(self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None) -> dict | None:
+        url_length = len(build_url(path, None, fields, expansions))
+        urls = [build_url(path, chunk, fields, expansions) for chunk in chunk_ids(ids, url_length)]
+        pages = await asyncio.gather(*[self.__fetch__(url) for url in urls])
+        return merge_response_dicts(pages)
+
+    async def lookup_tweets(self, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[list[Tweet]]:
+        return await self.__lookup__("tweets", ids, fields, expansions, raw=raw, lazy=lazy, int_ids=int_ids)
+
+    async def lookup_users(self, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[list[User]]:
+        return await self.__lookup__("users", ids, fields, expansions, raw=raw, lazy=lazy, int_ids=int_ids)
+
+    async def paginate[D](self, path: str, fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, other_params: dict = None, *, items: bool = False, prefetch: int = 1, max_pages: int = None, max_items: int = None, token_param: str = "pagination_token", raw: bool = False, lazy: bool = False, int_ids: bool = False) -> AsyncIterator[ResponseData[D]]:
+        """
+        Follows meta.next_token across pages, fetching ahead of the caller
+
+        Takes the same arguments as Client.paginate.
+
+        Returns:
+            Async iterator over ResponseData pages, or over data items when items is True
+        """
+        pages = self.__pages__(path, fields, expansions, other_params, max_pages, max_items, token_param, raw, lazy, int_ids)
+        if prefetch > 0:
+            pages = prefetched(pages, prefetch)
+        yielded = 0
+        async for page in pages:
+            if not items:
+                yield page
+                continue
+            for item in page.data or []:
+                if max_items is not None and yielded >= max_items:
+                    return
+                yield item
+                yielded += 1
+
+    async def __pages__[D](self, path: str, fields: ArgFields | PreparedQuery, expansions: ArgExpansions, other_params: dict | None, max_pages: int | None, max_items: int | None, token_param: str, raw: bool, lazy: bool, int_ids: bool) -> AsyncIterator[ResponseData[D]]:
+        """Fetches each page when it is asked for, following meta.next_token"""
+        token = None
+        page_count = 0
+        item_count = 0
+        while True:
+            url = build_url(path, None, fields, expansions, page_params(other_params, token_param, token))
+            page = response_data(await self.__fetch__(url), path, raw, fields, lazy, int_ids, expansions)
+            yield page
+            page_count += 1
+            item_count += len(page.data) if isinstance(page.data, list) else 0
+            token = page.meta.next_token if page.meta else None
+            if token is None:
+                return
+            if max_pages is not None and page_count >= max_pages:
+                return
+            if max_items is not None and item_count >= max_items:
+                return
+
+if __name__ == "__main__":
+    import os
+    home_dir = os.path.expanduser("~")
+    token_path = os.path.join(home_dir, "pyxdk_test",  "bearer_token.pvt")
+
+    async def main():
+        async with AsyncClient(token_path, True) as client:
+            res = await client.lookup_tweets(
+                ids=["1460323737035677698",
+                "1519781379172495360",
+                "1519781381693353984"],
+            )
+        print(res)
+
+    asyncio.run(main())
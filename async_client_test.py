@@ -0,0 +1,325 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+import aiohttp
+import async_client
+from async_client import AsyncClient, prefetched
+from client import ApiError
+from fake_api import FakeAiohttpSession, FakeApi, new_client, timeline, tweet
+from objects.expansions import TweetPayloadExpansion
+from objects.fields import Field, TweetField
+from objects.tweet import Tweet
+from objects.user import User
+from retry import RetryPolicy
+
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = FakeApi()
+        # The client's own __send__ runs, against a fake aiohttp session
+        self.client = new_client(AsyncClient, retry=RetryPolicy(network_retries=1, base_delay=0.0))
+        self.session = FakeAiohttpSession(self.api)
+        self.client.__session__ = self.session
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_get(self):
+        self.api.item = lambda path, item_id, query: tweet(item_id, lang='en')
+        response = await self.client.get('tweets', ids=['1', '2'], fields={Field.TWEET: [TweetField.LANG]}, other_params={'max_results': 10})
+        self.assertEqual(self.api.urls, ['https://api.x.com/2/tweets?ids=1,2&tweet.fields=lang&max_results=10'])
+        self.assertEqual(self.api.requests[0][1]['Authorization'], 'Bearer token')
+        self.assertTrue(all(type(tweet) is Tweet for tweet in response.data))
+        self.assertEqual([tweet.lang for tweet in response.data], ['en', 'en'])
+
+    async def test_raw(self):
+        response = await self.client.get('tweets', ids=['1'], raw=True)
+        self.assertEqual(response.data, [{'id': '1', 'text': 'tweet 1', 'edit_history_tweet_ids': ['1']}])
+
+    async def test_lookups(self):
+        tweets = await self.client.lookup_tweets(['3', '1', 2])
+        self.assertEqual([tweet.id for tweet in tweets.data], ['3', '1', '2'])
+        users = await self.client.lookup_users(['2244994945'])
+        self.assertIs(type(users.data[0]), User)
+        self.assertEqual(users.data[0].username, 'user2244994945')
+        self.assertEqual(self.api.urls[-1], 'https://api.x.com/2/users?ids=2244994945')
+
+    async def test_expansions_only(self):
+        self.api.item = lambda path, item_id, query: tweet(item_id, author_id='2244994945')
+        response = await self.client.lookup_tweets(['1'], expansions=[TweetPayloadExpansion.AUTHOR_ID])
+        self.assertEqual(response.data[0].author_id, '2244994945')
+        self.assertIsNone(response.data[0].created_at)
+
+    async def test_partial_errors(self):
+        self.api.missing = {'404'}
+        response = await self.client.lookup_tweets(['1', '404'])
+        self.assertEqual([tweet.id for tweet in response.data], ['1'])
+        self.assertEqual(response.errors[0].resource_id, '404')
+
+    async def test_error_statuses_raise_api_errors(self):
+        self.api.responses = [(404, {'x-request-id': 'abc'}, b''), (401, {}, b'')]
+        with self.assertRaises(ApiError) as raised:
+            await self.client.get('tweets', ids=['1'])
+        self.assertEqual(raised.exception.status_code, 404)
+        self.assertEqual(raised.exception.headers['X-Request-Id'], 'abc')
+        self.assertIsInstance(raised.exception, ValueError)
+        with self.assertRaises(ApiError) as raised:
+            await self.client.lookup_tweets(['1'])
+        self.assertEqual(str(raised.exception), '401 - Unauthorized - Authentication failed')
+        self.assertEqual(len(self.api.requests), 2)
+
+    async def test_network_errors(self):
+        self.api.responses = [aiohttp.ClientConnectionError(), aiohttp.ClientConnectionError()]
+        with self.assertRaises(aiohttp.ClientConnectionError):
+            await self.client.get('tweets', ids=['1'])
+        # One retry, then the error reaches the caller
+        self.assertEqual(len(self.api.requests), 2)
+        self.api.responses = [aiohttp.ClientConnectionError()]
+        self.assertEqual((await self.client.get('tweets', ids=['1'])).data[0].id, '1')
+
+    async def test_retry_after_is_honored(self):
+        delays = []
+        sleep = asyncio.sleep
+        async def record(delay):
+            delays.append(delay)
+            await sleep(0)
+        self.api.responses = [(429, {'retry-after': '7'}, b''), (503, {'Retry-After': '3'}, b'')]
+        with mock.patch.object(async_client.asyncio, 'sleep', record):
+            response = await self.client.lookup_tweets(['1'])
+        self.assertEqual(response.data[0].id, '1')
+        self.assertEqual(len(self.api.requests), 3)
+        self.assertEqual(delays, [7.0, 3.0])
+
+    async def test_retries_run_out(self):
+        self.client.__retry__ = RetryPolicy(status_retries={503: 2}, base_delay=0.0)
+        self.api.responses = [(503, {}, b'')] * 3
+        with self.assertRaises(ApiError) as raised:
+            await self.client.get('tweets', ids=['1'])
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertEqual(len(self.api.requests), 3)
+        # Waiting out a Retry-After past the deadline gives up at once
+        self.client.__retry__ = RetryPolicy(base_delay=0.0, deadline=5)
+        self.api.responses = [(429, {'retry-after': '60'}, b'')]
+        with self.assertRaises(ApiError) as raised:
+            await self.client.get('tweets', ids=['2'])
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertEqual(len(self.api.requests), 4)
+        self.assertLessEqual(self.session.timeouts[-1].total, 5)
+
+    async def test_not_modified(self):
+        self.api.responses = [(304, {}, b'')]
+        response = await self.client.get('tweets', ids=['1'])
+        self.assertIsNone(response.data)
+
+    async def test_max_concurrency(self):
+        client = new_client(AsyncClient, max_concurrency=2)
+        session = client.__session__ = FakeAiohttpSession(FakeApi(delay=0.02))
+        await asyncio.gather(*[client.get('tweets', ids=[str(item_id)]) for item_id in range(6)])
+        await client.close()
+        self.assertEqual(len(session.api.requests), 6)
+        self.assertEqual(session.max_in_flight, 2)
+
+    async def test_session_lifecycle(self):
+        client = new_client(AsyncClient)
+        # The session is only created once the client is used inside the event loop
+        self.assertIsNone(client.__session__)
+        session = client.__get_session__()
+        self.assertIsInstance(session, aiohttp.ClientSession)
+        self.assertIs(client.__get_session__(), session)
+        await client.close()
+        self.assertTrue(session.closed)
+        self.assertIsNone(client.__session__)
+        # Closing again does nothing, and a context manager closes on exit
+        await client.close()
+        async with new_client(AsyncClient) as client:
+            session = client.__get_session__()
+        self.assertTrue(session.closed)
+
+    async def test_close_closes_the_session(self):
+        await self.client.close()
+        self.assertTrue(self.session.closed)
+
+class TestAsyncPrefetched(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.fetched = 0
+
+    async def pages(self, count: int, error: Exception = None):
+        for page in range(count):
+            self.fetched += 1
+            await asyncio.sleep(0)
+            yield page
+        if error is not None:
+            raise error
+
+    async def test_prefetch_depth(self):
+        pages = prefetched(self.pages(10), 2)
+        self.assertEqual(await anext(pages), 0)
+        # The producer runs two pages ahead of the caller, and no further
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.fetched, 3)
+        self.assertEqual(await anext(pages), 1)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.fetched, 4)
+        self.assertEqual([page async for page in pages], list(range(2, 10)))
+
+    async def test_errors_reach_the_caller(self):
+        pages = prefetched(self.pages(2, ApiError(503)), 1)
+        self.assertEqual([await anext(pages), await anext(pages)], [0, 1])
+        with self.assertRaises(ApiError) as raised:
+            await anext(pages)
+        self.assertEqual(raised.exception.status_code, 503)
+
+    async def test_close_stops_the_producer(self):
+        tasks = asyncio.all_tasks()
+        pages = prefetched(self.pages(100), 1)
+        async for page in pages:
+            break
+        producers = asyncio.all_tasks() - tasks
+        self.assertEqual(len(producers), 1)
+        await pages.aclose()
+        await asyncio.sleep(0)
+        self.assertTrue(all(producer.done() for producer in producers))
+        self.assertLessEqual(self.fetched, 2)
+
+class TestAsyncPaginate(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.api = FakeApi()
+        self.api.body = timeline(4)
+        self.client = new_client(AsyncClient, self.api)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_follows_next_token(self):
+        for prefetch in (0, 1, 3):
+            with self.subTest(prefetch):
+                pages = [page async for page in self.client.paginate('users/1/tweets', prefetch=prefetch)]
+                self.assertEqual([[item.id for item in page.data] for page in pages], [[str(index) for index in range(start, start + 3)] for start in (0, 3, 6, 9)])
+        self.assertEqual(self.api.urls[-1], 'https://api.x.com/2/users/1/tweets?pagination_token=3')
+
+    async def test_max_pages(self):
+        pages = [page async for page in self.client.paginate('users/1/tweets', max_pages=2, prefetch=3)]
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(len(self.api.urls), 2)
+
+    async def test_max_items(self):
+        pages = [page async for page in self.client.paginate('users/1/tweets', max_items=4)]
+        self.assertEqual(len(pages), 2)
+        items = [item async for item in self.client.paginate('users/1/tweets', items=True, max_items=4)]
+        self.assertEqual([item.id for item in items], ['0', '1', '2', '3'])
+        self.assertEqual(len(self.api.urls), 4)
+
+    async def test_items(self):
+        items = [item async for item in self.client.paginate('users/1/tweets', items=True)]
+        self.assertEqual([item.id for item in items], [str(index) for index in range(12)])
+
+    async def test_errors_reach_the_caller(self):
+        self.api.responses = [(200, {}, json.dumps(timeline(4)('')).encode()), ApiError(403)]
+        pages = self.client.paginate('users/1/tweets')
+        self.assertEqual(len((await anext(pages)).data), 3)
+        with self.assertRaises(ApiError) as raised:
+            await anext(pages)
+        self.assertEqual(raised.exception.status_code, 403)
+
+    async def test_early_close(self):
+        tasks = asyncio.all_tasks()
+        pages = self.client.paginate('users/1/tweets', prefetch=1)
+        await anext(pages)
+        await pages.aclose()
+        await asyncio.sleep(0.05)
+        # The producer task is gone and stopped at the page it had prefetched
+        self.assertEqual(asyncio.all_tasks() - tasks, set())
+        self.assertLessEqual(len(self.api.urls), 2)
+
+class TestAsyncCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Requests stay in flight long enough for the other callers to arrive
+        self.api = FakeApi(delay=0.05)
+        self.client = new_client(AsyncClient, self.api)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    @property
+    def sent(self) -> list[str]:
+        return self.api.urls
+
+    async def test_identical_gets_share_one_call(self):
+        responses = await asyncio.gather(*[self.client.get('tweets', ids=['1', '2']) for _ in range(5)])
+        self.assertEqual(len(self.sent), 1)
+        for response in responses:
+            self.assertEqual([tweet.id for tweet in response.data], ['1', '2'])
+        # Every caller gets its own objects
+        self.assertIsNot(responses[0].data[0], responses[1].data[0])
+        self.assertEqual(self.client.flight_stats()['requests'], {'hits': 4, 'misses': 1, 'in_flight': 0})
+
+    async def test_different_gets_are_not_coalesced(self):
+        await asyncio.gather(self.client.get('tweets', ids=['1']), self.client.get('tweets', ids=['2']))
+        self.assertEqual(len(self.sent), 2)
+        # Calls made one after the other aren't shared either
+        await self.client.get('tweets', ids=['1'])
+        self.assertEqual(len(self.sent), 3)
+
+    async def test_lookups_share_ids_in_flight(self):
+        first, second = await asyncio.gather(
+            self.client.lookup_tweets(['1', '2']),
+            self.client.lookup_tweets(['3', '2', '1'])
+        )
+        self.assertEqual(sorted(self.sent), sorted([
+            'https://api.x.com/2/tweets?ids=1,2',
+            'https://api.x.com/2/tweets?ids=3'
+        ]))
+        self.assertEqual([tweet.id for tweet in first.data], ['1', '2'])
+        self.assertEqual([tweet.id for tweet in second.data], ['3', '2', '1'])
+        self.assertEqual(self.client.flight_stats()['ids'], {'hits': 2, 'misses': 3, 'in_flight': 0})
+
+    async def test_errors_reach_every_caller(self):
+        self.api.responses = [ConnectionError('down')]
+        results = await asyncio.gather(*[self.client.get('tweets', ids=['1']) for _ in range(3)], return_exceptions=True)
+        self.assertEqual(len(self.sent), 1)
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+        self.assertEqual(self.client.flight_stats()['requests']['in_flight'], 0)
+
+    async def test_cancelled_joiner_leaves_the_call_running(self):
+        leader = asyncio.create_task(self.client.get('tweets', ids=['1']))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(self.client.get('tweets', ids=['1']))
+        await asyncio.sleep(0)
+        joiner.cancel()
+        self.assertEqual([tweet.id for tweet in (await leader).data], ['1'])
+        self.assertTrue(joiner.cancelled())
+
+    async def test_cancelled_leader_leaves_the_call_running(self):
+        leader = asyncio.create_task(asyncio.wait_for(self.client.get('tweets', ids=['1']), 0.01))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(self.client.get('tweets', ids=['1']))
+        with self.assertRaises(asyncio.TimeoutError):
+            await leader
+        self.assertEqual([tweet.id for tweet in (await joiner).data], ['1'])
+        self.assertEqual(len(self.sent), 1)
+
+    async def test_cancelled_lookup_leader_leaves_the_call_running(self):
+        leader = asyncio.create_task(self.client.lookup_tweets(['1', '2']))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(self.client.lookup_tweets(['2', '3']))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        response = await joiner
+        self.assertEqual([tweet.id for tweet in response.data], ['2', '3'])
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(sorted(self.sent), ['https://api.x.com/2/tweets?ids=1,2', 'https://api.x.com/2/tweets?ids=3'])
+        self.assertEqual(self.client.flight_stats()['ids']['in_flight'], 0)
+
+    async def test_call_without_callers_is_cancelled(self):
+        caller = asyncio.create_task(self.client.get('tweets', ids=['1']))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await asyncio.sleep(0.1)
+        # The request was abandoned before it was sent, and a new caller starts its own
+        self.assertEqual(self.sent, [])
+        self.assertEqual(self.client.flight_stats()['requests']['in_flight'], 0)
+        await self.client.get('tweets', ids=['1'])
+        self.assertEqual(len(self.sent), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from client import Client, max_ids_per_request
+from query import PreparedQuery, prepare
+from objects.decoders import field_decoder
+from objects.errors import Errors
+from objects.expansions import ArgExpansions
+from objects.fields import ArgFields
+from objects.resp_data import data_model, error_resource_id
+
+
+class LookupItemError(LookupError):
+    """Raised for one id of a batched lookup that the API answered with a partial error"""
+
+    def __init__(self, id: str, error: Errors | None):
+        self.id = id
+        self.error = error
+        detail = error.detail or error.title if error else "No data or error returned"
+        super().__init__(f"{id} - {detail}")
+
+
+class LookupBatcher:
+    """
+    Collects single-id lookups from many callers into shared ids= calls
+
+    A batch is sent once window seconds have passed since its first id arrived,
+    or as soon as max_batch ids are waiting. Up to max_in_flight batches are sent
+    at once; while they all are, ids keep collecting into the next batch. Each caller's future resolves to its
+    own decoded object, or fails with its own LookupItemError. Futures are
+    concurrent.futures.Future, so async code can await them with asyncio.wrap_future.
+    Objects are decoded into the model of path, reading the requested fields,
+    unless another decode function is given; endpoints without a model give raw dicts.
+    """
+
+    def __init__(self, client: Client, path: str = "tweets", fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, window: float = 0.005, max_batch: int = max_ids_per_request, max_in_flight: int = 4, decode: Callable[[dict], object] = None):
+        self.__client__ = client
+        self.__path__ = path
+        self.__fields__ = fields
+        self.__expansions__ = expansions
+        self.__window__ = window
+        self.__max_batch__ = max_batch
+        model = data_model(path)
+        if decode is None and model is not None:
+            query = prepare(fields, expansions)
+            decode = field_decoder(model, dict(query.fields), expansions=query.expansions)
+        self.__decode__ = decode
+        # Ids in arrival order, each with the futures of every caller waiting for it
+        self.__pending__: dict[str, list[Future]] = {}
+        self.__condition__ = threading.Condition()
+        self.__closed__ = False
+        # A slot is taken before a batch is collected and given back once it was answered
+        self.__slots__ = threading.Semaphore(max_in_flight)
+        self.__executor__ = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"batch {path}")
+        self.__thread__ = threading.Thread(target=self.__run__, name=f"batch {path}", daemon=True)
+        self.__thread__.start()
+
+    def __enter__(self) -> 'LookupBatcher':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Sends the ids still waiting and stops the batching thread"""
+        with self.__condition__:
+            self.__closed__ = True
+            self.__condition__.notify()
+        self.__thread__.join()
+        self.__executor__.shutdown()
+
+    def submit(self, id: str | int) -> Future:
+        """Queues one id, a string or an int, and returns a future of its decoded object"""
+        id = str(id)
+        future = Future()
+        with self.__condition__:
+            if self.__closed__:
+                raise RuntimeError("LookupBatcher is closed")
+            self.__pending__.setdefault(id, []).append(future)
+            self.__condition__.notify()
+        return future
+
+    def lookup(self, id: str | int, timeout: float = None):
+        """Looks up one id through the batcher and waits for its object"""
+        return self.submit(id).result(timeout)
+
+    def __next_batch__(self) -> dict[str, list[Future]]:
+        with self.__condition__:
+            while not self.__pending__ and not self.__closed__:
+                self.__condition__.wait()
+            deadline = time.monotonic() + self.__window__
+            while len(self.__pending__) < self.__max_batch__ and not self.__closed__:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.__condition__.wait(remaining)
+            ids = list(self.__pending__)[:self.__max_batch__]
+            return {id: self.__pending__.pop(id) for id in ids}
+
+    def __run__(self) -> None:
+        while True:
+            self.__slots__.acquire()
+            batch = self.__next_batch__()
+            if not batch:
+                return
+            self.__executor__.submit(self.__send__, batch)
+
+    def __send__(self, batch: dict[str, list[Future]]) -> None:
+        try:
+            self.__answer__(batch)
+        finally:
+            self.__slots__.release()
+
+    def __answer__(self, batch: dict[str, list[Future]]) -> None:
+        try:
+            body = self.__client__.__lookup_body__(self.__path__, list(batch), self.__fields__, self.__expansions__) or {}
+        except BaseException as error:
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(error)
+            return
+        items = {item['id']: item for item in body.get('data', [])}
+        errors = {error_resource_id(error): error for error in body.get('errors', [])}
+        for id, futures in batch.items():
+            try:
+                if id not in items:
+                    raise LookupItemError(id, Errors.from_dict(errors.get(id)))
+                result = items[id] if self.__decode__ is None else self.__decode__(items[id])
+            except Exception as error:
+                for future in futures:
+                    future.set_exception(error)
+                continue
+            for future in futures:
+                future.set_result(result)
@@ -0,0 +1,101 @@
+import threading
+import time
+import unittest
+from batcher import LookupBatcher, LookupItemError
+from fake_api import FakeApi, default_item, new_client
+from objects.fields import Field, TweetField
+from objects.tweet import Tweet
+from objects.user import User
+
+class TestLookupBatcher(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi(item=self.item, missing={'404'})
+        self.client = new_client(api=self.api)
+
+    def tearDown(self):
+        self.client.close()
+
+    @property
+    def sent(self) -> list[str]:
+        return self.api.urls
+
+    def item(self, path: str, item_id: str, query: dict) -> dict:
+        # Only the default fields, as the API returns without tweet.fields or user.fields
+        item = default_item(path, item_id, query)
+        if 'tweet.fields' in query:
+            item['lang'] = 'en'
+        return item
+
+    def test_default_fields(self):
+        with LookupBatcher(self.client, window=0.05) as batcher:
+            futures = [batcher.submit(item_id) for item_id in ('1', 2, '3', '1')]
+            tweets = [future.result(5) for future in futures]
+        self.assertEqual(len(self.sent), 1)
+        self.assertTrue(all(type(tweet) is Tweet for tweet in tweets))
+        self.assertEqual([tweet.id for tweet in tweets], ['1', '2', '3', '1'])
+        self.assertEqual(tweets[0].text, 'tweet 1')
+        self.assertIsNone(tweets[0].created_at)
+        self.assertIs(tweets[0], tweets[3])
+
+    def test_requested_fields(self):
+        with LookupBatcher(self.client, fields={Field.TWEET: [TweetField.LANG]}, window=0.05) as batcher:
+            tweet = batcher.lookup('1', timeout=5)
+        self.assertEqual(tweet.lang, 'en')
+        self.assertIn('tweet.fields=lang', self.sent[0])
+
+    def test_users(self):
+        with LookupBatcher(self.client, 'users', window=0.05) as batcher:
+            user = batcher.lookup('2244994945', timeout=5)
+        self.assertIs(type(user), User)
+        self.assertEqual(user.username, 'user2244994945')
+
+    def test_partial_errors(self):
+        with LookupBatcher(self.client, window=0.05) as batcher:
+            found, missing = batcher.submit('1'), batcher.submit('404')
+            self.assertEqual(found.result(5).id, '1')
+            with self.assertRaises(LookupItemError) as raised:
+                missing.result(5)
+        self.assertEqual(raised.exception.id, '404')
+        self.assertEqual(raised.exception.error.title, 'Not Found Error')
+
+    def test_custom_decode(self):
+        with LookupBatcher(self.client, window=0.05, decode=lambda item: item['text']) as batcher:
+            self.assertEqual(batcher.lookup('7', timeout=5), 'tweet 7')
+
+    def test_max_batch(self):
+        with LookupBatcher(self.client, window=0.5, max_batch=2) as batcher:
+            futures = [batcher.submit(str(item_id)) for item_id in range(4)]
+            self.assertEqual([future.result(5).id for future in futures], ['0', '1', '2', '3'])
+        self.assertEqual(len(self.sent), 2)
+
+    def test_max_in_flight(self):
+        in_flight = []
+        most = []
+        lock = threading.Lock()
+        def send(url, headers):
+            with lock:
+                in_flight.append(url)
+                most.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.remove(url)
+            return self.api.send(url, headers)
+        self.client.__send__ = send
+        with LookupBatcher(self.client, window=0.001, max_batch=1, max_in_flight=2) as batcher:
+            futures = [batcher.submit(str(item_id)) for item_id in range(6)]
+            self.assertEqual([future.result(5).id for future in futures], [str(item_id) for item_id in range(6)])
+        self.assertEqual(len(self.sent), 6)
+        self.assertEqual(max(most), 2)
+
+    def test_ids_collect_while_batches_are_in_flight(self):
+        self.api.delay = 0.1
+        with LookupBatcher(self.client, window=0.001, max_in_flight=1) as batcher:
+            first = batcher.submit('1')
+            time.sleep(0.03)
+            # The only slot is taken, so these wait for the first batch and go out together
+            rest = [batcher.submit(str(item_id)) for item_id in range(2, 5)]
+            self.assertEqual([future.result(5).id for future in [first, *rest]], ['1', '2', '3', '4'])
+        self.assertEqual(self.sent, ['https://api.x.com/2/tweets?ids=1', 'https://api.x.com/2/tweets?ids=2,3,4'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Compares Tweet.from_dict with the decoders specialized for the requested fields
+and with lazy proxies, which only decode the attributes that are read
+
+Run from the repository root:
+    python -m benchmarks.decode_bench
+"""
+import timeit
+
+from benchmarks.samples import tweet_page
+from objects.decoders import decoder
+from objects.fields import TweetField
+from objects.lazy import proxy_class
+from objects.tweet import Tweet
+
+
+def read_few(decode):
+    """Returns decode followed by reading id, text and author_id, as filter pipelines do"""
+    def run(item):
+        tweet = decode(item)
+        tweet.id, tweet.text, tweet.author_id
+        return tweet
+    return run
+
+
+def main(page_size: int = 100, pages: int = 20, repeat: int = 5) -> None:
+    tweets = [tweet for seed in range(pages) for tweet in tweet_page(page_size, seed)['data']]
+    requested = [TweetField(key) for key in tweets[0] if key not in ('id', 'text', 'edit_history_tweet_ids')]
+    few = [TweetField.AUTHOR_ID, TweetField.CREATED_AT]
+    decoders = {
+        'from_dict': Tweet.from_dict,
+        'all fields': decoder(Tweet, requested),
+        'all, trusted': decoder(Tweet, requested, trusted=True),
+        'author, created': decoder(Tweet, few),
+        'default fields': decoder(Tweet, []),
+        'lazy': proxy_class(Tweet),
+        'from_dict, read 3': read_few(Tweet.from_dict),
+        'lazy, read 3': read_few(proxy_class(Tweet))
+    }
+    print(f"{len(tweets)} tweets with {len(requested)} tweet.fields each")
+
+    results = {}
+    for name, decode in decoders.items():
+        best = min(timeit.repeat(lambda: [decode(tweet) for tweet in tweets], number=5, repeat=repeat))
+        results[name] = best / (5 * len(tweets))
+
+    baseline = results['from_dict']
+    for name, seconds in results.items():
+        print(f"{name:>17}: {seconds * 1e6:6.2f} us/tweet  {1 / seconds / 1e3:7.1f} k tweets/s  {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Compares JSON decoding speed of the available backends on realistic tweet pages
+
+Run from the repository root:
+    python -m benchmarks.json_decode_bench
+"""
+import json
+import timeit
+
+import json_backend
+from benchmarks.samples import tweet_page
+
+
+def main(page_size: int = 100, pages: int = 20, repeat: int = 5) -> None:
+    bodies = [json.dumps(tweet_page(page_size, seed)).encode('utf-8') for seed in range(pages)]
+    total_bytes = sum(len(body) for body in bodies)
+    print(f"{pages} pages of {page_size} tweets with includes, {total_bytes / pages / 1024:.1f} KiB per page")
+
+    results = {}
+    for name, loads in json_backend.backends.items():
+        # Check every backend hands from_dict the same structures
+        assert [loads(body) for body in bodies[:2]] == [json.loads(body) for body in bodies[:2]]
+        best = min(timeit.repeat(lambda: [loads(body) for body in bodies], number=10, repeat=repeat))
+        results[name] = best / (10 * pages)
+
+    baseline = results['json']
+    for name, seconds in results.items():
+        print(f"{name:>8}: {seconds * 1e6:8.1f} us/page  {total_bytes / pages / seconds / 1e6:7.1f} MB/s  {baseline / seconds:5.2f}x")
+    print(f"default backend: {json_backend.backend}")
+
+
+if __name__ == "__main__":
+    main()
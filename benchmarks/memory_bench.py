@@ -0,0 +1,92 @@
+"""
+Reports the memory held per decoded Tweet and User, slotted models against
+the same objects with a per-instance __dict__ as the models had before, and
+per Tweet with context annotation domains and entities interned or not
+
+Run from the repository root:
+    python -m benchmarks.memory_bench
+"""
+import tracemalloc
+from dataclasses import fields, is_dataclass
+
+from benchmarks.samples import tweet_page
+import objects.tweet as tweet_module
+from objects.tweet import Tweet
+from objects.user import User
+
+
+# Plain class per model, holding the same attributes in a __dict__
+unslotted_classes: dict[type, type] = {}
+
+
+def unslotted(value):
+    """Copies a tree of slotted models into plain objects with a __dict__"""
+    if isinstance(value, list):
+        return [unslotted(item) for item in value]
+    if isinstance(value, dict):
+        return {key: unslotted(item) for key, item in value.items()}
+    if not is_dataclass(value):
+        return value
+    cls = type(value)
+    if cls not in unslotted_classes:
+        unslotted_classes[cls] = type(cls.__name__, (), {})
+    copy = unslotted_classes[cls]()
+    for field in fields(value):
+        setattr(copy, field.name, unslotted(getattr(value, field.name)))
+    return copy
+
+
+def copy_slotted(value):
+    """Copies a tree of slotted models, so both layouts are measured the same way"""
+    if isinstance(value, list):
+        return [copy_slotted(item) for item in value]
+    if isinstance(value, dict):
+        return {key: copy_slotted(item) for key, item in value.items()}
+    if not is_dataclass(value):
+        return value
+    return type(value)(**{field.name: copy_slotted(getattr(value, field.name)) for field in fields(value)})
+
+
+def uninterned(build):
+    """Runs build with every context annotation getting its own Domain and entity"""
+    domains, context_entities = tweet_module.domains, tweet_module.context_entities
+    tweet_module.domains, tweet_module.context_entities = domains.build, context_entities.build
+    try:
+        return build()
+    finally:
+        tweet_module.domains, tweet_module.context_entities = domains, context_entities
+
+
+def measure(build) -> int:
+    """Returns the bytes still allocated by the objects build returns"""
+    # Warm up first so caches filled by the first call are not counted
+    build()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main(pages: int = 50) -> None:
+    bodies = [tweet_page(100, seed) for seed in range(pages)]
+    tweets = [tweet for body in bodies for tweet in body['data']]
+    users = [user for body in bodies for user in body['includes']['users']]
+    # Decode once up front so both layouts share the strings and datetimes
+    decoded = {'Tweet': [Tweet.from_dict(tweet) for tweet in tweets], 'User': [User.from_dict(user) for user in users]}
+
+    for name, objects in decoded.items():
+        slotted_size = measure(lambda: [copy_slotted(item) for item in objects]) / len(objects)
+        unslotted_size = measure(lambda: [unslotted(item) for item in objects]) / len(objects)
+        print(f"{name:>5}: {unslotted_size:7.0f} bytes with __dict__  {slotted_size:7.0f} bytes slotted  {unslotted_size - slotted_size:5.0f} bytes saved")
+
+    decode = lambda: [Tweet.from_dict(tweet) for tweet in tweets]
+    fresh_size = measure(lambda: uninterned(decode)) / len(tweets)
+    interned_size = measure(decode) / len(tweets)
+    print(f"Tweet: {fresh_size:7.0f} bytes unshared  {interned_size:7.0f} bytes interned  {fresh_size - interned_size:5.0f} bytes saved")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares the hit ratio of ObjectCache with a plain LRU of the same byte budget
+on lookups of a popular set of tweets mixed with scans of one-off ids
+
+Run from the repository root:
+    python -m benchmarks.objcache_bench
+"""
+import random
+from collections import OrderedDict
+
+from benchmarks.samples import tweet_page
+from objcache import ObjectCache, object_size
+from objects.tweet import Tweet
+
+
+def workload(hot: int, steps: int, scan_ratio: float, seed: int = 0) -> list[int]:
+    """Returns ids to look up: a Zipf-like popular set, interrupted by ids seen only once"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(hot)]
+    popular = rng.choices(range(hot), weights, k=steps)
+    return [hot + step if rng.random() < scan_ratio else popular[step] for step in range(steps)]
+
+
+def lru_hit_ratio(ids: list[int], max_bytes: int, size: int) -> float:
+    entries: OrderedDict[int, None] = OrderedDict()
+    hits = 0
+    for item_id in ids:
+        if item_id in entries:
+            entries.move_to_end(item_id)
+            hits += 1
+            continue
+        entries[item_id] = None
+        if len(entries) * size > max_bytes:
+            entries.popitem(last=False)
+    return hits / len(ids)
+
+
+def main(hot: int = 5_000, steps: int = 200_000) -> None:
+    tweet = Tweet.from_dict(tweet_page(1)['data'][0])
+    size = object_size(tweet)
+    max_bytes = hot // 5 * size
+    print(f"{size} bytes per tweet, room for {max_bytes // size} of {hot} popular tweets")
+
+    for scan_ratio in (0.0, 0.25, 0.5):
+        ids = workload(hot, steps, scan_ratio)
+        cache = ObjectCache(max_bytes=max_bytes, expected_entries=max_bytes // size)
+        for item_id in ids:
+            if cache.get(item_id) is None:
+                cache.put(item_id, tweet, size)
+        stats = cache.stats()
+        print(f"{scan_ratio:4.0%} scans: W-TinyLFU {stats['hit_ratio']:6.1%}  LRU {lru_hit_ratio(ids, max_bytes, size):6.1%}"
+              f"  ({stats['evictions']} evicted, {stats['rejections']} not admitted)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import random
+
+
+def tweet(id: int, author_id: int) -> dict:
+    """Returns a tweet as returned with most tweet.fields requested"""
+    return {
+        'id': str(id),
+        'text': f"Shipping the new release of our API client today #python #api @XDevelopers https://t.co/{id % 100000:05d}",
+        'author_id': str(author_id),
+        'created_at': '2024-03-14T09:26:53.000Z',
+        'conversation_id': str(id),
+        'edit_history_tweet_ids': [str(id)],
+        'lang': random.choice(['en', 'en', 'en', 'ja', 'es', 'pt']),
+        'possibly_sensitive': False,
+        'reply_settings': 'everyone',
+        'public_metrics': {
+            'retweet_count': random.randint(0, 5000),
+            'reply_count': random.randint(0, 500),
+            'like_count': random.randint(0, 50000),
+            'quote_count': random.randint(0, 200)
+        },
+        'entities': {
+            'hashtags': [
+                {'start': 43, 'end': 50, 'tag': 'python'},
+                {'start': 51, 'end': 55, 'tag': 'api'}
+            ],
+            'mentions': [
+                {'start': 56, 'end': 69, 'tag': 'XDevelopers'}
+            ],
+            'urls': [{
+                'start': 70,
+                'end': 93,
+                'url': f"https://t.co/{id % 100000:05d}",
+                'expanded_url': 'https://github.com/dwdwow/pyxdk',
+                'display_url': 'github.com/dwdwow/pyxdk'
+            }]
+        },
+        'context_annotations': [
+            {
+                'domain': {'id': '46', 'name': 'Business Taxonomy', 'description': 'Categories within Brand Verticals that narrow down the scope of Brands'},
+                'entity': {'id': '1557696848252391426', 'name': 'Technology', 'description': 'Technology and computing'}
+            },
+            {
+                'domain': {'id': '131', 'name': 'Unified Twitter Taxonomy', 'description': 'A taxonomy of user interests.'},
+                'entity': {'id': '848920371311001600', 'name': 'Technology', 'description': 'Technology and computing'}
+            }
+        ],
+        'edit_controls': {
+            'edits_remaining': 5,
+            'is_edit_eligible': True,
+            'editable_until': '2024-03-14T10:26:53.000Z'
+        },
+        'attachments': {
+            'media_keys': [f"3_{id}"]
+        }
+    }
+
+
+def user(id: int) -> dict:
+    """Returns a user as returned with most user.fields requested"""
+    return {
+        'id': str(id),
+        'name': f"User {id}",
+        'username': f"user{id}",
+        'created_at': '2013-12-14T04:35:55.000Z',
+        'description': 'Building things with the X API #DevRel',
+        'protected': False,
+        'verified': False,
+        'location': 'Internet',
+        'profile_image_url': f"https://pbs.twimg.com/profile_images/{id}/photo_normal.jpg",
+        'entities': {
+            'description': {
+                'hashtags': [{'start': 32, 'end': 39, 'tag': 'DevRel'}]
+            }
+        },
+        'public_metrics': {
+            'followers_count': random.randint(0, 100000),
+            'following_count': random.randint(0, 5000),
+            'tweet_count': random.randint(0, 50000),
+            'listed_count': random.randint(0, 1000)
+        }
+    }
+
+
+def media(media_key: str) -> dict:
+    return {
+        'media_key': media_key,
+        'type': 'photo',
+        'url': f"https://pbs.twimg.com/media/{media_key}.jpg",
+        'height': 1080,
+        'width': 1920
+    }
+
+
+def tweet_page(size: int = 100, seed: int = 0) -> dict:
+    """Returns a lookup response of size tweets with author and media expansions"""
+    random.seed(seed)
+    first_id = 1460323737035677698 + seed * size
+    authors = [2244994945 + index for index in range(size // 4 or 1)]
+    tweets = [tweet(first_id + index, random.choice(authors)) for index in range(size)]
+    return {
+        'data': tweets,
+        'includes': {
+            'users': [user(author) for author in authors],
+            'media': [media(tweet['attachments']['media_keys'][0]) for tweet in tweets]
+        }
+    }
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """Returns the URL with its query parameters sorted, so equivalent requests share a cache key"""
+    parts = urlsplit(url)
+    query = '&'.join(sorted(param for param in parts.query.split('&') if param))
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ''))
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    stored_at: float  # time.monotonic() of the last 200 or 304
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def validators(self) -> dict[str, str]:
+        """Returns the headers that make the next request conditional"""
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    LRU cache of raw response bodies keyed by normalized request URL
+
+    Entries younger than ttl are served without a request. Older entries are
+    revalidated with their ETag/Last-Modified validators, and a 304 answer
+    serves the cached body again. The cache is bounded by both entry count and
+    total body bytes. Thread safe.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.__entries__: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.__bytes__ = 0
+        self.__lock__ = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries__)
+
+    @property
+    def size(self) -> int:
+        """Total bytes of cached bodies"""
+        return self.__bytes__
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.stored_at < self.ttl
+
+    def get(self, url: str) -> CacheEntry | None:
+        key = normalize_url(url)
+        with self.__lock__:
+            entry = self.__entries__.get(key)
+            if entry is not None:
+                self.__entries__.move_to_end(key)
+            return entry
+
+    def put(self, url: str, body: bytes, headers) -> None:
+        """
+        Stores the body of a 200 response
+
+        Args:
+            url: Request URL
+            body: Raw response body
+            headers: Case-insensitive response headers carrying ETag/Last-Modified
+        """
+        if len(body) > self.max_bytes:
+            return
+        key = normalize_url(url)
+        entry = CacheEntry(
+            body=body,
+            etag=headers.get('ETag'),
+            last_modified=headers.get('Last-Modified'),
+            stored_at=time.monotonic()
+        )
+        with self.__lock__:
+            previous = self.__entries__.pop(key, None)
+            if previous is not None:
+                self.__bytes__ -= previous.size
+            self.__entries__[key] = entry
+            self.__bytes__ += entry.size
+            while len(self.__entries__) > self.max_entries or self.__bytes__ > self.max_bytes:
+                _, evicted = self.__entries__.popitem(last=False)
+                self.__bytes__ -= evicted.size
+
+    def refresh(self, url: str) -> None:
+        """Marks an entry fresh again after the API answered 304 Not Modified"""
+        with self.__lock__:
+            entry = self.__entries__.get(normalize_url(url))
+            if entry is not None:
+                entry.stored_at = time.monotonic()
+
+    def clear(self) -> None:
+        with self.__lock__:
+            self.__entries__.clear()
+            self.__bytes__ = 0
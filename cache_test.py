@@ -0,0 +1,116 @@
+import time
+import unittest
+from cache import CacheEntry, ResponseCache, normalize_url
+from fake_api import FakeApi, new_client
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.url = 'https://api.x.com/2/tweets?ids=1,2&tweet.fields=lang'
+
+    def test_normalize_url(self):
+        self.assertEqual(
+            normalize_url('https://API.x.com/2/tweets?tweet.fields=lang&ids=1,2'),
+            normalize_url(self.url)
+        )
+        self.assertNotEqual(normalize_url('https://api.x.com/2/tweets?ids=1'), normalize_url(self.url))
+
+    def test_validators(self):
+        entry = CacheEntry(body=b'{}', etag='"abc"', last_modified='Mon, 15 Nov 2021 19:08:05 GMT', stored_at=0)
+        self.assertEqual(entry.validators(), {'If-None-Match': '"abc"', 'If-Modified-Since': 'Mon, 15 Nov 2021 19:08:05 GMT'})
+        self.assertEqual(CacheEntry(body=b'{}', etag=None, last_modified=None, stored_at=0).validators(), {})
+
+    def test_put_and_get(self):
+        cache = ResponseCache()
+        cache.put(self.url, b'{"data":[]}', {'ETag': '"abc"'})
+        entry = cache.get('https://api.x.com/2/tweets?tweet.fields=lang&ids=1,2')
+        self.assertEqual(entry.body, b'{"data":[]}')
+        self.assertEqual(entry.etag, '"abc"')
+        self.assertIsNone(entry.last_modified)
+        self.assertTrue(cache.is_fresh(entry))
+        self.assertIsNone(cache.get('https://api.x.com/2/tweets?ids=3'))
+
+    def test_ttl_expiry_and_refresh(self):
+        cache = ResponseCache(ttl=0.05)
+        cache.put(self.url, b'{}', {})
+        entry = cache.get(self.url)
+        time.sleep(0.06)
+        self.assertFalse(cache.is_fresh(entry))
+        # A 304 makes the same body fresh again
+        cache.refresh(self.url)
+        self.assertTrue(cache.is_fresh(cache.get(self.url)))
+        self.assertIs(cache.get(self.url), entry)
+
+    def test_lru_eviction_by_entries(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('https://api.x.com/2/tweets?ids=1', b'1', {})
+        cache.put('https://api.x.com/2/tweets?ids=2', b'2', {})
+        # Reading 1 makes 2 the least recently used
+        cache.get('https://api.x.com/2/tweets?ids=1')
+        cache.put('https://api.x.com/2/tweets?ids=3', b'3', {})
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('https://api.x.com/2/tweets?ids=2'))
+        self.assertIsNotNone(cache.get('https://api.x.com/2/tweets?ids=1'))
+
+    def test_eviction_by_bytes(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.put('https://api.x.com/2/tweets?ids=1', b'12345', {})
+        cache.put('https://api.x.com/2/tweets?ids=2', b'12345', {})
+        self.assertEqual(cache.size, 10)
+        cache.put('https://api.x.com/2/tweets?ids=3', b'123', {})
+        self.assertEqual(cache.size, 8)
+        self.assertIsNone(cache.get('https://api.x.com/2/tweets?ids=1'))
+        # Replacing an entry counts only its new body
+        cache.put('https://api.x.com/2/tweets?ids=3', b'1', {})
+        self.assertEqual(cache.size, 6)
+        # Bodies bigger than the whole cache aren't stored
+        cache.put('https://api.x.com/2/tweets?ids=4', b'x' * 11, {})
+        self.assertIsNone(cache.get('https://api.x.com/2/tweets?ids=4'))
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+class TestClientRevalidation(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi()
+        self.client = new_client(api=self.api, response_cache=ResponseCache(ttl=0))
+
+    def tearDown(self):
+        self.client.close()
+
+    def send(self, responses):
+        self.api.responses = responses
+
+    @property
+    def sent(self) -> list[dict]:
+        return [headers for _, headers in self.api.requests]
+
+    def test_not_modified_serves_the_cached_body(self):
+        url = 'https://api.x.com/2/tweets?ids=1'
+        self.send([
+            (200, {'ETag': '"v1"'}, b'{"data":[{"id":"1","text":"hello"}]}'),
+            (304, {'ETag': '"v1"'}, b'')
+        ])
+        first = self.client.__fetch__(url)
+        second = self.client.__fetch__(url)
+        self.assertEqual(second, first)
+        self.assertNotIn('If-None-Match', self.sent[0])
+        self.assertEqual(self.sent[1]['If-None-Match'], '"v1"')
+
+    def test_fresh_entry_skips_the_request(self):
+        self.client.__cache__.ttl = 60
+        self.send([(200, {'ETag': '"v1"'}, b'{"data":[]}')])
+        self.client.__fetch__('https://api.x.com/2/tweets?ids=1')
+        self.assertEqual(self.client.__fetch__('https://api.x.com/2/tweets?ids=1'), {'data': []})
+        self.assertEqual(len(self.sent), 1)
+
+    def test_modified_replaces_the_cached_body(self):
+        url = 'https://api.x.com/2/tweets?ids=1'
+        self.send([
+            (200, {'ETag': '"v1"'}, b'{"data":[{"id":"1","text":"hello"}]}'),
+            (200, {'ETag': '"v2"'}, b'{"data":[{"id":"1","text":"edited"}]}')
+        ])
+        self.client.__fetch__(url)
+        self.assertEqual(self.client.__fetch__(url)['data'][0]['text'], 'edited')
+        self.assertEqual(self.client.__cache__.get(url).etag, '"v2"')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,16 +1,38 @@
-from enum import Enum
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+import copy
 import getpass
+import queue
+import threading
+import time
 
 import requests
+from requests.adapters import HTTPAdapter
+from cache import ResponseCache, normalize_url
+from objcache import ObjectCache
 import eas
+import json_backend
+from query import PreparedQuery, encode_list, encode_params, prepare
+from ratelimit import RateLimitScheduler, endpoint_key, token_key
+from retry import RetryPolicy
+from singleflight import SingleFlight
+from store import LookupStore
 from objects.expansions import ArgExpansions
-from objects.fields import ArgFields
-from objects.resp_data import ResponseData
+from objects.fields import ArgFields, Field
+from objects.resp_data import ResponseData, data_model, merge_response_dicts, order_by_ids, select_ids
 from objects.tweet import Tweet
+from objects.user import User
 
 
 base_url = "https://api.x.com/2"
 
+# The API rejects lookups with more than 100 ids, and very long URLs
+max_ids_per_request = 100
+max_url_length = 4096
+
+# Lookup endpoints a LookupStore can serve, and the field set of their objects
+stored_lookups = {'tweets': Field.TWEET, 'users': Field.USER}
+
 
 status_code_reasons = {
     400: "Bad Request - Invalid parameters",
@@ -29,6 +51,205 @@ status_code_reasons = {
 }
 
 
+def build_url(path: str, ids: list[str] = None, fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, other_params: dict = None) -> str:
+    queries: list[str] = []
+    if ids:
+        queries.append(f"ids={encode_list(ids)}")
+    fragment = prepare(fields, expansions).fragment
+    if fragment:
+        queries.append(fragment)
+    params = encode_params(other_params)
+    if params:
+        queries.append(params)
+    return f"{base_url}/{path.strip('/')}?{'&'.join(queries)}"
+
+
+def page_params(other_params: dict | None, token_param: str, token: str | None) -> dict | None:
+    """Returns other_params with the pagination token of the next page added"""
+    if token is None:
+        return other_params
+    params = dict(other_params or {})
+    params[token_param] = token
+    return params
+
+
+def chunk_ids(ids: list[str], url_length: int, max_ids: int = None, max_length: int = None) -> list[list[str]]:
+    """
+    Splits ids into chunks that respect both the per-call id cap and the URL length limit
+
+    Args:
+        ids: Ids to look up
+        url_length: Length of the request URL without the ids parameter
+        max_ids: Maximum ids per call, defaults to max_ids_per_request
+        max_length: Maximum URL length, defaults to max_url_length
+
+    Returns:
+        List of id chunks, in the original order
+    """
+    max_ids = max_ids or max_ids_per_request
+    max_length = max_length or max_url_length
+    # "ids=" plus the "&" joining it to the rest of the query
+    budget = max_length - url_length - len("ids=&")
+    chunks: list[list[str]] = []
+    chunk: list[str] = []
+    length = 0
+    for id in ids:
+        id_length = len(id) + (1 if chunk else 0)
+        if chunk and (len(chunk) >= max_ids or length + id_length > budget):
+            chunks.append(chunk)
+            chunk = []
+            length = 0
+            id_length = len(id)
+        chunk.append(id)
+        length += id_length
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class ApiError(ValueError):
+    """
+    Raised for responses other than 200 and 304
+
+    Subclasses ValueError, which the client raised before, so existing handlers keep working.
+    """
+
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.reason = status_code_reasons.get(status_code, "Unknown error occurred")
+        # Case-insensitive response headers, e.g. x-rate-limit-reset
+        self.headers = headers if headers is not None else {}
+        super().__init__(f"{status_code} - {self.reason}")
+
+
+def raise_for_status(status_code: int, headers=None) -> None:
+    if status_code in (200, 304):
+        return
+    raise ApiError(status_code, headers)
+
+
+def response_data[D](body: dict | None, path: str = None, raw: bool = False, fields: ArgFields | PreparedQuery = None, lazy: bool = False, int_ids: bool = False, expansions: ArgExpansions = None) -> ResponseData[D]:
+    """
+    Converts a decoded API response body into ResponseData
+
+    Args:
+        body: Decoded JSON body, None when the API answered 304
+        path: Endpoint path the body came from, picks the model data is decoded into
+        raw: Keep data and includes as raw dictionaries
+        fields: Fields the body was requested with, picks the decoders specialized for them
+        lazy: Wrap tweets, users and media into proxies decoding attributes on first access
+        int_ids: Decode Snowflake ids into ints and lists of them into array('q')
+        expansions: Expansions the body was requested with, so the keys they imply are decoded too
+
+    Returns:
+        ResponseData built from the body, or an empty ResponseData for 304
+    """
+    if body is None:
+        # Not Modified
+        # There was no new data to return.
+        return ResponseData[D](data=None, includes=None, meta=None, errors=None)  # No new data
+    if raw:
+        return ResponseData[D].from_dict(body, raw=True)
+    model = None if path is None else data_model(path)
+    query = prepare(fields, expansions)
+    return ResponseData[D].from_dict(body, model, fields=dict(query.fields), lazy=lazy, int_ids=int_ids, expansions=query.expansions)
+
+
+def cached_objects(cache: ObjectCache, spec: tuple, ids: list[str]) -> dict[str, object]:
+    """Returns the decoded objects of a lookup found fresh in an ObjectCache, by id"""
+    found = {}
+    for item_id in ids:
+        item = cache.get((spec, item_id))
+        if item is not None:
+            found[item_id] = item
+    return found
+
+
+def add_cached_objects[D](response: ResponseData[D], found: dict[str, object], ids: list[str], cache: ObjectCache, spec: tuple, ttl: float = None) -> ResponseData[D]:
+    """Caches the objects a lookup fetched for ttl seconds and adds those found in the cache, in the order of ids"""
+    fetched = {}
+    for item in response.data or []:
+        # Ids are ints with int_ids
+        item_id = str(item.id)
+        cache.put((spec, item_id), item, ttl=ttl)
+        fetched[item_id] = item
+    if found:
+        response.data = [found[item_id] if item_id in found else fetched[item_id] for item_id in ids if item_id in found or item_id in fetched]
+    return response
+
+
+def prefetched[T](pages: Iterator[T], prefetch: int, name: str = None) -> Iterator[T]:
+    """
+    Runs an iterator of pages in a background thread, ahead of the caller
+
+    Args:
+        pages: Iterator fetching a page each time it is advanced
+        prefetch: Most pages fetched, or being fetched, that the caller hasn't taken yet
+        name: Name of the background thread
+
+    Returns:
+        Iterator over the same pages; errors raised by pages are raised to the caller
+    """
+    buffer: queue.Queue = queue.Queue()
+    # A slot is taken before a page is fetched and given back when the caller takes the page
+    slots = threading.Semaphore(prefetch)
+    stop = threading.Event()
+    done = object()
+
+    def produce() -> None:
+        try:
+            while not stop.is_set():
+                if not slots.acquire(timeout=0.1):
+                    continue
+                if stop.is_set():
+                    return
+                page = next(pages, done)
+                if page is done:
+                    return
+                buffer.put(page)
+        except BaseException as error:
+            buffer.put(error)
+        finally:
+            buffer.put(done)
+
+    producer = threading.Thread(target=produce, name=name, daemon=True)
+    producer.start()
+    try:
+        while True:
+            page = buffer.get()
+            if page is done:
+                return
+            if isinstance(page, BaseException):
+                raise page
+            slots.release()
+            yield page
+    finally:
+        stop.set()
+
+
+def new_session(pool_connections: int = 10, pool_maxsize: int = 10, keep_alive: bool = True) -> requests.Session:
+    """
+    Creates a pooled HTTP session for the X API
+
+    Args:
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum number of connections kept open per host
+        keep_alive: Reuse connections between requests
+
+    Returns:
+        requests.Session backed by a blocking urllib3 pool, safe to share across threads
+    """
+    session = requests.Session()
+    # pool_block makes threads wait for a free connection instead of
+    # opening throwaway ones once pool_maxsize is reached
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
 class Client:
     def __init__(self, bearer_token: str):
         self.__bearer_token__ = bearer_token
@@ -37,70 +258,245 @@ class Client:
         token = eas.decrypt_from_file(file_path, bytes.fromhex(password))
         self.__bearer_token__ = token
         
-    def __init__(self, file_path: str, input_password: bool):
+    def __init__(self, file_path: str, input_password: bool, *, pool_connections: int = 10, pool_maxsize: int = 10, keep_alive: bool = True, timeout: float | None = 30, rate_limits: RateLimitScheduler = None, retry: RetryPolicy = None, response_cache: ResponseCache = None, store: LookupStore = None, object_cache: ObjectCache = None):
         if input_password:
             password = getpass.getpass("Enter password: ")
         token = eas.decrypt_from_file(file_path, bytes.fromhex(password))
         self.__bearer_token__ = token
+        self.__token_key__ = token_key(token)
+        # Pass the same scheduler to clients sharing a token so they share its limits
+        self.__rate_limits__ = rate_limits or RateLimitScheduler()
+        self.__retry__ = retry or RetryPolicy()
+        self.__cache__ = response_cache
+        # Tweets and users already looked up, possibly by other processes, are served from here
+        self.__store__ = store
+        # Decoded tweets and users, so repeated lookups skip both the API and decoding
+        self.__object_cache__ = object_cache
+        # Identical requests, and lookups of the same ids, made concurrently share one API call
+        self.__flights__ = SingleFlight()
+        self.__id_flights__ = SingleFlight()
+        self.__timeout__ = timeout
+        self.__session__ = new_session(pool_connections, pool_maxsize, keep_alive)
+        # Runs the calls of a chunked lookup concurrently, one per pooled connection
+        self.__executor__ = ThreadPoolExecutor(max_workers=pool_maxsize)
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes every pooled connection; the client must not be used afterwards"""
+        self.__executor__.shutdown()
+        self.__session__.close()
         
     def __headers__(self):
         return {
             "Authorization": f"Bearer {self.__bearer_token__}"
         }
 
-    def get[D](self, path: str, ids: list[str] = None, fields: ArgFields = None, expansions: ArgExpansions = None, other_params: dict = None) -> ResponseData[D]:
-        url = f"{base_url}/{path.strip('/')}"
-        queries: list[str] = []
-        if ids:
-            queries.append(f"ids={','.join(ids)}")
-        if fields:
-            for key, value in fields.items():
-                if not value:
-                    continue
-                queries.append(f"{key.value}={','.join([v.value for v in value])}")
-        if expansions:
-            queries.append(f"expansions={','.join([e.value for e in expansions])}")
-        if other_params:
-            for key, value in other_params.items():
-                if not value:
-                    continue
-                k: str = None
-                if isinstance(key, Enum):
-                    k = key.value
-                else:
-                    k = key
-                if isinstance(value, list):
-                    if isinstance(value[0], Enum):
-                        queries.append(f"{k}={','.join([v.value for v in value])}")
-                    else:
-                        queries.append(f"{k}={','.join(value)}")
-                else:
-                    if isinstance(value, Enum):
-                        queries.append(f"{k}={value.value}")
-                    else:
-                        queries.append(f"{k}={value}")
-        url += "?" + "&".join(queries)
-        response = requests.get(url, headers=self.__headers__())
-        status_code = response.status_code
-        if status_code == 200:
-            return ResponseData[D].from_dict(response.json())
-        elif status_code == 304:
-            # Not Modified
-            # There was no new data to return.
-            return ResponseData[D](data=None, includes=None, meta=None, errors=None)  # No new data
-        raise ValueError(f"{status_code} - {status_code_reasons.get(status_code, "Unknown error occurred")}")
+    def flight_stats(self) -> dict[str, dict[str, int]]:
+        """Returns hit/miss counters of request coalescing, for whole requests and for lookup ids"""
+        return {
+            "requests": self.__flights__.stats(),
+            "ids": self.__id_flights__.stats()
+        }
+
+    def __send_once__(self, url: str, headers: dict) -> tuple[int, dict, bytes]:
+        # Conditional requests only coalesce with requests carrying the same validators
+        key = (normalize_url(url), headers.get("If-None-Match"), headers.get("If-Modified-Since"))
+        return self.__flights__.do(key, lambda: self.__send__(url, headers))
+
+    def __send__(self, url: str, headers: dict) -> tuple[int, dict, bytes]:
+        endpoint = endpoint_key(url)
+        budget = self.__retry__.budget()
+        while True:
+            delay = self.__rate_limits__.reserve(self.__token_key__, endpoint)
+            if delay > 0:
+                if not budget.allows(delay):
+                    self.__rate_limits__.release(self.__token_key__, endpoint)
+                    raise TimeoutError(f"Rate limit of {endpoint} resets after the call deadline")
+                time.sleep(delay)
+            try:
+                # An attempt may not run past the call deadline
+                response = self.__session__.get(url, headers=headers, timeout=budget.timeout(self.__timeout__))
+            except (requests.ConnectionError, requests.Timeout):
+                delay = budget.next_delay(None)
+                if delay is None:
+                    raise
+            else:
+                self.__rate_limits__.update(self.__token_key__, endpoint, response.headers)
+                status_code = response.status_code
+                if status_code in (200, 304):
+                    return status_code, response.headers, response.content
+                # A 429 also marks the window exhausted, so the next attempt waits for its reset
+                delay = budget.next_delay(status_code, response.headers)
+                if delay is None:
+                    raise_for_status(status_code, response.headers)
+            time.sleep(delay)
+
+    def __open_stream__(self, url: str, timeout: tuple[float, float]) -> requests.Response:
+        """Opens a streaming connection; the caller reads the body and handles its status"""
+        return self.__session__.get(url, headers=self.__headers__(), timeout=timeout, stream=True)
+
+    def __fetch__(self, url: str) -> dict | None:
+        cache = self.__cache__
+        headers = self.__headers__()
+        if cache is None:
+            status_code, _, body = self.__send_once__(url, headers)
+            return json_backend.loads(body) if status_code == 200 else None
+        entry = cache.get(url)
+        if entry is not None:
+            if cache.is_fresh(entry):
+                return json_backend.loads(entry.body)
+            headers.update(entry.validators())
+        status_code, response_headers, body = self.__send_once__(url, headers)
+        if status_code == 304:
+            if entry is None:
+                return None
+            cache.refresh(url)
+            return json_backend.loads(entry.body)
+        cache.put(url, body, response_headers)
+        return json_backend.loads(body)
+
+    def get[D](self, path: str, ids: list[str] = None, fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, other_params: dict = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[D]:
+        url = build_url(path, ids, fields, expansions, other_params)
+        return response_data(self.__fetch__(url), path, raw, fields, lazy, int_ids, expansions)
+
+    def __lookup_pages__(self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None) -> dict | None:
+        url_length = len(build_url(path, None, fields, expansions))
+        urls = [build_url(path, chunk, fields, expansions) for chunk in chunk_ids(ids, url_length)]
+        if len(urls) == 1:
+            pages = [self.__fetch__(urls[0])]
+        else:
+            pages = list(self.__executor__.map(self.__fetch__, urls))
+        return merge_response_dicts(pages)
+
+    def __lookup_body__(self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None) -> dict | None:
+        # Ids may be ints, e.g. from int_ids responses, the bodies always hold strings
+        ids = list(dict.fromkeys(map(str, ids)))
+        store = self.__store__
+        query = prepare(fields, expansions)
+        # Stored objects come without the includes of their expansions, so those lookups go to the API
+        if store is None or path not in stored_lookups or query.expansions:
+            return self.__lookup_flights__(path, ids, fields, expansions)
+        requested = [value.value for value in query.field_values(stored_lookups[path])]
+        found = store.get(path, requested, ids)
+        missing = [item_id for item_id in ids if item_id not in found]
+        page = self.__lookup_flights__(path, missing, fields, expansions) if missing else None
+        if page is not None:
+            store.put(path, requested, page.get('data') or [])
+        stored = {'data': list(found.values())} if found else None
+        return order_by_ids(merge_response_dicts([stored, page]), ids)
+
+    def __lookup_flights__(self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None) -> dict | None:
+        # Ids are only shared between lookups asking for the same fields and expansions
+        spec = build_url(path, None, fields, expansions)
+        leading, joined = self.__id_flights__.claim([(spec, item_id) for item_id in ids])
+        pages = []
+        if leading:
+            try:
+                page = self.__lookup_pages__(path, [item_id for _, item_id in leading], fields, expansions)
+            except BaseException as error:
+                self.__id_flights__.resolve(leading, error=error)
+                raise
+            self.__id_flights__.resolve(leading, page)
+            pages.append(page)
+        # Group the joined ids by the call that answers them
+        shared: dict[int, tuple[dict | None, set[str]]] = {}
+        for (_, item_id), future in joined.items():
+            page = future.result()
+            shared.setdefault(id(page), (page, set()))[1].add(item_id)
+        for page, page_ids in shared.values():
+            # Other callers decode the shared body too, so take a private copy
+            pages.append(copy.deepcopy(select_ids(page, page_ids)))
+        return order_by_ids(merge_response_dicts(pages), ids)
+
+    def __lookup__[D](self, path: str, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[D]:
+        cache = self.__object_cache__
+        query = prepare(fields, expansions)
+        if cache is None or raw or path not in stored_lookups or query.expansions:
+            return response_data(self.__lookup_body__(path, ids, fields, expansions), path, raw, fields, lazy, int_ids, expansions)
+        ids = list(dict.fromkeys(map(str, ids)))
+        # Objects are only shared between lookups decoding the same fields the same way
+        spec = (path, query.fragment, lazy, int_ids)
+        ttl = cache.lifetime(value.value for value in query.field_values(stored_lookups[path]))
+        found = cached_objects(cache, spec, ids)
+        missing = [item_id for item_id in ids if item_id not in found]
+        body = self.__lookup_body__(path, missing, fields, expansions) if missing else None
+        return add_cached_objects(response_data(body, path, raw, fields, lazy, int_ids, expansions), found, ids, cache, spec, ttl)
     
-    def lookup_tweets(self, ids: list[str], fields: ArgFields=None, expansions: ArgExpansions=None) -> ResponseData[list[Tweet]]:
-        return self.get("tweets", ids, fields, expansions)
+    def lookup_tweets(self, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[list[Tweet]]:
+        return self.__lookup__("tweets", ids, fields, expansions, raw=raw, lazy=lazy, int_ids=int_ids)
+
+    def lookup_users(self, ids: list[str], fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, raw: bool = False, lazy: bool = False, int_ids: bool = False) -> ResponseData[list[User]]:
+        return self.__lookup__("users", ids, fields, expansions, raw=raw, lazy=lazy, int_ids=int_ids)
+
+    def paginate[D](self, path: str, fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, other_params: dict = None, *, items: bool = False, prefetch: int = 1, max_pages: int = None, max_items: int = None, token_param: str = "pagination_token", raw: bool = False, lazy: bool = False, int_ids: bool = False) -> Iterator[ResponseData[D]]:
+        """
+        Follows meta.next_token across pages, fetching ahead of the caller
+
+        Args:
+            path: Endpoint path, e.g. "users/2244994945/tweets"
+            fields: Fields to request on every page
+            expansions: Expansions to request on every page
+            other_params: Other query parameters, e.g. {"max_results": 100}
+            items: Yield the items of each page's data instead of whole pages
+            prefetch: Number of pages fetched ahead while the caller processes the current one,
+                0 fetches each page only when the caller gets to it
+            max_pages: Stop after this many pages
+            max_items: Stop after this many data items
+            token_param: Query parameter carrying the token, "next_token" for search endpoints
+            raw: Keep data and includes as raw dictionaries instead of models
+            lazy: Decode attributes of tweets, users and media only when they are read, see objects.lazy
+            int_ids: Decode Snowflake ids into ints and lists of them into array('q'), see objects.int_ids
+
+        Returns:
+            Iterator over ResponseData pages, or over data items when items is True
+        """
+        pages = self.__pages__(path, fields, expansions, other_params, max_pages, max_items, token_param, raw, lazy, int_ids)
+        if prefetch > 0:
+            pages = prefetched(pages, prefetch, name=f"paginate {path}")
+        yielded = 0
+        for page in pages:
+            if not items:
+                yield page
+                continue
+            for item in page.data or []:
+                if max_items is not None and yielded >= max_items:
+                    return
+                yield item
+                yielded += 1
+
+    def __pages__[D](self, path: str, fields: ArgFields | PreparedQuery, expansions: ArgExpansions, other_params: dict | None, max_pages: int | None, max_items: int | None, token_param: str, raw: bool, lazy: bool, int_ids: bool) -> Iterator[ResponseData[D]]:
+        """Fetches each page when it is asked for, following meta.next_token"""
+        token = None
+        page_count = 0
+        item_count = 0
+        while True:
+            url = build_url(path, None, fields, expansions, page_params(other_params, token_param, token))
+            page = response_data(self.__fetch__(url), path, raw, fields, lazy, int_ids, expansions)
+            yield page
+            page_count += 1
+            item_count += len(page.data) if isinstance(page.data, list) else 0
+            token = page.meta.next_token if page.meta else None
+            if token is None:
+                return
+            if max_pages is not None and page_count >= max_pages:
+                return
+            if max_items is not None and item_count >= max_items:
+                return
 
 
 if __name__ == "__main__":
     import os
     home_dir = os.path.expanduser("~")
     token_path = os.path.join(home_dir, "pyxdk_test",  "bearer_token.pvt")
-    res = Client(token_path, True).lookup_tweets(
-        ids=["1460323737035677698",
-        "1519781379172495360",
-        "1519781381693353984"],
-    )
+    with Client(token_path, True) as client:
+        res = client.lookup_tweets(
+            ids=["1460323737035677698",
+            "1519781379172495360",
+            "1519781381693353984"],
+        )
     print(res)
\ No newline at end of file
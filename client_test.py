@@ -0,0 +1,307 @@
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+import requests
+import client
+from client import ApiError, build_url, chunk_ids, max_ids_per_request, prefetched
+from fake_api import FakeApi, FakeRequestsSession, new_client, timeline, tweet, user
+from objects.expansions import TweetPayloadExpansion, UserPayloadExpansion
+from objects.fields import Field, UserField
+from retry import RetryPolicy
+
+def sent_ids(url: str) -> list[str]:
+    return parse_qs(urlsplit(url).query)['ids'][0].split(',')
+
+class TestChunkIds(unittest.TestCase):
+    def test_id_cap(self):
+        ids = [str(item_id) for item_id in range(250)]
+        chunks = chunk_ids(ids, len(build_url('tweets')))
+        self.assertEqual([len(chunk) for chunk in chunks], [100, 100, 50])
+        self.assertEqual(sum(chunks, []), ids)
+        self.assertEqual([len(chunk) for chunk in chunk_ids(ids, 0, max_ids=60)], [60, 60, 60, 60, 10])
+        self.assertEqual(chunk_ids([], 0), [])
+
+    def test_url_budget(self):
+        # 100 - 35 - len("ids=&") leaves 60 characters: three 19-digit ids and their commas
+        ids = [str(1460323737035677698 + item_id) for item_id in range(7)]
+        chunks = chunk_ids(ids, 35, max_length=100)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(sum(chunks, []), ids)
+
+    def test_urls_stay_within_the_limit(self):
+        ids = [str(1460323737035677698 + item_id) for item_id in range(1000)]
+        fields = {Field.USER: list(UserField)}
+        expansions = list(TweetPayloadExpansion)
+        url_length = len(build_url('tweets', None, fields, expansions))
+        chunks = chunk_ids(ids, url_length, max_length=2048)
+        self.assertEqual(sum(chunks, []), ids)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), max_ids_per_request)
+            self.assertLessEqual(len(build_url('tweets', chunk, fields, expansions)), 2048)
+        # The budget, not the id cap, bounds these chunks
+        self.assertLess(len(chunks[0]), max_ids_per_request)
+
+    def test_id_longer_than_the_budget(self):
+        self.assertEqual(chunk_ids(['1' * 50, '2'], 60, max_length=100), [['1' * 50], ['2']])
+
+class TestChunkedLookup(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi(item=self.item, missing={'1100', '1200'})
+        self.api.body = self.body
+        self.client = new_client(api=self.api)
+
+    def tearDown(self):
+        self.client.close()
+
+    def item(self, path: str, item_id: str, query: dict) -> dict:
+        return tweet(item_id, author_id=str(int(item_id) % 3))
+
+    def body(self, url: str) -> dict:
+        # Every call expands the authors of its own tweets, so calls share some users
+        body = FakeApi.body(self.api, url)
+        authors = dict.fromkeys(item['author_id'] for item in body['data'])
+        body['includes'] = {'users': [user(author_id) for author_id in authors]}
+        return body
+
+    def test_lookup_of_more_than_100_ids(self):
+        ids = [str(item_id) for item_id in range(1249, 999, -1)]
+        # Duplicates are only looked up once, where they first appear
+        requested = ids[:10] + ids + ids[:5]
+        response = self.client.lookup_tweets(requested, expansions=[TweetPayloadExpansion.AUTHOR_ID])
+        self.assertEqual([len(sent_ids(url)) for url in self.api.urls], [100, 100, 50])
+        self.assertEqual(sorted(sum(map(sent_ids, self.api.urls), [])), sorted(ids))
+        expected = [item_id for item_id in ids if item_id not in ('1100', '1200')]
+        self.assertEqual([item.id for item in response.data], expected)
+        self.assertEqual(sorted(item.id for item in response.includes.users), ['0', '1', '2'])
+        self.assertEqual([error.resource_id for error in response.errors], ['1200', '1100'])
+
+    def test_single_call(self):
+        response = self.client.lookup_tweets(['2', '1', '2'])
+        self.assertEqual(self.api.urls, ['https://api.x.com/2/tweets?ids=2,1'])
+        self.assertEqual([item.id for item in response.data], ['2', '1'])
+
+class TestExpansions(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi(item=self.item)
+        self.client = new_client(api=self.api)
+
+    def tearDown(self):
+        self.client.close()
+
+    def item(self, path: str, item_id: str, query: dict) -> dict:
+        # The keys each expansion refers to come back without their fields being requested
+        expansions = query.get('expansions', [''])[0].split(',')
+        if path == 'users':
+            return user(item_id, pinned_tweet_id='9') if 'pinned_tweet_id' in expansions else user(item_id)
+        keys = {
+            'author_id': {'author_id': '2244994945'},
+            'referenced_tweets.id': {'referenced_tweets': [{'type': 'replied_to', 'id': '8'}]},
+            'in_reply_to_user_id': {'in_reply_to_user_id': '7'},
+            'attachments.media_keys': {'attachments': {'media_keys': ['3_1']}},
+            'geo.place_id': {'geo': {'place_id': '01a9a39529b27f36'}}
+        }
+        return tweet(item_id, **{key: value for expansion in expansions for key, value in keys.get(expansion, {}).items()})
+
+    def body(self, url: str) -> dict:
+        body = FakeApi.body(self.api, url)
+        body['includes'] = {'users': [user('2244994945')]}
+        return body
+
+    def test_lookup_with_expansions_only(self):
+        self.api.body = self.body
+        expansions = [
+            TweetPayloadExpansion.AUTHOR_ID,
+            TweetPayloadExpansion.REFERENCED_TWEETS_ID,
+            TweetPayloadExpansion.IN_REPLY_TO_USER_ID,
+            TweetPayloadExpansion.ATTACHMENTS_MEDIA_KEYS,
+            TweetPayloadExpansion.GEO_PLACE_ID
+        ]
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                item = self.client.lookup_tweets(['1'], expansions=expansions, lazy=lazy).data[0]
+                self.assertEqual(item.author_id, '2244994945')
+                self.assertEqual(item.author.username, 'user2244994945')
+                self.assertEqual(item.referenced_tweets[0].id, '8')
+                self.assertEqual(item.in_reply_to_user_id, '7')
+                self.assertEqual(item.attachments, {'media_keys': ['3_1']})
+                self.assertEqual(item.geo, {'place_id': '01a9a39529b27f36'})
+                self.assertIsNone(item.created_at)
+
+    def test_get_with_expansions_only(self):
+        response = self.client.get('users', ids=['1'], expansions=[UserPayloadExpansion.PINNED_TWEET_ID])
+        self.assertEqual(response.data[0].pinned_tweet_id, '9')
+
+class TestClientSend(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi()
+        # The client's own __send__ runs, against a fake requests session
+        policy = RetryPolicy(status_retries={429: 2, 503: 2}, network_retries=1, base_delay=0.0)
+        self.client = new_client(retry=policy)
+        self.session = FakeRequestsSession(self.api)
+        self.client.__session__ = self.session
+        self.delays = []
+        patcher = mock.patch.object(client.time, 'sleep', self.delays.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_retry_after_is_honored(self):
+        self.api.responses = [(429, {'retry-after': '7'}, b''), (503, {'Retry-After': '3'}, b'')]
+        response = self.client.lookup_tweets(['1'])
+        self.assertEqual(response.data[0].id, '1')
+        self.assertEqual(len(self.api.requests), 3)
+        self.assertEqual(self.delays, [7.0, 3.0])
+        self.assertEqual(self.session.timeouts, [30, 30, 30])
+
+    def test_retries_run_out(self):
+        self.api.responses = [(503, {}, b'')] * 3
+        with self.assertRaises(ApiError) as raised:
+            self.client.get('tweets', ids=['1'])
+        self.assertEqual(raised.exception.status_code, 503)
+        # Two retries, then the error reaches the caller
+        self.assertEqual(len(self.api.requests), 3)
+
+    def test_deadline_runs_out(self):
+        self.client.__retry__ = RetryPolicy(base_delay=0.0, deadline=5)
+        self.api.responses = [(429, {'retry-after': '60'}, b'')]
+        with self.assertRaises(ApiError) as raised:
+            self.client.get('tweets', ids=['1'])
+        self.assertEqual(raised.exception.status_code, 429)
+        # Waiting out the Retry-After would pass the deadline, so the call gives up at once
+        self.assertEqual(len(self.api.requests), 1)
+        self.assertEqual(self.delays, [])
+        self.assertLessEqual(self.session.timeouts[0], 5)
+
+    def test_errors_are_not_retried(self):
+        self.api.responses = [(401, {}, b''), (400, {}, b'')]
+        with self.assertRaises(ApiError) as raised:
+            self.client.get('tweets', ids=['1'])
+        self.assertEqual(str(raised.exception), '401 - Unauthorized - Authentication failed')
+        self.assertEqual(len(self.api.requests), 1)
+        with self.assertRaises(ApiError):
+            self.client.get('tweets', ids=['2'])
+        self.assertEqual(len(self.api.requests), 2)
+        self.assertEqual(self.delays, [])
+
+    def test_network_errors(self):
+        self.api.responses = [requests.ConnectionError(), requests.Timeout()]
+        with self.assertRaises(requests.Timeout):
+            self.client.get('tweets', ids=['1'])
+        self.assertEqual(len(self.api.requests), 2)
+        self.api.responses = [requests.ConnectionError()]
+        self.assertEqual(self.client.get('tweets', ids=['1']).data[0].id, '1')
+
+class TestPrefetched(unittest.TestCase):
+    def setUp(self):
+        self.fetched = 0
+
+    def pages(self, count: int, error: Exception = None):
+        for page in range(count):
+            self.fetched += 1
+            yield page
+        if error is not None:
+            raise error
+
+    def wait_for(self, condition) -> None:
+        deadline = time.monotonic() + 2
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_pages_in_order(self):
+        self.assertEqual(list(prefetched(self.pages(5), 1)), [0, 1, 2, 3, 4])
+
+    def test_prefetch_depth(self):
+        pages = prefetched(self.pages(10), 2)
+        self.assertEqual(next(pages), 0)
+        # The producer runs two pages ahead of the caller, and no further
+        self.wait_for(lambda: self.fetched == 3)
+        time.sleep(0.05)
+        self.assertEqual(self.fetched, 3)
+        self.assertEqual(next(pages), 1)
+        self.wait_for(lambda: self.fetched == 4)
+        time.sleep(0.05)
+        self.assertEqual(self.fetched, 4)
+        pages.close()
+
+    def test_errors_reach_the_caller(self):
+        pages = prefetched(self.pages(2, ApiError(503)), 1)
+        self.assertEqual([next(pages), next(pages)], [0, 1])
+        with self.assertRaises(ApiError) as raised:
+            next(pages)
+        self.assertEqual(raised.exception.status_code, 503)
+
+    def test_close_stops_the_producer(self):
+        pages = prefetched(self.pages(100), 1, name='prefetch close test')
+        for page in pages:
+            break
+        producer = next(thread for thread in threading.enumerate() if thread.name == 'prefetch close test')
+        pages.close()
+        producer.join(2)
+        self.assertFalse(producer.is_alive())
+        self.assertLessEqual(self.fetched, 2)
+
+class TestPaginate(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeApi()
+        self.api.body = timeline(4)
+        self.client = new_client(api=self.api)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_follows_next_token(self):
+        for prefetch in (0, 1, 3):
+            with self.subTest(prefetch):
+                pages = list(self.client.paginate('users/1/tweets', other_params={'max_results': 3}, prefetch=prefetch))
+                self.assertEqual([[item.id for item in page.data] for page in pages], [[str(index) for index in range(start, start + 3)] for start in (0, 3, 6, 9)])
+        self.assertEqual(self.api.urls[:4], [
+            'https://api.x.com/2/users/1/tweets?max_results=3',
+            'https://api.x.com/2/users/1/tweets?max_results=3&pagination_token=1',
+            'https://api.x.com/2/users/1/tweets?max_results=3&pagination_token=2',
+            'https://api.x.com/2/users/1/tweets?max_results=3&pagination_token=3'
+        ])
+
+    def test_token_param(self):
+        list(self.client.paginate('tweets/search/recent', max_pages=2, token_param='next_token'))
+        self.assertEqual(self.api.urls[-1], 'https://api.x.com/2/tweets/search/recent?next_token=1')
+
+    def test_max_pages(self):
+        pages = list(self.client.paginate('users/1/tweets', max_pages=2, prefetch=3))
+        self.assertEqual(len(pages), 2)
+        # Prefetching doesn't fetch past the last page
+        self.assertEqual(len(self.api.urls), 2)
+
+    def test_max_items(self):
+        pages = list(self.client.paginate('users/1/tweets', max_items=4))
+        self.assertEqual(len(pages), 2)
+        items = list(self.client.paginate('users/1/tweets', items=True, max_items=4))
+        self.assertEqual([item.id for item in items], ['0', '1', '2', '3'])
+        self.assertEqual(len(self.api.urls), 4)
+
+    def test_items(self):
+        items = list(self.client.paginate('users/1/tweets', items=True))
+        self.assertEqual([item.id for item in items], [str(index) for index in range(12)])
+
+    def test_errors_reach_the_caller(self):
+        self.api.responses = [(200, {}, json.dumps(timeline(4)('')).encode()), ApiError(403)]
+        pages = self.client.paginate('users/1/tweets')
+        self.assertEqual(len(next(pages).data), 3)
+        with self.assertRaises(ApiError) as raised:
+            next(pages)
+        self.assertEqual(raised.exception.status_code, 403)
+
+    def test_early_close(self):
+        pages = self.client.paginate('users/1/tweets', prefetch=1)
+        next(pages)
+        pages.close()
+        time.sleep(0.2)
+        # The producer stopped at the page it had prefetched
+        self.assertLessEqual(len(self.api.urls), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import threading
+import time
+from collections.abc import Callable
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from client import Client
+
+
+def tweet(item_id: str, **fields) -> dict:
+    """Returns a tweet with the default fields, plus any others given"""
+    return {'id': item_id, 'text': f'tweet {item_id}', 'edit_history_tweet_ids': [item_id], **fields}
+
+
+def user(item_id: str, **fields) -> dict:
+    """Returns a user with the default fields, plus any others given"""
+    return {'id': item_id, 'name': f'User {item_id}', 'username': f'user{item_id}', **fields}
+
+
+def default_item(path: str, item_id: str, query: dict[str, list[str]]) -> dict:
+    return user(item_id) if path == 'users' else tweet(item_id)
+
+
+def not_found(path: str, item_id: str) -> dict:
+    """Returns the partial error the API gives for an id it can't find"""
+    resource = 'user' if path == 'users' else 'tweet'
+    return {
+        'value': item_id,
+        'detail': f'Could not find {resource} with ids: [{item_id}].',
+        'title': 'Not Found Error',
+        'resource_type': resource,
+        'parameter': 'ids',
+        'resource_id': item_id,
+        'type': 'https://api.twitter.com/2/problems/resource-not-found'
+    }
+
+
+def timeline(page_count: int, page_size: int = 3) -> Callable[[str], dict]:
+    """
+    Returns a FakeApi body builder answering a timeline of page_count pages
+
+    Install with api.body = timeline(...). Pages hold page_size tweets with ids
+    counting up from 0 and link to the next one through meta.next_token.
+    """
+
+    def body(url: str) -> dict:
+        query = parse_qs(urlsplit(url).query)
+        page = int(query.get('pagination_token', query.get('next_token', ['0']))[0])
+        data = [tweet(str(page * page_size + index)) for index in range(page_size)]
+        meta = {'result_count': page_size}
+        if page + 1 < page_count:
+            meta['next_token'] = str(page + 1)
+        return {'data': data, 'meta': meta}
+
+    return body
+
+
+class FakeApi:
+    """
+    Stands in for the __send__ method of Client and AsyncClient, recording every request
+
+    Each request gets the next scripted response while any are left: a
+    (status, headers, body) tuple, or an exception to raise. Otherwise it gets
+    a lookup body with one item per id of its ids= parameter.
+    """
+
+    def __init__(self, responses: list = (), item: Callable[[str, str, dict], dict] = default_item, missing: set[str] = (), delay: float = 0.0):
+        """
+        Args:
+            responses: Scripted responses, used up in order
+            item: Builds the JSON object of one id from the endpoint path, the id and the parsed query
+            missing: Ids answered with a not found error instead of an item
+            delay: Seconds each request stays in flight
+        """
+        self.responses = list(responses)
+        self.item = item
+        self.missing = set(missing)
+        self.delay = delay
+        self.requests: list[tuple[str, dict]] = []
+        self.lock = threading.Lock()
+
+    @property
+    def urls(self) -> list[str]:
+        with self.lock:
+            return [url for url, _ in self.requests]
+
+    def body(self, url: str) -> dict:
+        parts = urlsplit(url)
+        path = parts.path.removeprefix('/2/')
+        query = parse_qs(parts.query)
+        ids = query['ids'][0].split(',') if 'ids' in query else []
+        body = {'data': [self.item(path, item_id, query) for item_id in ids if item_id not in self.missing]}
+        errors = [not_found(path, item_id) for item_id in ids if item_id in self.missing]
+        if errors:
+            body['errors'] = errors
+        return body
+
+    def respond(self, url: str, headers: dict) -> tuple[int, dict, bytes]:
+        with self.lock:
+            self.requests.append((url, dict(headers)))
+            response = self.responses.pop(0) if self.responses else None
+        if isinstance(response, BaseException):
+            raise response
+        if response is not None:
+            return response
+        return 200, {}, json.dumps(self.body(url)).encode()
+
+    def send(self, url: str, headers: dict) -> tuple[int, dict, bytes]:
+        if self.delay:
+            time.sleep(self.delay)
+        return self.respond(url, headers)
+
+    async def send_async(self, url: str, headers: dict) -> tuple[int, dict, bytes]:
+        # Stay in flight long enough for concurrent callers to arrive
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.respond(url, headers)
+
+
+class FakeRequestsResponse:
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+
+
+class FakeRequestsSession:
+    """
+    Stands in for the requests session of a Client, so its own __send__ runs against a FakeApi
+
+    Install with client.__session__ = FakeRequestsSession(api).
+    """
+
+    def __init__(self, api: FakeApi):
+        self.api = api
+        self.closed = False
+        self.timeouts: list = []
+
+    def get(self, url: str, headers: dict = None, timeout=None, **kwargs) -> FakeRequestsResponse:
+        self.timeouts.append(timeout)
+        if self.api.delay:
+            time.sleep(self.api.delay)
+        return FakeRequestsResponse(*self.api.respond(url, headers or {}))
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeAiohttpResponse:
+    def __init__(self, status: int, headers: dict, body: bytes):
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        self.body = body
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+class FakeAiohttpRequest:
+    def __init__(self, session: 'FakeAiohttpSession', url: str, headers: dict):
+        self.session = session
+        self.url = url
+        self.headers = headers
+
+    async def __aenter__(self) -> FakeAiohttpResponse:
+        session = self.session
+        session.in_flight += 1
+        session.max_in_flight = max(session.max_in_flight, session.in_flight)
+        try:
+            if session.api.delay:
+                await asyncio.sleep(session.api.delay)
+            return FakeAiohttpResponse(*session.api.respond(self.url, self.headers))
+        finally:
+            session.in_flight -= 1
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class FakeAiohttpSession:
+    """
+    Stands in for the aiohttp session of an AsyncClient, so its own __send__ runs against a FakeApi
+
+    Install with client.__session__ = FakeAiohttpSession(api).
+    """
+
+    def __init__(self, api: FakeApi):
+        self.api = api
+        self.closed = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.timeouts: list = []
+
+    def get(self, url: str, headers: dict = None, timeout=None) -> FakeAiohttpRequest:
+        self.timeouts.append(timeout)
+        return FakeAiohttpRequest(self, url, headers or {})
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def new_client(cls: type = Client, api: FakeApi = None, **options):
+    """
+    Builds a Client or AsyncClient without a token file or password prompt
+
+    Args:
+        cls: Client or AsyncClient
+        api: Answers the client's requests in place of the X API; None keeps the real __send__
+        options: Keyword arguments of the client, e.g. object_cache
+
+    Returns:
+        The client, which the caller closes
+    """
+    with mock.patch('getpass.getpass', return_value='00'), mock.patch('eas.decrypt_from_file', return_value='token'):
+        client = cls('bearer_token.pvt', True, **options)
+    if api is not None:
+        client.__send__ = api.send if isinstance(client, Client) else api.send_async
+    return client
@@ -0,0 +1,55 @@
+import json
+from collections.abc import Callable
+
+
+# Available decoders, fastest first. Every backend returns plain dicts, lists,
+# strings, numbers, booleans and None, so from_dict methods take their output unchanged.
+backends: dict[str, Callable[[bytes | str], object]] = {}
+
+# Encoders of the same backends, each returning compact UTF-8 JSON bytes
+encoders: dict[str, Callable[[object], bytes]] = {}
+
+try:
+    import orjson
+    backends['orjson'] = orjson.loads
+    encoders['orjson'] = orjson.dumps
+except ImportError:
+    pass
+
+try:
+    import msgspec
+    backends['msgspec'] = msgspec.json.Decoder().decode
+    encoders['msgspec'] = msgspec.json.Encoder().encode
+except ImportError:
+    pass
+
+
+def json_dumps(value) -> bytes:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+backends['json'] = json.loads
+encoders['json'] = json_dumps
+
+
+backend: str = next(iter(backends))
+loads: Callable[[bytes | str], object] = backends[backend]
+dumps: Callable[[object], bytes] = encoders[backend]
+
+
+def use(name: str) -> None:
+    """
+    Selects the JSON decoder used by the clients, and the encoder of the same backend
+
+    Args:
+        name: 'orjson', 'msgspec' or 'json'
+
+    Raises:
+        ValueError: If the backend is not installed
+    """
+    global backend, loads, dumps
+    if name not in backends:
+        raise ValueError(f"JSON backend {name} is not available, installed: {', '.join(backends)}")
+    backend = name
+    loads = backends[name]
+    dumps = encoders[name]
@@ -0,0 +1,65 @@
+import importlib
+import json
+import sys
+import unittest
+from unittest import mock
+import json_backend
+
+class TestJsonBackend(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(json_backend.use, json_backend.backend)
+
+    def reload_without(self, *modules: str) -> None:
+        # A None entry in sys.modules makes importing that module raise ImportError
+        with mock.patch.dict(sys.modules, dict.fromkeys(modules)):
+            importlib.reload(json_backend)
+        self.addCleanup(importlib.reload, json_backend)
+
+    def test_fastest_backend_is_selected(self):
+        self.assertEqual(list(json_backend.backends), ['orjson', 'msgspec', 'json'])
+        self.assertEqual(list(json_backend.encoders), ['orjson', 'msgspec', 'json'])
+        self.assertEqual(json_backend.backend, 'orjson')
+        self.assertIs(json_backend.loads, json_backend.backends['orjson'])
+        self.assertIs(json_backend.dumps, json_backend.encoders['orjson'])
+
+    def test_fallback_without_orjson(self):
+        self.reload_without('orjson')
+        self.assertEqual(list(json_backend.backends), ['msgspec', 'json'])
+        self.assertEqual(json_backend.backend, 'msgspec')
+        self.assertEqual(json_backend.loads(b'{"id":"1"}'), {'id': '1'})
+
+    def test_fallback_to_the_standard_library(self):
+        self.reload_without('orjson', 'msgspec')
+        self.assertEqual(list(json_backend.backends), ['json'])
+        self.assertEqual(json_backend.backend, 'json')
+        self.assertIs(json_backend.loads, json.loads)
+        self.assertIs(json_backend.dumps, json_backend.json_dumps)
+        with self.assertRaises(ValueError):
+            json_backend.use('orjson')
+
+    def test_round_trips(self):
+        value = {'id': '1', 'text': 'café 🐦', 'count': 3, 'ratio': 0.5, 'ids': ['1', '2'], 'withheld': None, 'possibly_sensitive': False}
+        for name in json_backend.backends:
+            with self.subTest(name):
+                encoded = json_backend.encoders[name](value)
+                self.assertIsInstance(encoded, bytes)
+                # Compact UTF-8, so every backend stores the same bytes
+                self.assertEqual(encoded, json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode())
+                self.assertEqual(json_backend.backends[name](encoded), value)
+                self.assertEqual(json_backend.backends[name](encoded.decode()), value)
+
+    def test_use(self):
+        for name in json_backend.backends:
+            json_backend.use(name)
+            self.assertEqual(json_backend.backend, name)
+            self.assertIs(json_backend.loads, json_backend.backends[name])
+            self.assertIs(json_backend.dumps, json_backend.encoders[name])
+
+    def test_use_unknown_backend(self):
+        with self.assertRaises(ValueError) as raised:
+            json_backend.use('simdjson')
+        self.assertIn('simdjson', str(raised.exception))
+        self.assertEqual(json_backend.backend, 'orjson')
+
+if __name__ == '__main__':
+    unittest.main()
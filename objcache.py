@@ -0,0 +1,283 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import fields, is_dataclass
+from enum import Enum
+
+from objects.lazy import LazyModel
+from store import default_ttl, default_ttls
+
+
+def object_size(value, seen: set[int] = None) -> int:
+    """
+    Estimates the bytes held by a decoded model and everything it references
+
+    Objects referenced twice are counted once. Enums, which are shared by
+    every model, aren't counted.
+    Lazy proxies are sized by their JSON object and the attributes read so
+    far, without reading the others.
+    """
+    if seen is None:
+        seen = set()
+    if value is None or isinstance(value, (bool, Enum)) or id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float)):
+        return size
+    if isinstance(value, dict):
+        return size + sum(object_size(key, seen) + object_size(item, seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(object_size(item, seen) for item in value)
+    if isinstance(value, LazyModel):
+        # Reading the dataclass fields would decode every attribute
+        size += object_size(value.__data__, seen)
+    elif is_dataclass(value):
+        size += sum(object_size(getattr(value, field.name), seen) for field in fields(value))
+    # Lazy proxies and other objects keep their attributes in a __dict__
+    attributes = getattr(value, '__dict__', None)
+    if attributes is not None:
+        size += sys.getsizeof(attributes)
+        size += sum(object_size(item, seen) for item in attributes.values())
+    return size
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of how often keys were seen recently, with 4-bit counters
+
+    Each key increments one counter in each of 4 rows; its frequency is the
+    smallest of them, which overestimates only when every counter collides.
+    After sample_size increments every counter is halved, so keys that were
+    popular long ago fade out.
+    """
+
+    # Odd multipliers spreading the hash into a different index per row
+    seeds = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    max_count = 15
+
+    def __init__(self, width: int):
+        """
+        Args:
+            width: Counters per row, rounded up to a power of two; about the number of entries cached
+        """
+        self.width = 1 << max(width - 1, 1).bit_length()
+        self.mask = self.width - 1
+        self.sample_size = 10 * self.width
+        self.additions = 0
+        self.rows = [bytearray(self.width) for _ in self.seeds]
+        # Clears the bit each counter receives from its neighbour when a row is shifted as one integer
+        self.halve_mask = int.from_bytes(b'\x7f' * self.width, 'little')
+
+    def indexes(self, key: Hashable) -> list[int]:
+        value = hash(key) & 0xFFFFFFFFFFFFFFFF
+        return [((value * seed) & 0xFFFFFFFFFFFFFFFF) >> 32 & self.mask for seed in self.seeds]
+
+    def frequency(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self.rows, self.indexes(key)))
+
+    def increment(self, key: Hashable) -> None:
+        added = False
+        for row, index in zip(self.rows, self.indexes(key)):
+            if row[index] < self.max_count:
+                row[index] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self.age()
+
+    def age(self) -> None:
+        """Halves every counter"""
+        for row in self.rows:
+            row[:] = ((int.from_bytes(row, 'little') >> 1) & self.halve_mask).to_bytes(self.width, 'little')
+        self.additions //= 2
+
+
+class ObjectCache:
+    """
+    In-memory cache of decoded objects bounded by their estimated size, with W-TinyLFU admission
+
+    New objects enter a small LRU window. Objects pushed out of the window only
+    enter the main cache if they were requested more often, according to a
+    frequency sketch, than the objects they would evict, so a scan of one-off
+    ids can't flush the objects that are used over and over. The main cache is
+    a segmented LRU: objects hit while on probation move to the protected
+    segment. Objects expire like those of a LookupStore, after the shortest
+    TTL of the fields they were requested with. Thread safe. Cached objects
+    are shared between callers and must not be modified.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, expected_entries: int = 100_000, window_ratio: float = 0.01, protected_ratio: float = 0.8, ttls: dict[str, float] = None, ttl: float = default_ttl):
+        """
+        Args:
+            max_bytes: Memory budget for cached objects, as estimated by object_size
+            expected_entries: About how many objects fit, sizes the frequency sketch
+            window_ratio: Share of max_bytes for the admission window
+            protected_ratio: Share of the main cache for objects hit more than once
+            ttls: Seconds objects requested with a field stay fresh, by field name,
+                merged over store.default_ttls
+            ttl: Seconds for fields without a TTL of their own
+        """
+        self.max_bytes = max_bytes
+        self.ttls = {**default_ttls, **(ttls or {})}
+        self.ttl = ttl
+        self.window_bytes = max(int(max_bytes * window_ratio), 1)
+        self.protected_bytes = int((max_bytes - self.window_bytes) * protected_ratio)
+        self.sketch = FrequencySketch(expected_entries)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.expirations = 0
+        # Segments map keys to (value, size, expires_at), least recently used first
+        self.__window__: OrderedDict[Hashable, tuple[object, int, float]] = OrderedDict()
+        self.__probation__: OrderedDict[Hashable, tuple[object, int, float]] = OrderedDict()
+        self.__protected__: OrderedDict[Hashable, tuple[object, int, float]] = OrderedDict()
+        self.__sizes__ = {'window': 0, 'probation': 0, 'protected': 0}
+        self.__lock__ = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__window__) + len(self.__probation__) + len(self.__protected__)
+
+    @property
+    def size(self) -> int:
+        """Estimated bytes of the cached objects"""
+        return sum(self.__sizes__.values())
+
+    def lifetime(self, fields: Iterable[str]) -> float:
+        """Returns the seconds an object requested with fields stays fresh"""
+        return min((self.ttls.get(field, self.ttl) for field in fields), default=self.ttl)
+
+    def get(self, key: Hashable):
+        """Returns the object cached under key, None if there is none or it expired"""
+        with self.__lock__:
+            self.sketch.increment(key)
+            if key in self.__window__:
+                self.__window__.move_to_end(key)
+                entry = self.__window__[key]
+            elif key in self.__protected__:
+                self.__protected__.move_to_end(key)
+                entry = self.__protected__[key]
+            elif key in self.__probation__:
+                entry = self.__probation__.pop(key)
+                self.__sizes__['probation'] -= entry[1]
+                self.__protect__(key, entry)
+            else:
+                self.misses += 1
+                return None
+            if entry[2] <= time.monotonic():
+                self.__remove__(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value, size: int = None, ttl: float = None) -> None:
+        """
+        Caches an object
+
+        Args:
+            key: Key of the object, e.g. ('tweets', fields, id)
+            value: Object to cache
+            size: Bytes the object holds, estimated with object_size when None
+            ttl: Seconds the object stays fresh, e.g. lifetime(fields); the cache's ttl when None
+        """
+        if size is None:
+            size = object_size(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.__lock__:
+            self.__remove__(key)
+            self.__window__[key] = (value, size, expires_at)
+            self.__sizes__['window'] += size
+            while self.__sizes__['window'] > self.window_bytes and len(self.__window__) > 1:
+                candidate, entry = self.__window__.popitem(last=False)
+                self.__sizes__['window'] -= entry[1]
+                self.__admit__(candidate, entry)
+            self.__shrink__()
+
+    def __remove__(self, key: Hashable) -> None:
+        for name, segment in (('window', self.__window__), ('probation', self.__probation__), ('protected', self.__protected__)):
+            entry = segment.pop(key, None)
+            if entry is not None:
+                self.__sizes__[name] -= entry[1]
+                return
+
+    def __protect__(self, key: Hashable, entry: tuple[object, int, float]) -> None:
+        self.__protected__[key] = entry
+        self.__sizes__['protected'] += entry[1]
+        # Objects pushed out of the protected segment get another chance on probation
+        while self.__sizes__['protected'] > self.protected_bytes and self.__protected__:
+            demoted, demoted_entry = self.__protected__.popitem(last=False)
+            self.__sizes__['protected'] -= demoted_entry[1]
+            self.__probation__[demoted] = demoted_entry
+            self.__sizes__['probation'] += demoted_entry[1]
+
+    def __admit__(self, candidate: Hashable, entry: tuple[object, int, float]) -> None:
+        """Moves an object out of the window into the main cache if it's used more than what it would evict"""
+        excess = self.size + entry[1] - self.max_bytes
+        if excess > 0:
+            frequency = self.sketch.frequency(candidate)
+            victims = []
+            for segment in (self.__probation__, self.__protected__):
+                for key, (_, size, _) in segment.items():
+                    if excess <= 0:
+                        break
+                    if self.sketch.frequency(key) >= frequency:
+                        self.rejections += 1
+                        return
+                    victims.append((segment, key))
+                    excess -= size
+            if excess > 0:
+                self.rejections += 1
+                return
+            for segment, key in victims:
+                self.__remove__(key)
+                self.evictions += 1
+        self.__probation__[candidate] = entry
+        self.__sizes__['probation'] += entry[1]
+
+    def __shrink__(self) -> None:
+        # Only needed when the window holds one object bigger than its share
+        while self.size > self.max_bytes and self.__probation__:
+            _, (_, size, _) = self.__probation__.popitem(last=False)
+            self.__sizes__['probation'] -= size
+            self.evictions += 1
+
+    def purge(self) -> int:
+        """Drops the objects that expired and returns how many were dropped"""
+        now = time.monotonic()
+        with self.__lock__:
+            expired = [key for segment in (self.__window__, self.__probation__, self.__protected__) for key, entry in segment.items() if entry[2] <= now]
+            for key in expired:
+                self.__remove__(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def clear(self) -> None:
+        with self.__lock__:
+            self.__window__.clear()
+            self.__probation__.clear()
+            self.__protected__.clear()
+            self.__sizes__ = dict.fromkeys(self.__sizes__, 0)
+
+    def stats(self) -> dict[str, float]:
+        """Returns hit and miss counts, the hit ratio, evicted, rejected and expired objects, entries and bytes"""
+        with self.__lock__:
+            requests = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "rejections": self.rejections,
+                "expirations": self.expirations,
+                "entries": len(self),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes
+            }
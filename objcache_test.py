@@ -0,0 +1,174 @@
+import sys
+import unittest
+from unittest import mock
+import objcache
+from fake_api import FakeApi, new_client, tweet
+from objcache import FrequencySketch, ObjectCache, object_size
+from objects.fields import Field, TweetField
+from objects.lazy import lazy
+from objects.tweet import Tweet
+
+class TestObjectSize(unittest.TestCase):
+    def setUp(self):
+        self.data = {
+            'id': '1',
+            'text': 'hello',
+            'edit_history_tweet_ids': ['1'],
+            'created_at': '2024-03-14T09:26:53.000Z',
+            'public_metrics': {'retweet_count': 1, 'reply_count': 2, 'like_count': 3, 'quote_count': 4}
+        }
+
+    def test_shared_objects_count_once(self):
+        text = 'x' * 100
+        self.assertEqual(object_size([text, text]), sys.getsizeof([text, text]) + sys.getsizeof(text))
+
+    def test_lazy_proxy_is_not_decoded(self):
+        proxy = lazy(Tweet, self.data)
+        size = object_size(proxy)
+        self.assertNotIn('created_at', proxy.__dict__)
+        self.assertNotIn('public_metrics', proxy.__dict__)
+        # The JSON object is what the proxy holds
+        self.assertGreaterEqual(size, object_size(self.data))
+        proxy.public_metrics
+        self.assertGreater(object_size(proxy), size)
+
+class TestFrequencySketch(unittest.TestCase):
+    def test_frequency(self):
+        sketch = FrequencySketch(64)
+        for _ in range(5):
+            sketch.increment('hot')
+        sketch.increment('cold')
+        self.assertEqual(sketch.frequency('hot'), 5)
+        self.assertEqual(sketch.frequency('cold'), 1)
+        self.assertEqual(sketch.frequency('never'), 0)
+        for _ in range(20):
+            sketch.increment('hot')
+        self.assertEqual(sketch.frequency('hot'), FrequencySketch.max_count)
+
+    def test_aging(self):
+        sketch = FrequencySketch(64)
+        for _ in range(9):
+            sketch.increment('old')
+        sketch.age()
+        self.assertEqual(sketch.frequency('old'), 4)
+        # Counters are halved on their own once sample_size increments were counted
+        with mock.patch.object(sketch, 'age', wraps=sketch.age) as age:
+            key = 0
+            while not age.called:
+                sketch.increment(key)
+                key += 1
+        self.assertEqual(sketch.additions, sketch.sample_size // 2)
+        self.assertTrue(all(count <= FrequencySketch.max_count // 2 for row in sketch.rows for count in row))
+
+class TestObjectCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(objcache.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_byte_accounting(self):
+        cache = ObjectCache(max_bytes=1000, expected_entries=16)
+        cache.put('a', 'A', size=100)
+        cache.put('b', 'B', size=200)
+        self.assertEqual(cache.size, 300)
+        # Replacing an object drops the size of the old one
+        cache.put('a', 'A2', size=150)
+        self.assertEqual(cache.size, 350)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 'A2')
+        # Objects bigger than the whole cache aren't kept
+        cache.put('huge', 'H', size=2000)
+        self.assertIsNone(cache.get('huge'))
+        for index in range(20):
+            cache.put(index, index, size=100)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+        self.assertGreater(cache.stats()['evictions'] + cache.stats()['rejections'], 0)
+        cache.clear()
+        self.assertEqual((cache.size, len(cache)), (0, 0))
+
+    def test_scan_does_not_evict_hot_keys(self):
+        cache = ObjectCache(max_bytes=1000, expected_entries=1000)
+        hot = [f'hot{index}' for index in range(10)]
+        for key in hot:
+            cache.get(key)
+            cache.put(key, key, size=10)
+        # Push the last hot key out of the one-object window into the main cache
+        cache.put('filler', None, size=10)
+        # A scan of one-off keys, each looked up and cached once as a lookup does,
+        # while the hot keys keep being read
+        for index in range(1000):
+            if index % 100 == 0:
+                self.assertEqual([cache.get(key) for key in hot], hot)
+            cache.get(f'scan{index}')
+            cache.put(f'scan{index}', index, size=10)
+        self.assertEqual([cache.get(key) for key in hot], hot)
+        self.assertLessEqual(cache.size, cache.max_bytes)
+        self.assertGreater(cache.stats()['rejections'], 0)
+
+    def test_expiry(self):
+        cache = ObjectCache(max_bytes=1000, ttls={'lang': 60}, ttl=600)
+        self.assertEqual(cache.lifetime(['lang', 'source']), 60)
+        self.assertEqual(cache.lifetime(['public_metrics']), 5 * 60)
+        self.assertEqual(cache.lifetime([]), 600)
+        cache.put('short', 'S', size=10, ttl=cache.lifetime(['lang']))
+        cache.put('long', 'L', size=10)
+        self.now += 61
+        self.assertIsNone(cache.get('short'))
+        self.assertEqual(cache.get('long'), 'L')
+        self.assertEqual(cache.size, 10)
+        self.now += 600
+        self.assertEqual(cache.purge(), 1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['expirations'], 2)
+
+    def test_stats(self):
+        cache = ObjectCache(max_bytes=1000)
+        cache.put('a', 'A', size=100)
+        cache.get('a')
+        cache.get('a')
+        cache.get('b')
+        self.assertEqual(cache.stats(), {
+            'hits': 2,
+            'misses': 1,
+            'hit_ratio': 2 / 3,
+            'evictions': 0,
+            'rejections': 0,
+            'expirations': 0,
+            'entries': 1,
+            'bytes': 100,
+            'max_bytes': 1000
+        })
+
+class TestClientObjectCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(objcache.time, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ObjectCache()
+        metrics = {'retweet_count': 0, 'reply_count': 0, 'like_count': 0, 'quote_count': 0}
+        self.api = FakeApi(item=lambda path, item_id, query: tweet(item_id, public_metrics=metrics))
+        self.client = new_client(api=self.api, object_cache=self.cache)
+
+    def tearDown(self):
+        self.client.close()
+
+    @property
+    def sent(self) -> list[str]:
+        return self.api.urls
+
+    def test_objects_expire_by_field_ttl(self):
+        metrics = {Field.TWEET: [TweetField.PUBLIC_METRICS]}
+        first = self.client.lookup_tweets(['1'], metrics).data[0]
+        self.client.lookup_tweets(['1'])
+        self.assertIs(self.client.lookup_tweets(['1'], metrics).data[0], first)
+        self.assertEqual(len(self.sent), 2)
+        # Metrics go stale after five minutes, default fields last longer
+        self.now += 5 * 60 + 1
+        self.assertIsNot(self.client.lookup_tweets(['1'], metrics).data[0], first)
+        self.client.lookup_tweets(['1'])
+        self.assertEqual(len(self.sent), 3)
+
+if __name__ == '__main__':
+    unittest.main()
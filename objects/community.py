@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from objects.timestamps import parse_time
 
 class CommunityAccess(Enum):
     PUBLIC = "Public"
@@ -13,7 +14,7 @@ class CommunityJoinPolicy(Enum):
     RESTRICTED_JOIN_REQUESTS_REQUIRE_MODERATOR_APPROVAL = "RestrictedJoinRequestsRequireModeratorApproval"
     SUPER_FOLLOW_REQUIRED = "SuperFollowRequired"
 
-@dataclass
+@dataclass(slots=True)
 class Community:
     # Required fields
     id: str
@@ -28,17 +29,20 @@ class Community:
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Community':
-        # Convert datetime string
-        created_at = datetime.strptime(
-            data['created_at'],
-            '%Y-%m-%dT%H:%M:%S.%fZ'
-        )
+        # Convert datetime string if requested
+        created_at = None
+        if 'created_at' in data and data['created_at']:
+            created_at = parse_time(data['created_at'])
         
-        # Convert access string to enum
-        access = CommunityAccess(data['access'])
+        # Convert access string to enum if requested
+        access = None
+        if 'access' in data and data['access']:
+            access = CommunityAccess(data['access'])
         
-        # Convert join_policy string to enum
-        join_policy = CommunityJoinPolicy(data['join_policy'])
+        # Convert join_policy string to enum if requested
+        join_policy = None
+        if 'join_policy' in data and data['join_policy']:
+            join_policy = CommunityJoinPolicy(data['join_policy'])
         
         return cls(
             id=data['id'],
@@ -46,7 +50,7 @@ class Community:
             created_at=created_at,
             access=access,
             join_policy=join_policy,
-            member_count=data['member_count'],
+            member_count=data.get('member_count'),
             description=data.get('description')
         )
 
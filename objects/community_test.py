@@ -1,5 +1,5 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from community import Community, CommunityAccess, CommunityJoinPolicy
 
 class TestCommunity(unittest.TestCase):
@@ -25,7 +25,7 @@ class TestCommunity(unittest.TestCase):
         self.assertEqual(self.community.member_count, 1000)
         
         # Test datetime conversion
-        expected_dt = datetime(2023, 1, 1, 12, 0, 0)
+        expected_dt = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
         self.assertEqual(self.community.created_at, expected_dt)
         self.assertIsInstance(self.community.created_at, datetime)
 
@@ -109,7 +109,8 @@ class TestCommunity(unittest.TestCase):
 
     def test_missing_required_fields(self):
         """Test that missing required fields raise appropriate errors"""
-        required_fields = ['id', 'name', 'access', 'join_policy', 'member_count', 'created_at']
+        # The fields the API returns without community.fields
+        required_fields = ['id', 'name']
         
         for field in required_fields:
             invalid_data = self.community_data.copy()
@@ -0,0 +1,237 @@
+from dataclasses import MISSING, dataclass, fields as dataclass_fields
+from enum import Enum
+from functools import lru_cache
+from collections.abc import Callable, Iterable
+from objects.fields import Field
+from objects.intern import intern_str
+from objects.media import Media, MediaMetrics, MediaType, MediaVariant
+from objects.timestamps import parse_time
+from objects.tweet import (
+    ContextAnnotation, EditControls, Entities, NonPublicMetrics, OrganicMetrics, PromotedMetrics,
+    PublicMetrics, ReferencedTweet, Tweet, Withheld
+)
+from objects.user import User, UserEntities, UserPublicMetrics, Withheld as UserWithheld
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """
+    How one model attribute is read from the JSON object
+
+    Args:
+        convert: Expression building the attribute from its JSON value,
+            written around {} where the value goes; None keeps the value as is
+        always: The API returns the key whenever the field is requested,
+            otherwise it may be left out, e.g. entities of a tweet without any
+    """
+    convert: str | None = None
+    always: bool = True
+
+
+# Attributes of each model by JSON key, in declaration order
+tweet_specs = {
+    'id': FieldSpec(),
+    'text': FieldSpec(),
+    'edit_history_tweet_ids': FieldSpec(),
+    'attachments': FieldSpec(always=False),
+    'author_id': FieldSpec(),
+    'context_annotations': FieldSpec('[ContextAnnotation.from_dict(item) for item in {}]', always=False),
+    'conversation_id': FieldSpec(),
+    'created_at': FieldSpec('parse_time({})'),
+    'edit_controls': FieldSpec('EditControls.from_dict({})', always=False),
+    'entities': FieldSpec('Entities.from_dict({})', always=False),
+    'in_reply_to_user_id': FieldSpec(always=False),
+    'lang': FieldSpec('intern_str({})'),
+    'non_public_metrics': FieldSpec('NonPublicMetrics(**{})', always=False),
+    'organic_metrics': FieldSpec('OrganicMetrics(**{})', always=False),
+    'possibly_sensitive': FieldSpec(),
+    'promoted_metrics': FieldSpec('PromotedMetrics(**{})', always=False),
+    'public_metrics': FieldSpec('PublicMetrics(**{})'),
+    'referenced_tweets': FieldSpec('[ReferencedTweet.from_dict(item) for item in {}]', always=False),
+    'reply_settings': FieldSpec('intern_str({})'),
+    'withheld': FieldSpec('Withheld(**{})', always=False),
+    'geo': FieldSpec(always=False)
+}
+
+user_specs = {
+    'id': FieldSpec(),
+    'name': FieldSpec(),
+    'username': FieldSpec(),
+    'connection_status': FieldSpec(always=False),
+    'created_at': FieldSpec('parse_time({})'),
+    'description': FieldSpec(),
+    'entities': FieldSpec('UserEntities.from_dict({})', always=False),
+    'location': FieldSpec(always=False),
+    'pinned_tweet_id': FieldSpec(always=False),
+    'profile_image_url': FieldSpec(),
+    'protected': FieldSpec(),
+    'public_metrics': FieldSpec('UserPublicMetrics(**{})'),
+    'url': FieldSpec(always=False),
+    'verified': FieldSpec(),
+    'withheld': FieldSpec('UserWithheld(**{})', always=False)
+}
+
+media_specs = {
+    'media_key': FieldSpec(),
+    'type': FieldSpec('MediaType({})'),
+    'url': FieldSpec(always=False),
+    'duration_ms': FieldSpec(always=False),
+    'height': FieldSpec(always=False),
+    'non_public_metrics': FieldSpec('MediaMetrics.from_dict({})', always=False),
+    'organic_metrics': FieldSpec('MediaMetrics.from_dict({})', always=False),
+    'preview_image_url': FieldSpec(always=False),
+    'promoted_metrics': FieldSpec('MediaMetrics.from_dict({})', always=False),
+    'public_metrics': FieldSpec(always=False),
+    'width': FieldSpec(always=False),
+    'alt_text': FieldSpec(always=False),
+    'variants': FieldSpec('[MediaVariant.from_dict(item) for item in {}]', always=False)
+}
+
+# Specs, query field set and default fields of each model with compiled decoders
+models: dict[type, tuple[dict[str, FieldSpec], Field, tuple[str, ...]]] = {
+    Tweet: (tweet_specs, Field.TWEET, ('id', 'text', 'edit_history_tweet_ids')),
+    User: (user_specs, Field.USER, ('id', 'name', 'username')),
+    Media: (media_specs, Field.MEDIA, ('media_key', 'type'))
+}
+
+# Keys an expansion makes the API return on the objects it expands from,
+# whether or not their field was requested, by expansion value and model
+expansion_keys: dict[str, tuple[type, tuple[str, ...]]] = {
+    'author_id': (Tweet, ('author_id',)),
+    'referenced_tweets.id': (Tweet, ('referenced_tweets',)),
+    # Referenced tweets in includes carry their author_id
+    'referenced_tweets.id.author_id': (Tweet, ('referenced_tweets', 'author_id')),
+    'in_reply_to_user_id': (Tweet, ('in_reply_to_user_id',)),
+    'attachments.media_keys': (Tweet, ('attachments',)),
+    'attachments.poll_ids': (Tweet, ('attachments',)),
+    'geo.place_id': (Tweet, ('geo',)),
+    'entities.mentions.username': (Tweet, ('entities',)),
+    'pinned_tweet_id': (User, ('pinned_tweet_id',))
+}
+
+# Names the generated code can refer to
+namespace = {
+    'parse_time': parse_time,
+    'intern_str': intern_str,
+    'ContextAnnotation': ContextAnnotation,
+    'EditControls': EditControls,
+    'Entities': Entities,
+    'NonPublicMetrics': NonPublicMetrics,
+    'OrganicMetrics': OrganicMetrics,
+    'PromotedMetrics': PromotedMetrics,
+    'PublicMetrics': PublicMetrics,
+    'ReferencedTweet': ReferencedTweet,
+    'Withheld': Withheld,
+    'UserEntities': UserEntities,
+    'UserPublicMetrics': UserPublicMetrics,
+    'UserWithheld': UserWithheld,
+    'MediaMetrics': MediaMetrics,
+    'MediaType': MediaType,
+    'MediaVariant': MediaVariant
+}
+
+
+def missing_fields(model: type, keys: frozenset[str], data: dict) -> ValueError:
+    missing = ', '.join(sorted(keys.difference(data)))
+    return ValueError(f"{model.__name__} {data.get('id', data.get('media_key'))} is missing requested fields: {missing}")
+
+
+def implied_keys(model: type, expansions: Iterable[Enum | str] | None) -> frozenset[str]:
+    """Returns the keys of model that the expansions make the API return"""
+    keys = set()
+    for expansion in expansions or ():
+        implied = expansion_keys.get(expansion.value if isinstance(expansion, Enum) else expansion)
+        if implied is not None and implied[0] is model:
+            keys.update(implied[1])
+    return frozenset(keys)
+
+
+def decoder_source(model: type, keys: frozenset[str] | None, trusted: bool, optional: frozenset[str] = frozenset()) -> str:
+    """
+    Returns the source of a decode(data) function reading exactly keys, every key when None
+
+    Keys in optional are read when present, without being checked, e.g. those implied by expansions.
+    """
+    specs, _, defaults = models[model]
+    required = {field.name for field in dataclass_fields(model) if field.default is MISSING and field.default_factory is MISSING}
+    arguments = []
+    checked = []
+    for key, spec in specs.items():
+        if keys is not None and key not in keys and key not in defaults and key not in optional:
+            if key in required:
+                arguments.append(f"{key}=None")
+            continue
+        if keys is not None and spec.always and key not in optional:
+            value = f"data[{key!r}]"
+            arguments.append(f"{key}={spec.convert.format(value) if spec.convert else value}")
+            checked.append(key)
+        elif spec.convert:
+            arguments.append(f"{key}=({spec.convert.format('value')} if (value := data.get({key!r})) is not None else None)")
+        else:
+            arguments.append(f"{key}=data.get({key!r})")
+    lines = [f"checked = frozenset({tuple(checked)!r})", "", "def decode(data):"]
+    if checked and not trusted:
+        lines.append("    if not data.keys() >= checked:")
+        lines.append("        raise missing_fields(Model, checked, data)")
+    lines.append("    return Model(")
+    lines.append(",\n".join(f"        {argument}" for argument in arguments))
+    lines.append("    )")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=256)
+def compile_decoder(model: type, keys: frozenset[str] | None, trusted: bool, optional: frozenset[str] = frozenset()) -> Callable[[dict], object]:
+    source = decoder_source(model, keys, trusted, optional)
+    scope = dict(namespace, Model=model, missing_fields=missing_fields)
+    exec(compile(source, f"<{model.__name__} decoder>", 'exec'), scope)
+    decode = scope['decode']
+    decode.__source__ = source
+    return decode
+
+
+def decoder(model: type, fields: Iterable[Enum | str] | None = None, trusted: bool = False, expansions: Iterable[Enum | str] | None = None) -> Callable[[dict], object]:
+    """
+    Returns a decoder specialized for the fields requested from the API
+
+    The decoder only reads the requested keys, the model's default fields and
+    the keys the expansions make the API return, e.g. author_id for the author_id
+    expansion; every other attribute is left None without looking it up.
+    Decoders are generated once per model, field set and mode, then shared.
+
+    Args:
+        model: Tweet, User or Media; other models fall back to their from_dict
+        fields: Requested values of the model's field set, e.g. [TweetField.LANG];
+            None when unknown, which reads every key that is present
+        trusted: Skip checking that fields the API always returns are there,
+            for data known to come from a request with these fields, e.g. archives
+        expansions: Expansions requested along with the fields, e.g. [TweetPayloadExpansion.AUTHOR_ID]
+
+    Returns:
+        Function turning one JSON object into a model instance
+    """
+    if model not in models:
+        return model.from_dict
+    if fields is None:
+        return compile_decoder(model, None, trusted)
+    keys = frozenset(field.value if isinstance(field, Enum) else field for field in fields)
+    return compile_decoder(model, keys, trusted, implied_keys(model, expansions) - keys)
+
+
+def field_decoder(model: type, fields: dict | None, trusted: bool = False, expansions: Iterable[Enum | str] | None = None) -> Callable[[dict], object]:
+    """
+    Returns the decoder of a model for a whole fields argument
+
+    Args:
+        model: Model to decode into
+        fields: Requested fields by field set, as in ArgFields; None when unknown
+        trusted: Skip checking that fields the API always returns are there
+        expansions: Expansions requested along with the fields
+
+    Returns:
+        Function turning one JSON object into a model instance
+    """
+    if model not in models:
+        return model.from_dict
+    if fields is None:
+        return decoder(model, None, trusted)
+    return decoder(model, fields.get(models[model][1], ()), trusted, expansions)
@@ -0,0 +1,124 @@
+import unittest
+from datetime import datetime, timezone
+# Models come through decoders so they are the classes it was compiled against
+from decoders import Field, Media, Tweet, User, decoder, field_decoder
+from expansions import TweetPayloadExpansion, UserPayloadExpansion
+from fields import MediaField, TweetField, UserField
+
+class TestDecoders(unittest.TestCase):
+    def setUp(self):
+        self.tweet_data = {
+            'id': '1460323737035677698',
+            'text': 'Introducing a new era for the Twitter Developer Platform!',
+            'edit_history_tweet_ids': ['1460323737035677698'],
+            'author_id': '2244994945',
+            'created_at': '2021-11-15T19:08:05.000Z',
+            'lang': 'en',
+            'possibly_sensitive': False,
+            'public_metrics': {
+                'retweet_count': 1,
+                'reply_count': 2,
+                'like_count': 3,
+                'quote_count': 4
+            },
+            'referenced_tweets': [{'type': 'quoted', 'id': '1460323737035677697'}],
+            'edit_controls': {
+                'edits_remaining': 5,
+                'is_edit_eligible': True,
+                'editable_until': '2021-11-15T19:38:05.000Z'
+            },
+            'context_annotations': [{
+                'domain': {'id': '46', 'name': 'Business Taxonomy', 'description': 'Categories'},
+                'entity': {'id': '1557696848252391426', 'name': 'Technology'}
+            }]
+        }
+        self.user_data = {
+            'id': '2244994945',
+            'name': 'X Developers',
+            'username': 'XDevelopers',
+            'created_at': '2013-12-14T04:35:55.000Z',
+            'public_metrics': {
+                'followers_count': 1,
+                'following_count': 2,
+                'tweet_count': 3,
+                'listed_count': 4
+            }
+        }
+
+    def test_default_fields(self):
+        tweet = decoder(Tweet, [])(self.tweet_data)
+        self.assertEqual(tweet.id, '1460323737035677698')
+        self.assertEqual(tweet.edit_history_tweet_ids, ['1460323737035677698'])
+        # Present in the data but not requested
+        self.assertIsNone(tweet.author_id)
+        self.assertIsNone(tweet.created_at)
+        self.assertIsNone(tweet.lang)
+        self.assertIsNone(tweet.public_metrics)
+
+    def test_requested_fields(self):
+        fields = [TweetField.CREATED_AT, TweetField.PUBLIC_METRICS, TweetField.REFERENCED_TWEETS, TweetField.ENTITIES]
+        tweet = decoder(Tweet, fields)(self.tweet_data)
+        self.assertEqual(tweet.created_at, datetime(2021, 11, 15, 19, 8, 5, tzinfo=timezone.utc))
+        self.assertEqual(tweet.public_metrics.like_count, 3)
+        self.assertEqual(tweet.referenced_tweets[0].reference_type, 'quoted')
+        # Requested but left out by the API
+        self.assertIsNone(tweet.entities)
+        self.assertIsNone(tweet.lang)
+
+    def test_matches_from_dict(self):
+        self.assertEqual(decoder(Tweet)(self.tweet_data), Tweet.from_dict(self.tweet_data))
+        fields = [TweetField(key) for key in self.tweet_data if key not in ('id', 'text', 'edit_history_tweet_ids')]
+        self.assertEqual(decoder(Tweet, fields)(self.tweet_data), Tweet.from_dict(self.tweet_data))
+
+    def test_missing_requested_field(self):
+        data = dict(self.tweet_data)
+        del data['lang']
+        with self.assertRaises(ValueError):
+            decoder(Tweet, [TweetField.LANG])(data)
+        with self.assertRaises(KeyError):
+            decoder(Tweet, [TweetField.LANG], trusted=True)(data)
+
+    def test_expansion_keys(self):
+        expansions = [TweetPayloadExpansion.AUTHOR_ID, 'referenced_tweets.id', UserPayloadExpansion.PINNED_TWEET_ID]
+        tweet = decoder(Tweet, [], expansions=expansions)(self.tweet_data)
+        # The API returns the keys the expansions refer to without their fields being requested
+        self.assertEqual(tweet.author_id, '2244994945')
+        self.assertEqual(tweet.referenced_tweets[0].id, '1460323737035677697')
+        self.assertIsNone(tweet.created_at)
+        # They're read when present, not required
+        data = dict(self.tweet_data)
+        del data['author_id'], data['referenced_tweets']
+        tweet = decoder(Tweet, [], expansions=expansions)(data)
+        self.assertIsNone(tweet.author_id)
+        self.assertIsNone(tweet.referenced_tweets)
+        user = decoder(User, [], expansions=expansions)(dict(self.user_data, pinned_tweet_id='1'))
+        self.assertEqual(user.pinned_tweet_id, '1')
+        self.assertIsNone(user.created_at)
+        # Requested fields are still checked
+        with self.assertRaises(ValueError):
+            decoder(Tweet, [TweetField.AUTHOR_ID], expansions=expansions)(data)
+
+    def test_cached(self):
+        self.assertIs(decoder(Tweet, [TweetField.LANG]), decoder(Tweet, ['lang']))
+        self.assertIsNot(decoder(Tweet, [TweetField.LANG]), decoder(Tweet, [TweetField.LANG], trusted=True))
+
+    def test_user(self):
+        user = decoder(User, [UserField.CREATED_AT, UserField.PUBLIC_METRICS])(self.user_data)
+        self.assertEqual(user.username, 'XDevelopers')
+        self.assertEqual(user.public_metrics.followers_count, 1)
+        self.assertIsNone(user.entities)
+        self.assertIsNone(user.verified)
+
+    def test_media(self):
+        media = decoder(Media, [MediaField.WIDTH])({'media_key': '3_1', 'type': 'photo', 'width': 1920})
+        self.assertEqual(media.type.value, 'photo')
+        self.assertEqual(media.width, 1920)
+        self.assertIsNone(media.height)
+
+    def test_field_decoder(self):
+        decode = field_decoder(Tweet, {Field.TWEET: [TweetField.LANG], Field.USER: [UserField.VERIFIED]})
+        self.assertIs(decode, decoder(Tweet, [TweetField.LANG]))
+        self.assertIs(field_decoder(User, {}), decoder(User, []))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,22 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from objects.timestamps import parse_time
 
 class EventType(Enum):
     MESSAGE_CREATE = "MessageCreate"
     PARTICIPANTS_JOIN = "ParticipantsJoin"
     PARTICIPANTS_LEAVE = "ParticipantsLeave"
 
-@dataclass
+@dataclass(slots=True)
 class ReferencedTweet:
     id: str
 
-@dataclass
+@dataclass(slots=True)
 class Attachments:
     media_keys: list[str]
 
-@dataclass
+@dataclass(slots=True)
 class DirectMessageEvent:
     # Required fields
     id: str
@@ -35,11 +36,10 @@ class DirectMessageEvent:
         # Convert event_type string to enum
         event_type = EventType(data['event_type'])
         
-        # Convert datetime string
-        created_at = datetime.strptime(
-            data['created_at'],
-            '%Y-%m-%dT%H:%M:%S.%fZ'
-        )
+        # Convert datetime string if requested
+        created_at = None
+        if 'created_at' in data and data['created_at']:
+            created_at = parse_time(data['created_at'])
         
         # Convert referenced tweets if present
         referenced_tweets = None
@@ -59,8 +59,8 @@ class DirectMessageEvent:
         return cls(
             id=data['id'],
             event_type=event_type,
-            sender_id=data['sender_id'],
-            dm_conversation_id=data['dm_conversation_id'],
+            sender_id=data.get('sender_id'),
+            dm_conversation_id=data.get('dm_conversation_id'),
             created_at=created_at,
             text=data.get('text'),
             participant_ids=data.get('participant_ids'),
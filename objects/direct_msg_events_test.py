@@ -1,5 +1,5 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from direct_msg_events import DirectMessageEvent, EventType, ReferencedTweet, Attachments
 
 class TestDirectMessageEvent(unittest.TestCase):
@@ -31,7 +31,7 @@ class TestDirectMessageEvent(unittest.TestCase):
         self.assertEqual(self.event.dm_conversation_id, '1584988213961031680')
         
         # Test datetime conversion
-        expected_dt = datetime(2019, 6, 4, 23, 12, 8)
+        expected_dt = datetime(2019, 6, 4, 23, 12, 8, tzinfo=timezone.utc)
         self.assertEqual(self.event.created_at, expected_dt)
 
     def test_referenced_tweets(self):
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Errors:
     # All fields are optional
     client_id: str | None = None
@@ -10,6 +10,11 @@ class Errors:
     detail: str | None = None
     reason: str | None = None
     error_type: str | None = None
+    # Partial errors of lookups name the resource that failed
+    value: str | None = None
+    parameter: str | None = None
+    resource_type: str | None = None
+    resource_id: str | None = None
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Errors':
@@ -22,5 +27,9 @@ class Errors:
             title=data.get('title'),
             detail=data.get('detail'),
             reason=data.get('reason'),
-            error_type=data.get('type')
+            error_type=data.get('type'),
+            value=data.get('value'),
+            parameter=data.get('parameter'),
+            resource_type=data.get('resource_type'),
+            resource_id=data.get('resource_id')
         )
@@ -29,6 +29,23 @@ class TestErrors(unittest.TestCase):
         self.assertEqual(self.error.reason, 'client-not-enrolled')
         self.assertEqual(self.error.error_type, 'https://api.x.com/2/problems/client-forbidden')
 
+    def test_resource_error(self):
+        """Test partial error of a lookup naming the missing resource"""
+        error = Errors.from_dict({
+            'value': '1228393702244134912',
+            'detail': 'Could not find tweet with ids: [1228393702244134912].',
+            'title': 'Not Found Error',
+            'resource_type': 'tweet',
+            'parameter': 'ids',
+            'resource_id': '1228393702244134912',
+            'type': 'https://api.twitter.com/2/problems/resource-not-found'
+        })
+        self.assertEqual(error.title, 'Not Found Error')
+        self.assertEqual(error.value, '1228393702244134912')
+        self.assertEqual(error.parameter, 'ids')
+        self.assertEqual(error.resource_type, 'tweet')
+        self.assertEqual(error.resource_id, '1228393702244134912')
+
     def test_empty_error(self):
         """Test error creation with empty data"""
         empty_error = Errors.from_dict({})
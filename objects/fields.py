@@ -50,6 +50,7 @@ class TweetField(Enum):
     REFERENCED_TWEETS = "referenced_tweets"
     REPLY_SETTINGS = "reply_settings"
     WITHHELD = "withheld"
+    GEO = "geo"
         
     @classmethod
     def optional_fields(cls) -> List[str]:
@@ -70,7 +71,8 @@ class TweetField(Enum):
             cls.PUBLIC_METRICS.value,
             cls.REFERENCED_TWEETS.value,
             cls.REPLY_SETTINGS.value,
-            cls.WITHHELD.value
+            cls.WITHHELD.value,
+            cls.GEO.value
         ]
         
 
@@ -0,0 +1,98 @@
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from objects.community import Community
+from objects.direct_msg_events import DirectMessageEvent, ReferencedTweet as DirectMessageReferencedTweet
+from objects.meta import Meta
+from objects.poll import Poll
+from objects.space import Space
+from objects.tweet import ReferencedTweet, Tweet
+from objects.user import User
+from objects.xlist import List
+
+
+@dataclass(frozen=True)
+class IdAttributes:
+    """
+    Attributes of a model holding Snowflake ids
+
+    Args:
+        ids: Attributes holding one id
+        id_lists: Attributes holding a list of ids, stored as array('q')
+        nested: Attributes holding a model, or a list of models, with ids of their own
+        id_dicts: Dictionaries whose "*_ids" keys hold lists of ids, e.g. Tweet.attachments
+    """
+    ids: tuple[str, ...] = ()
+    id_lists: tuple[str, ...] = ()
+    nested: tuple[str, ...] = ()
+    id_dicts: tuple[str, ...] = ()
+
+
+# Space ids, place ids, media keys and DM conversation ids aren't Snowflakes and stay strings
+id_attributes: dict[type, IdAttributes] = {
+    Tweet: IdAttributes(
+        ids=('id', 'author_id', 'conversation_id', 'in_reply_to_user_id'),
+        id_lists=('edit_history_tweet_ids',),
+        nested=('referenced_tweets',),
+        id_dicts=('attachments',)
+    ),
+    ReferencedTweet: IdAttributes(ids=('id',)),
+    User: IdAttributes(ids=('id', 'pinned_tweet_id')),
+    Space: IdAttributes(id_lists=('host_ids', 'invited_user_ids', 'speaker_ids', 'topic_ids')),
+    DirectMessageEvent: IdAttributes(ids=('id', 'sender_id'), id_lists=('participant_ids',), nested=('referenced_tweets',)),
+    DirectMessageReferencedTweet: IdAttributes(ids=('id',)),
+    List: IdAttributes(ids=('id', 'owner_id')),
+    Community: IdAttributes(ids=('id',)),
+    Poll: IdAttributes(ids=('id',)),
+    Meta: IdAttributes(ids=('newest_id', 'oldest_id'))
+}
+
+
+@lru_cache(maxsize=None)
+def attributes_of(cls: type) -> IdAttributes | None:
+    """Returns the id attributes of a model class, or of the model a lazy proxy subclasses"""
+    for base in cls.__mro__:
+        if base in id_attributes:
+            return id_attributes[base]
+    return None
+
+
+def convert_ids(value):
+    """
+    Converts the Snowflake ids of a decoded model, and of the models it holds, to ints in place
+
+    Lists of ids become array('q'), 8 bytes per id. Other values and models
+    without ids are returned unchanged. Convert back with str(id), or
+    list(map(str, ids)); the clients also take ints wherever they take ids.
+
+    Args:
+        value: Model, or list of models, as decoded by from_dict, a decoder or a lazy proxy
+
+    Returns:
+        The same value
+    """
+    if isinstance(value, list):
+        for item in value:
+            convert_ids(item)
+        return value
+    attributes = attributes_of(type(value))
+    if attributes is None:
+        return value
+    for name in attributes.ids:
+        id = getattr(value, name)
+        if id is not None:
+            setattr(value, name, int(id))
+    for name in attributes.id_lists:
+        ids = getattr(value, name)
+        if ids is not None:
+            setattr(value, name, array('q', map(int, ids)))
+    for name in attributes.nested:
+        nested = getattr(value, name)
+        if nested is not None:
+            convert_ids(nested)
+    for name in attributes.id_dicts:
+        mapping = getattr(value, name)
+        if mapping:
+            # A new dictionary, the decoded one may still be shared with the raw body
+            setattr(value, name, {key: array('q', map(int, item)) if key.endswith('_ids') else item for key, item in mapping.items()})
+    return value
@@ -0,0 +1,90 @@
+import unittest
+from array import array
+# Models come through int_ids so they are the classes its table is keyed by
+from int_ids import DirectMessageEvent, Meta, Space, Tweet, User, convert_ids
+from resp_data import ResponseData, data_model
+
+class TestIntIds(unittest.TestCase):
+    def setUp(self):
+        self.tweet_data = {
+            'id': '1460323737035677698',
+            'text': 'one',
+            'author_id': '2244994945',
+            'created_at': '2021-11-15T19:08:05.000Z',
+            'edit_history_tweet_ids': ['1460323737035677698'],
+            'conversation_id': '1460323737035677698',
+            'referenced_tweets': [{'type': 'quoted', 'id': '1460323737035677697'}],
+            'attachments': {'media_keys': ['3_1460323737035677698'], 'poll_ids': ['1199786642468413448']}
+        }
+        self.user_data = {
+            'id': '2244994945',
+            'name': 'X Developers',
+            'username': 'XDevelopers',
+            'created_at': '2013-12-14T04:35:55.000Z',
+            'description': '',
+            'protected': False,
+            'verified': False,
+            'public_metrics': {'followers_count': 1, 'following_count': 2, 'tweet_count': 3, 'listed_count': 4}
+        }
+
+    def test_tweet(self):
+        tweet = convert_ids(Tweet.from_dict(self.tweet_data))
+        self.assertEqual(tweet.id, 1460323737035677698)
+        self.assertEqual(tweet.author_id, 2244994945)
+        self.assertEqual(tweet.conversation_id, 1460323737035677698)
+        self.assertIsNone(tweet.in_reply_to_user_id)
+        self.assertEqual(tweet.edit_history_tweet_ids, array('q', [1460323737035677698]))
+        self.assertEqual(tweet.referenced_tweets[0].id, 1460323737035677697)
+        # Media keys aren't Snowflakes
+        self.assertEqual(tweet.attachments['media_keys'], ['3_1460323737035677698'])
+        self.assertEqual(tweet.attachments['poll_ids'], array('q', [1199786642468413448]))
+        # The raw body keeps its strings
+        self.assertEqual(self.tweet_data['attachments']['poll_ids'], ['1199786642468413448'])
+        # Ids round-trip to the strings the API sent
+        self.assertEqual(str(tweet.id), self.tweet_data['id'])
+        self.assertEqual(list(map(str, tweet.edit_history_tweet_ids)), self.tweet_data['edit_history_tweet_ids'])
+
+    def test_other_models(self):
+        space = convert_ids(Space.from_dict({
+            'id': '1DXxyRYNejbKM',
+            'state': 'live',
+            'title': 'Spaces',
+            'participant_count': 3,
+            'host_ids': ['2244994945']
+        }))
+        self.assertEqual(space.id, '1DXxyRYNejbKM')
+        self.assertEqual(space.host_ids, array('q', [2244994945]))
+        self.assertIsNone(space.speaker_ids)
+        event = convert_ids(DirectMessageEvent.from_dict({
+            'id': '1580705921830768647',
+            'event_type': 'MessageCreate',
+            'sender_id': '906948460078698496',
+            'dm_conversation_id': '1580705921830768647-906948460078698496',
+            'created_at': '2022-10-14T01:24:24.000Z',
+            'participant_ids': ['906948460078698496']
+        }))
+        self.assertEqual(event.id, 1580705921830768647)
+        self.assertEqual(event.dm_conversation_id, '1580705921830768647-906948460078698496')
+        self.assertEqual(event.participant_ids, array('q', [906948460078698496]))
+        meta = convert_ids(Meta.from_dict({'result_count': 1, 'newest_id': '2', 'oldest_id': '1', 'next_token': 'abc'}))
+        self.assertEqual((meta.newest_id, meta.oldest_id, meta.next_token), (2, 1, 'abc'))
+        self.assertEqual(convert_ids('unchanged'), 'unchanged')
+
+    def test_response(self):
+        body = {
+            'data': [self.tweet_data],
+            'includes': {'users': [self.user_data]},
+            'meta': {'result_count': 1, 'newest_id': '1460323737035677698'}
+        }
+        for lazy in (False, True):
+            response = ResponseData.from_dict(body, data_model('tweets'), lazy=lazy, int_ids=True)
+            tweet = response.data[0]
+            self.assertEqual(tweet.id, 1460323737035677698)
+            self.assertEqual(response.includes.users[0].id, 2244994945)
+            self.assertEqual(response.meta.newest_id, 1460323737035677698)
+            # Expansions resolve by int id
+            self.assertEqual(tweet.author.username, 'XDevelopers')
+        self.assertIsInstance(ResponseData.from_dict(body, data_model('tweets')).data[0].id, str)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+from collections.abc import Callable, Hashable
+
+
+def intern_str(value: str | None) -> str | None:
+    """Returns the one shared copy of a string, for values repeated across tweets such as lang"""
+    return None if value is None else sys.intern(value)
+
+
+class Interner[T]:
+    """
+    Shares one immutable object per distinct value, e.g. the Domain of a context annotation
+
+    JSON objects with the same values under keys are built once and the same
+    instance is returned for every following one. The table holds at most
+    max_size objects; when it fills up it starts over, so values that stopped
+    showing up are released while the frequent ones are shared again quickly.
+    Safe to call from several threads, at worst an object is built twice.
+    """
+
+    def __init__(self, build: Callable[[dict], T], keys: tuple[str, ...], max_size: int = 100_000):
+        """
+        Args:
+            build: Builds the object from a JSON object, only called for new values
+            keys: JSON keys whose values identify the object, missing keys count as None
+            max_size: Number of objects kept before the table is cleared
+        """
+        self.build = build
+        self.keys = keys
+        self.max_size = max_size
+        self.__values__: dict[Hashable, T] = {}
+
+    def __len__(self) -> int:
+        return len(self.__values__)
+
+    def __call__(self, data: dict) -> T:
+        key = tuple(map(data.get, self.keys))
+        value = self.__values__.get(key)
+        if value is None:
+            if len(self.__values__) >= self.max_size:
+                self.__values__.clear()
+            value = self.__values__.setdefault(key, self.build(data))
+        return value
+
+    def clear(self) -> None:
+        self.__values__.clear()
@@ -0,0 +1,56 @@
+import unittest
+from dataclasses import FrozenInstanceError
+from intern import Interner, intern_str
+# Models come through tweet so they share its interners
+from tweet import ContextAnnotation, Tweet
+
+class TestIntern(unittest.TestCase):
+    def setUp(self):
+        self.annotation = {
+            'domain': {'id': '46', 'name': 'Business Taxonomy', 'description': 'Categories'},
+            'entity': {'id': '1557696848252391426', 'name': 'Technology'}
+        }
+
+    def test_intern_str(self):
+        self.assertIsNone(intern_str(None))
+        value = ''.join(['e', 'n'])
+        self.assertIs(intern_str(value), intern_str('en'))
+
+    def test_interner(self):
+        built = []
+        interner = Interner(lambda data: built.append(data) or tuple(data.values()), ('id', 'name'), max_size=2)
+        first = interner({'id': '1', 'name': 'one'})
+        self.assertIs(interner({'id': '1', 'name': 'one'}), first)
+        self.assertIsNot(interner({'id': '1', 'name': 'uno'}), first)
+        self.assertEqual(len(built), 2)
+        # A full table starts over
+        interner({'id': '2'})
+        self.assertEqual(len(interner), 1)
+        self.assertIsNot(interner({'id': '1', 'name': 'one'}), first)
+
+    def test_shared_annotations(self):
+        first = ContextAnnotation.from_dict(self.annotation)
+        second = ContextAnnotation.from_dict({key: dict(value) for key, value in self.annotation.items()})
+        self.assertIs(first.domain, second.domain)
+        self.assertIs(first.entity, second.entity)
+        self.assertIsNone(first.entity.description)
+        with self.assertRaises(FrozenInstanceError):
+            first.domain.name = 'Other'
+
+    def test_tweet_strings(self):
+        data = {
+            'id': '1',
+            'text': '#python',
+            'author_id': '10',
+            'created_at': '2024-03-14T09:26:53.000Z',
+            'edit_history_tweet_ids': ['1'],
+            'lang': ''.join(['e', 'n']),
+            'reply_settings': 'everyone',
+            'entities': {'hashtags': [{'start': 0, 'end': 7, 'tag': ''.join(['pyth', 'on'])}]}
+        }
+        tweet = Tweet.from_dict(data)
+        self.assertIs(tweet.lang, intern_str('en'))
+        self.assertIs(tweet.entities.hashtags[0].tag, intern_str('python'))
+
+if __name__ == '__main__':
+    unittest.main()
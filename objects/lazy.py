@@ -0,0 +1,79 @@
+from dataclasses import fields as dataclass_fields
+from functools import cached_property, lru_cache
+from collections.abc import Callable
+from objects.decoders import FieldSpec, models, namespace
+
+
+class LazyModel:
+    """
+    Base of the lazy proxies, which wrap the JSON object of one model
+
+    Attributes are read from the JSON object and converted the first time
+    they are accessed, then kept in the instance __dict__, so a tweet of
+    which only id and text are read never parses its created_at or builds
+    its entities, and reading an attribute again is a dictionary lookup.
+    """
+    __slots__ = ()
+    # Set by proxy_class: the eager model
+    __model__: type
+
+    def __init__(self, data: dict):
+        self.__data__ = data
+
+    @property
+    def raw(self) -> dict:
+        """The JSON object the proxy reads from"""
+        return self.__data__
+
+    def __reduce__(self):
+        # Pickles as the eager model, the proxy classes are built at runtime
+        model = self.__model__
+        return model, tuple(getattr(self, field.name) for field in dataclass_fields(model))
+
+
+def lazy_attribute(key: str, spec: FieldSpec) -> cached_property:
+    """Returns the attribute reading key from the JSON object, converted as the eager decoders do"""
+    if spec.convert is None:
+        source = f"lambda self: self.__data__.get({key!r})"
+    else:
+        source = f"lambda self: {spec.convert.format('value')} if (value := self.__data__.get({key!r})) is not None else None"
+    get = eval(source, namespace)
+    get.__name__ = key
+    return cached_property(get)
+
+
+@lru_cache(maxsize=None)
+def proxy_class(model: type) -> type:
+    """
+    Returns the lazy proxy class of a model, e.g. proxy_class(Tweet)
+
+    The proxy subclasses the model, so isinstance checks, properties such as
+    Tweet.author and helpers that walk dataclass fields keep working.
+
+    Raises:
+        TypeError: If the model has no specs in objects.decoders
+    """
+    if model not in models:
+        raise TypeError(f"No lazy proxy for {model.__name__}")
+    specs = models[model][0]
+    # __dict__ holds the converted attributes, the model's own slots stay empty
+    attributes = {'__slots__': ('__data__', '__dict__'), '__model__': model}
+    for field in dataclass_fields(model):
+        attributes[field.name] = lazy_attribute(field.name, specs.get(field.name, FieldSpec()))
+    return type(f"Lazy{model.__name__}", (LazyModel, model), attributes)
+
+
+def lazy_decoder(model: type) -> Callable[[dict], object]:
+    """
+    Returns a function wrapping JSON objects into lazy proxies of a model
+
+    Models without specs in objects.decoders fall back to their from_dict.
+    """
+    if model not in models:
+        return model.from_dict
+    return proxy_class(model)
+
+
+def lazy(model: type, data: dict):
+    """Wraps one JSON object into a lazy proxy of a model, e.g. lazy(Tweet, body['data'][0])"""
+    return proxy_class(model)(data)
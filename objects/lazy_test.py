@@ -0,0 +1,89 @@
+import pickle
+import unittest
+from dataclasses import fields
+from datetime import datetime, timezone
+# Models come through decoders so they are the classes the proxies subclass
+from decoders import Media, Tweet, User
+from lazy import lazy, lazy_decoder, proxy_class
+
+class TestLazy(unittest.TestCase):
+    def setUp(self):
+        self.tweet_data = {
+            'id': '1460323737035677698',
+            'text': 'Introducing a new era for the Twitter Developer Platform!',
+            'edit_history_tweet_ids': ['1460323737035677698'],
+            'author_id': '2244994945',
+            'created_at': '2021-11-15T19:08:05.000Z',
+            'lang': 'en',
+            'possibly_sensitive': False,
+            'public_metrics': {
+                'retweet_count': 1,
+                'reply_count': 2,
+                'like_count': 3,
+                'quote_count': 4
+            },
+            'referenced_tweets': [{'type': 'quoted', 'id': '1460323737035677697'}],
+            'context_annotations': [{
+                'domain': {'id': '46', 'name': 'Business Taxonomy', 'description': 'Categories'},
+                'entity': {'id': '1557696848252391426', 'name': 'Technology'}
+            }],
+            'entities': {'hashtags': [{'start': 0, 'end': 5, 'tag': 'python'}]}
+        }
+        self.user_data = {
+            'id': '2244994945',
+            'name': 'X Developers',
+            'username': 'XDevelopers',
+            'created_at': '2013-12-14T04:35:55.000Z',
+            'description': '',
+            'protected': False,
+            'verified': False,
+            'entities': {'description': {'hashtags': [{'start': 0, 'end': 5, 'tag': 'python'}]}},
+            'public_metrics': {
+                'followers_count': 1,
+                'following_count': 2,
+                'tweet_count': 3,
+                'listed_count': 4
+            }
+        }
+
+    def test_same_attributes_as_eager(self):
+        for model, data in ((Tweet, self.tweet_data), (User, self.user_data), (Media, {'media_key': '3_1', 'type': 'photo', 'height': 1})):
+            proxy = lazy(model, data)
+            eager = model.from_dict(data)
+            self.assertIsInstance(proxy, model)
+            for field in fields(model):
+                self.assertEqual(getattr(proxy, field.name), getattr(eager, field.name), field.name)
+
+    def test_decodes_on_access(self):
+        tweet = lazy(Tweet, self.tweet_data)
+        self.assertEqual(tweet.__dict__, {})
+        self.assertEqual(tweet.text, self.tweet_data['text'])
+        self.assertEqual(list(tweet.__dict__), ['text'])
+        created_at = tweet.created_at
+        self.assertEqual(created_at, datetime(2021, 11, 15, 19, 8, 5, tzinfo=timezone.utc))
+        # Converted once, then kept
+        self.assertIs(tweet.created_at, created_at)
+        self.assertIs(tweet.raw, self.tweet_data)
+
+    def test_missing_attributes(self):
+        tweet = lazy(Tweet, {'id': '1', 'text': 'one', 'edit_history_tweet_ids': ['1']})
+        self.assertIsNone(tweet.created_at)
+        self.assertIsNone(tweet.public_metrics)
+        self.assertIsNone(tweet.author)
+        self.assertEqual(tweet.media, [])
+
+    def test_pickle(self):
+        tweet = lazy(Tweet, self.tweet_data)
+        copy = pickle.loads(pickle.dumps(tweet))
+        self.assertIs(type(copy), Tweet)
+        self.assertEqual(copy, Tweet.from_dict(self.tweet_data))
+
+    def test_lazy_decoder(self):
+        self.assertIs(lazy_decoder(Tweet), proxy_class(Tweet))
+        self.assertIs(proxy_class(User), proxy_class(User))
+        # Models without specs are decoded eagerly
+        from meta import Meta
+        self.assertEqual(lazy_decoder(Meta), Meta.from_dict)
+
+if __name__ == '__main__':
+    unittest.main()
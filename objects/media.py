@@ -6,13 +6,21 @@ class MediaType(Enum):
     PHOTO = "photo"
     VIDEO = "video"
 
-@dataclass
+@dataclass(slots=True)
 class MediaVariant:
     content_type: str
     url: str
     bit_rate: int | None = None
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MediaVariant':
+        return cls(
+            content_type=data['content_type'],
+            url=data['url'],
+            bit_rate=data.get('bit_rate')
+        )
+
+@dataclass(slots=True)
 class MediaMetrics:
     playback_0_count: int
     playback_25_count: int
@@ -21,7 +29,18 @@ class MediaMetrics:
     playback_100_count: int
     view_count: int | None = None
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MediaMetrics':
+        return cls(
+            playback_0_count=data['playback_0_count'],
+            playback_25_count=data['playback_25_count'],
+            playback_50_count=data['playback_50_count'],
+            playback_75_count=data['playback_75_count'],
+            playback_100_count=data['playback_100_count'],
+            view_count=data.get('view_count')
+        )
+
+@dataclass(slots=True)
 class Media:
     # Required fields
     media_key: str
@@ -55,34 +74,20 @@ class Media:
         
         for field in metrics_fields:
             if field in data:
-                metrics[field] = MediaMetrics(
-                    playback_0_count=data[field]['playback_0_count'],
-                    playback_25_count=data[field]['playback_25_count'],
-                    playback_50_count=data[field]['playback_50_count'],
-                    playback_75_count=data[field]['playback_75_count'],
-                    playback_100_count=data[field]['playback_100_count'],
-                    view_count=data[field].get('view_count')
-                )
+                metrics[field] = MediaMetrics.from_dict(data[field])
             else:
                 metrics[field] = None
         
         # Convert variants if present
         variants = None
         if 'variants' in data:
-            variants = [
-                MediaVariant(
-                    content_type=variant['content_type'],
-                    url=variant['url'],
-                    bit_rate=variant.get('bit_rate')
-                )
-                for variant in data['variants']
-            ]
+            variants = [MediaVariant.from_dict(variant) for variant in data['variants']]
         
         return cls(
             media_key=data['media_key'],
             type=media_type,
-            height=data['height'],
-            width=data['width'],
+            height=data.get('height'),
+            width=data.get('width'),
             url=data.get('url'),
             duration_ms=data.get('duration_ms'),
             preview_image_url=data.get('preview_image_url'),
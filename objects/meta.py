@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Meta:
     result_count: int | None = None
     oldest_id: str | None = None
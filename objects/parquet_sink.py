@@ -0,0 +1,234 @@
+import json
+from array import array
+import types
+import typing
+from collections.abc import Iterable
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+import pyarrow as pa
+import pyarrow.parquet as pq
+from objects.decoders import field_decoder
+from objects.int_ids import attributes_of, convert_ids
+from objects.resp_data import ResponseData
+from objects.tweet import Tweet
+
+
+# Arrow type of each scalar annotation
+scalar_types = {
+    str: pa.string(),
+    int: pa.int64(),
+    float: pa.float64(),
+    bool: pa.bool_(),
+    datetime: pa.timestamp('ms', tz='UTC')
+}
+
+
+@lru_cache(maxsize=None)
+def type_hints(model: type) -> dict:
+    return typing.get_type_hints(model)
+
+
+def arrow_type(annotation, int_ids: bool = False) -> pa.DataType:
+    """
+    Returns the Arrow type of a model attribute annotation
+
+    Dataclasses become structs, lists become lists, dict[K, V] becomes a map
+    and Enums are stored by value. A union of dataclasses, like the entities of
+    a user description, becomes one struct with the fields of all of them.
+    Untyped dictionaries are stored as JSON text. With int_ids, the Snowflake
+    ids of nested models are int64, as in model_fields.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        members = [member for member in typing.get_args(annotation) if member is not type(None)]
+        if len(members) == 1:
+            return arrow_type(members[0], int_ids)
+        if all(is_dataclass(member) for member in members):
+            return union_struct(tuple(members), int_ids)
+        raise TypeError(f"No Arrow type for {annotation}")
+    if origin is list:
+        return pa.list_(arrow_type(typing.get_args(annotation)[0], int_ids))
+    if origin is dict:
+        key, value = typing.get_args(annotation)
+        return pa.map_(arrow_type(key, int_ids), arrow_type(value, int_ids))
+    if annotation is dict:
+        return pa.string()
+    if is_dataclass(annotation):
+        return pa.struct(model_fields(annotation, int_ids))
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return pa.string()
+    if annotation in scalar_types:
+        return scalar_types[annotation]
+    raise TypeError(f"No Arrow type for {annotation}")
+
+
+def model_fields(model: type, int_ids: bool = False) -> list[pa.Field]:
+    """Returns the Arrow fields of a model, its Snowflake ids as int64 with int_ids, see objects.int_ids"""
+    hints = type_hints(model)
+    attributes = attributes_of(model) if int_ids else None
+    result = []
+    for field in fields(model):
+        if attributes is not None and field.name in attributes.ids:
+            arrow = pa.int64()
+        elif attributes is not None and field.name in attributes.id_lists:
+            arrow = pa.list_(pa.int64())
+        else:
+            # Ids in dictionaries like Tweet.attachments stay strings, the same maps hold media keys
+            arrow = arrow_type(hints[field.name], int_ids)
+        result.append(pa.field(field.name, arrow))
+    return result
+
+
+@lru_cache(maxsize=None)
+def union_struct(members: tuple[type, ...], int_ids: bool = False) -> pa.StructType:
+    merged: dict[str, pa.Field] = {}
+    for member in members:
+        for field in model_fields(member, int_ids):
+            merged.setdefault(field.name, field)
+    return pa.struct(list(merged.values()))
+
+
+@lru_cache(maxsize=None)
+def schema(model: type, int_ids: bool = False) -> pa.Schema:
+    """
+    Returns the Arrow schema of a model, e.g. schema(Tweet)
+
+    Args:
+        model: Dataclass model from objects/
+        int_ids: Store Snowflake ids as int64, for models decoded with int_ids
+
+    Returns:
+        Schema with one column per attribute, nested models as struct and list columns
+    """
+    return pa.schema(model_fields(model, int_ids))
+
+
+def to_row(value, annotation=None):
+    """Converts a model, and everything it holds, into the plain values Arrow takes"""
+    if value is None:
+        return None
+    if is_dataclass(value):
+        hints = type_hints(type(value))
+        return {field.name: to_row(getattr(value, field.name), hints[field.name]) for field in fields(value)}
+    if isinstance(value, Enum):
+        return value.value
+    args = typing.get_args(annotation)
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        # Optional attribute, or a union of models which are handled above
+        members = [member for member in args if member is not type(None)]
+        annotation = members[0] if len(members) == 1 else None
+        args = typing.get_args(annotation)
+    if isinstance(value, array):
+        # int_ids lists of ids
+        return value.tolist()
+    if isinstance(value, list):
+        item_annotation = args[0] if args else None
+        return [to_row(item, item_annotation) for item in value]
+    if isinstance(value, dict):
+        if typing.get_origin(annotation) is not dict:
+            # Untyped dictionaries are stored as JSON text
+            return json.dumps(value)
+        # int_ids arrays in dictionaries, e.g. attachments poll_ids, go back to the annotated strings
+        return [(key, to_row(list(map(str, item)) if isinstance(item, array) else item, args[1])) for key, item in value.items()]
+    return value
+
+
+class ParquetSink:
+    """
+    Appends models to a Parquet file, one row group per row_group_size rows
+
+    Rows are buffered until a row group is full, so memory stays bounded by
+    row_group_size whatever the number of pages written.
+    """
+
+    def __init__(self, path: str, model: type = Tweet, *, source: str = 'data', fields: dict = None, expansions: tuple = None, int_ids: bool = False, row_group_size: int = 10_000, compression: str = 'zstd'):
+        """
+        Args:
+            path: Parquet file to create
+            model: Model of the rows, which sets the schema
+            source: Where rows come from in each page: 'data', or an includes
+                collection such as 'users' or 'media'
+            fields: Fields the pages were requested with, as in ArgFields, to
+                decode raw dictionaries; None reads every key they have
+            expansions: Expansions the pages were requested with, so raw dictionaries
+                keep the keys they imply, e.g. author_id
+            int_ids: Store Snowflake ids as int64 columns, for pages of int_ids=True
+                requests; raw dictionaries have their ids converted too
+            row_group_size: Rows per row group
+            compression: Parquet compression codec
+        """
+        self.model = model
+        self.source = source
+        self.decode = field_decoder(model, fields, expansions=expansions)
+        self.int_ids = int_ids
+        self.row_group_size = row_group_size
+        self.schema = schema(model, int_ids)
+        self.rows_written = 0
+        self.__rows__: list[dict] = []
+        self.__writer__ = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    def __enter__(self) -> 'ParquetSink':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def items(self, page) -> list:
+        """Returns the models of a page: ResponseData, a decoded response body, a list or one model"""
+        if isinstance(page, ResponseData):
+            items = page.data if self.source == 'data' else getattr(page.includes, self.source, None) if page.includes else None
+        elif isinstance(page, dict):
+            items = page.get('data') if self.source == 'data' else (page.get('includes') or {}).get(self.source)
+        else:
+            items = page
+        if items is None:
+            return []
+        if not isinstance(items, list):
+            items = [items]
+        # Raw dictionaries, e.g. from raw=True responses, are decoded first
+        decode = self.decode
+        if self.int_ids:
+            return [convert_ids(decode(item)) if isinstance(item, dict) else item for item in items]
+        return [decode(item) if isinstance(item, dict) else item for item in items]
+
+    def write(self, page) -> None:
+        """Buffers the rows of one page, writing every row group that fills up"""
+        self.__rows__.extend(to_row(item) for item in self.items(page))
+        while len(self.__rows__) >= self.row_group_size:
+            self.__flush__(self.__rows__[:self.row_group_size])
+            del self.__rows__[:self.row_group_size]
+
+    def write_all(self, pages: Iterable) -> None:
+        """Writes every page of a stream, e.g. Client.paginate(...)"""
+        for page in pages:
+            self.write(page)
+
+    def __flush__(self, rows: list[dict]) -> None:
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        self.__writer__.write_table(table, row_group_size=self.row_group_size)
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        """Writes the rows still buffered and closes the file"""
+        if self.__rows__:
+            self.__flush__(self.__rows__)
+            self.__rows__ = []
+        self.__writer__.close()
+
+
+def read(path: str, columns: list[str] = None, filters=None) -> pa.Table:
+    """
+    Reads a file written by ParquetSink
+
+    Args:
+        path: Parquet file
+        columns: Columns to read, nested ones by dotted path, e.g. ["id", "public_metrics.like_count"];
+            only these are read from disk
+        filters: Row filters in pyarrow.parquet's format, e.g. [("lang", "=", "en")]
+
+    Returns:
+        Arrow table of the selected columns
+    """
+    return pq.read_table(path, columns=columns, filters=filters)
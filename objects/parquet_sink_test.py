@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from decoders import Field
+from fields import TweetField
+from parquet_sink import ParquetSink, ResponseData, Tweet, read, schema
+
+class TestParquetSink(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tweets.parquet')
+
+        def tweet(id):
+            return {
+                'id': str(id),
+                'text': f'tweet {id}',
+                'author_id': '10',
+                'created_at': '2024-03-14T09:26:53.000Z',
+                'edit_history_tweet_ids': [str(id)],
+                'lang': 'en',
+                'public_metrics': {'retweet_count': 1, 'reply_count': 2, 'like_count': id, 'quote_count': 3},
+                'entities': {'hashtags': [{'start': 0, 'end': 4, 'tag': 'api'}]},
+                'referenced_tweets': [{'type': 'quoted', 'id': '7'}],
+                'context_annotations': [{
+                    'domain': {'id': '46', 'name': 'Business Taxonomy', 'description': 'Categories'},
+                    'entity': {'id': '1557696848252391426', 'name': 'Technology'}
+                }],
+                'attachments': {'media_keys': [f'3_{id}']}
+            }
+        self.pages = [
+            {'data': [tweet(1), tweet(2), tweet(3)], 'includes': {'users': [{'id': '10', 'name': 'Ten', 'username': 'ten'}]}},
+            {'data': [tweet(4), tweet(5)]},
+            {'meta': {'result_count': 0}}
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_schema(self):
+        tweet_schema = schema(Tweet)
+        self.assertEqual(tweet_schema.field('public_metrics').type.num_fields, 4)
+        self.assertEqual(str(tweet_schema.field('referenced_tweets').type), 'list<item: struct<reference_type: string, id: string>>')
+        self.assertEqual(str(tweet_schema.field('created_at').type), 'timestamp[ms, tz=UTC]')
+
+    def test_row_groups(self):
+        with ParquetSink(self.path, row_group_size=2) as sink:
+            sink.write_all(self.pages)
+        self.assertEqual(sink.rows_written, 5)
+        import pyarrow.parquet as pq
+        self.assertEqual(pq.ParquetFile(self.path).num_row_groups, 3)
+
+    def test_round_trip(self):
+        with ParquetSink(self.path) as sink:
+            sink.write_all(self.pages)
+        table = read(self.path)
+        self.assertEqual(table.column('id').to_pylist(), ['1', '2', '3', '4', '5'])
+        row = table.slice(0, 1).to_pylist()[0]
+        self.assertEqual(row['created_at'], datetime(2024, 3, 14, 9, 26, 53, tzinfo=timezone.utc))
+        self.assertEqual(row['entities']['hashtags'][0]['tag'], 'api')
+        self.assertEqual(row['referenced_tweets'], [{'reference_type': 'quoted', 'id': '7'}])
+        self.assertEqual(row['context_annotations'][0]['entity']['description'], None)
+        self.assertEqual(row['attachments'], [('media_keys', ['3_1'])])
+
+    def test_default_fields(self):
+        pages = [{'data': [{'id': '1', 'text': 'a', 'edit_history_tweet_ids': ['1']}]}]
+        with ParquetSink(self.path, fields={}) as sink:
+            sink.write_all(pages)
+        row, = read(self.path).to_pylist()
+        self.assertEqual(row['text'], 'a')
+        self.assertIsNone(row['author_id'])
+        self.assertIsNone(row['created_at'])
+
+    def test_requested_fields(self):
+        with ParquetSink(self.path, fields={Field.TWEET: [TweetField.LANG]}) as sink:
+            sink.write({'data': [{'id': '1', 'text': 'a', 'edit_history_tweet_ids': ['1'], 'lang': 'en'}]})
+            with self.assertRaises(ValueError):
+                sink.write({'data': [{'id': '2', 'text': 'b', 'edit_history_tweet_ids': ['2']}]})
+        self.assertEqual(read(self.path, columns=['lang']).column('lang').to_pylist(), ['en'])
+
+    def test_int_ids(self):
+        self.assertEqual(str(schema(Tweet, int_ids=True).field('referenced_tweets').type), 'list<item: struct<reference_type: string, id: int64>>')
+        self.assertEqual(str(schema(Tweet, int_ids=True).field('edit_history_tweet_ids').type), 'list<item: int64>')
+        self.pages[0]['data'][0]['attachments']['poll_ids'] = ['9']
+        pages = [ResponseData.from_dict(self.pages[0], Tweet, int_ids=True), self.pages[1]]
+        with ParquetSink(self.path, int_ids=True) as sink:
+            sink.write_all(pages)
+        table = read(self.path)
+        self.assertEqual(table.column('id').to_pylist(), [1, 2, 3, 4, 5])
+        row = table.slice(0, 1).to_pylist()[0]
+        self.assertEqual(row['author_id'], 10)
+        self.assertEqual(row['edit_history_tweet_ids'], [1])
+        self.assertEqual(row['referenced_tweets'], [{'reference_type': 'quoted', 'id': 7}])
+        self.assertEqual(row['attachments'], [('media_keys', ['3_1']), ('poll_ids', ['9'])])
+        self.assertEqual(read(self.path, columns=['id'], filters=[('id', '>', 3)]).column('id').to_pylist(), [4, 5])
+
+    def test_column_projection(self):
+        with ParquetSink(self.path) as sink:
+            sink.write_all(self.pages)
+        table = read(self.path, columns=['id', 'public_metrics'])
+        self.assertEqual(table.column_names, ['id', 'public_metrics'])
+        self.assertEqual([metrics['like_count'] for metrics in table.column('public_metrics').to_pylist()], [1, 2, 3, 4, 5])
+        table = read(self.path, columns=['id'], filters=[('id', '=', '4')])
+        self.assertEqual(table.to_pylist(), [{'id': '4'}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@ class PlaceType(Enum):
     POI = "poi"  # Point of Interest
     NEIGHBORHOOD = "neighborhood"
 
-@dataclass
+@dataclass(slots=True)
 class GeoBox:
     min_longitude: float
     min_latitude: float
@@ -24,7 +24,7 @@ class GeoBox:
             max_latitude=bbox[3]
         )
 
-@dataclass
+@dataclass(slots=True)
 class GeoJSON:
     type: str
     bbox: GeoBox
@@ -38,7 +38,7 @@ class GeoJSON:
             properties=data.get('properties', {})
         )
 
-@dataclass
+@dataclass(slots=True)
 class Place:
     # Required fields
     id: str
@@ -54,8 +54,10 @@ class Place:
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Place':
-        # Convert place_type string to enum
-        place_type = PlaceType(data['place_type'])
+        # Convert place_type string to enum if requested
+        place_type = None
+        if 'place_type' in data and data['place_type']:
+            place_type = PlaceType(data['place_type'])
         
         # Convert geo data if present
         geo = None
@@ -65,10 +67,10 @@ class Place:
         return cls(
             id=data['id'],
             full_name=data['full_name'],
-            name=data['name'],
+            name=data.get('name'),
             place_type=place_type,
-            country=data['country'],
-            country_code=data['country_code'],
+            country=data.get('country'),
+            country_code=data.get('country_code'),
             contained_within=data.get('contained_within'),
             geo=geo
         )
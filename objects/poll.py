@@ -1,18 +1,19 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from objects.timestamps import parse_time
 
 class VotingStatus(Enum):
     OPEN = "open"
     CLOSED = "closed"
 
-@dataclass
+@dataclass(slots=True)
 class PollOption:
     position: int
     label: str
     votes: int
 
-@dataclass
+@dataclass(slots=True)
 class Poll:
     # Required fields
     id: str
@@ -35,16 +36,15 @@ class Poll:
             for option in data['options']
         ]
         
-        # Convert voting status string to enum
-        voting_status = VotingStatus(data['voting_status'])
+        # Convert voting status string to enum if requested
+        voting_status = None
+        if 'voting_status' in data and data['voting_status']:
+            voting_status = VotingStatus(data['voting_status'])
         
         # Convert end_datetime string to datetime object if present
         end_datetime = None
         if 'end_datetime' in data and data['end_datetime']:
-            end_datetime = datetime.strptime(
-                data['end_datetime'],
-                '%Y-%m-%dT%H:%M:%S.%fZ'
-            )
+            end_datetime = parse_time(data['end_datetime'])
         
         return cls(
             id=data['id'],
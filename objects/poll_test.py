@@ -1,5 +1,5 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from poll import Poll, PollOption, VotingStatus
 
 class TestPoll(unittest.TestCase):
@@ -52,7 +52,7 @@ class TestPoll(unittest.TestCase):
 
     def test_end_datetime(self):
         """Test datetime conversion"""
-        expected_datetime = datetime(2019, 11, 28, 20, 26, 41)
+        expected_datetime = datetime(2019, 11, 28, 20, 26, 41, tzinfo=timezone.utc)
         self.assertEqual(self.poll.end_datetime, expected_datetime)
 
     def test_voting_status(self):
@@ -1,8 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TypeVar, TypedDict
 from objects.community import Community
+from objects.decoders import field_decoder
 from objects.direct_msg_events import DirectMessageEvent
 from objects.errors import Errors
+from objects.int_ids import convert_ids
+from objects.lazy import lazy_decoder
 from objects.xlist import List
 from objects.media import Media
 from objects.meta import Meta
@@ -29,24 +32,177 @@ class Includes:
     communities: list[Community] | None
     direct_message_events: list[DirectMessageEvent] | None
 
+    # Items of each collection by id, or media_key for media, built on first lookup
+    __indexes__: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    def index(self, collection: str) -> dict:
+        """
+        Returns the items of a collection by id, or by media_key for media
+
+        The map is built the first time a collection is looked up, so each
+        following lookup takes constant time.
+        """
+        index = self.__indexes__.get(collection)
+        if index is None:
+            key = 'media_key' if collection == 'media' else 'id'
+            index = {}
+            for item in getattr(self, collection) or ():
+                index.setdefault(item[key] if isinstance(item, dict) else getattr(item, key), item)
+            self.__indexes__[collection] = index
+        return index
+
+    def find(self, collection: str, key: str):
+        """Returns the item of a collection with an id or media_key, None if it wasn't included"""
+        return self.index(collection).get(key)
+
+    def find_all(self, collection: str, keys) -> list:
+        """Returns the included items with the keys, in their order, skipping those not included"""
+        index = self.index(collection)
+        return [index[key] for key in keys if key in index]
+
+    def tweet(self, id: str) -> Tweet | None:
+        return self.find('tweets', id)
+
+    def user(self, id: str) -> User | None:
+        return self.find('users', id)
+
+    def media_item(self, media_key: str) -> Media | None:
+        return self.find('media', media_key)
+
+    def poll(self, id: str) -> Poll | None:
+        return self.find('polls', id)
+
+    def place(self, id: str) -> Place | None:
+        return self.find('places', id)
+
     @classmethod
-    def from_dict(cls, data: dict) -> 'Includes':
+    def from_dict(cls, data: dict, raw: bool = False, fields: dict = None, trusted: bool = False, lazy: bool = False, int_ids: bool = False, expansions: tuple = None) -> 'Includes':
+        """
+        Creates an Includes object from the includes of an API response
+
+        Args:
+            data: Includes dictionary from the API response
+            raw: Keep every collection as raw dictionaries instead of models
+            fields: Requested fields by field set; tweets, users and media are then
+                decoded with decoders specialized for them, see objects.decoders
+            trusted: Skip validating the specialized decoders' input
+            lazy: Wrap tweets, users and media into proxies decoding attributes on access, see objects.lazy
+            int_ids: Decode Snowflake ids into ints and lists of them into array('q'), see objects.int_ids
+            expansions: Requested expansions; the specialized decoders also read the keys they imply
+
+        Returns:
+            Includes with each collection decoded into its model
+        """
         if not data:
             return None
-        return cls(
-            tweets=data.get('tweets', None),
-            users=data.get('users', None),
-            spaces=data.get('spaces', None),
-            lists=data.get('lists', None),
-            media=data.get('media', None),
-            polls=data.get('polls', None),
-            places=data.get('places', None),
-            communities=data.get('communities', None),
-            direct_message_events=data.get('direct_message_events', None),
-            meta=data.get('meta', None)
-        )
-    
-    
+        if raw:
+            return cls(**{collection: data.get(collection) for collection in include_models})
+        return cls(**{collection: decode_items(model, data.get(collection), fields, trusted, lazy, int_ids, expansions) for collection, model in include_models.items()})
+
+
+# Model of every collection that can appear in includes
+include_models = {
+    'tweets': Tweet,
+    'users': User,
+    'spaces': Space,
+    'lists': List,
+    'media': Media,
+    'polls': Poll,
+    'places': Place,
+    'communities': Community,
+    'direct_message_events': DirectMessageEvent
+}
+
+
+def decode_items(model: type, items: list[dict] | dict | None, fields: dict = None, trusted: bool = False, lazy: bool = False, int_ids: bool = False, expansions: tuple = None):
+    """
+    Decodes a single item or a list of items into model
+
+    Items are decoded with model.from_dict when fields is None, otherwise
+    with the decoder specialized for the requested fields and expansions. When lazy, they
+    are wrapped into proxies that decode each attribute on first access.
+    With int_ids, their Snowflake ids are then converted to ints.
+    """
+    if items is None:
+        return None
+    if lazy:
+        decode = lazy_decoder(model)
+    else:
+        decode = model.from_dict if fields is None else field_decoder(model, fields, trusted, expansions)
+    if isinstance(items, list):
+        items = [decode(item) for item in items]
+    else:
+        items = decode(items)
+    if int_ids:
+        convert_ids(items)
+    return items
+
+
+# Model of the data returned by an endpoint, by the last path segment that isn't an id
+endpoint_models = {
+    # Posts
+    'tweets': Tweet,
+    'liked_tweets': Tweet,
+    'mentions': Tweet,
+    'quote_tweets': Tweet,
+    'reverse_chronological': Tweet,
+    'bookmarks': Tweet,
+    'recent': Tweet,
+    'all': Tweet,
+    'stream': Tweet,
+    # Users
+    'users': User,
+    'me': User,
+    'username': User,
+    'liking_users': User,
+    'retweeted_by': User,
+    'followers': User,
+    'following': User,
+    'members': User,
+    'buyers': User,
+    'blocking': User,
+    'muting': User,
+    # Lists
+    'lists': List,
+    'owned_lists': List,
+    'followed_lists': List,
+    'list_memberships': List,
+    'pinned_lists': List,
+    # Others
+    'spaces': Space,
+    'communities': Community,
+    'dm_events': DirectMessageEvent
+}
+
+# Endpoints whose data is not a model, e.g. tweets/counts/recent or usage/tweets
+modelless_segments = {'counts', 'usage', 'rules', 'compliance', 'trends', 'personalized_trends'}
+
+
+def data_model(path: str) -> type | None:
+    """
+    Returns the model of the data an endpoint returns
+
+    Args:
+        path: Endpoint path, e.g. "users/2244994945/tweets"
+
+    Returns:
+        Model class, or None if the data should stay raw
+    """
+    segments = path.strip('/').split('?')[0].split('/')
+    if modelless_segments.intersection(segments):
+        return None
+    names = []
+    for index, segment in enumerate(segments):
+        if segment.isdigit() or (index and segments[index - 1] in ('username', 'with')):
+            # Ids, usernames and other lookup values
+            continue
+        names.append(segment)
+    for name in reversed(names):
+        if name in endpoint_models:
+            return endpoint_models[name]
+    return None
+
+
 # RawData = TypedDict('RawData', {
 #     'data': RespDataType,  
 #     'includes': Includes | None,
@@ -60,13 +216,151 @@ class ResponseData[D]:
     data: D | None
     includes: Includes | None
     meta: Meta | None = None
-    errors: Errors | None = None
+    errors: list[Errors] | None = None
 
     @classmethod
-    def from_dict[D](cls, data: dict) -> 'ResponseData[D]':
+    def from_dict[D](cls, data: dict, model: type = None, raw: bool = False, fields: dict = None, trusted: bool = False, lazy: bool = False, int_ids: bool = False, expansions: tuple = None) -> 'ResponseData[D]':
+        """
+        Creates a ResponseData object from an API response
+
+        Args:
+            data: Decoded JSON body of the response
+            model: Model of the items in data, see data_model; data stays raw when None
+            raw: Skip model construction for data and includes entirely
+            fields: Requested fields by field set, as in ArgFields; picks decoders
+                that only read those keys, see objects.decoders
+            trusted: Skip validating that requested fields are present
+            lazy: Wrap tweets, users and media into proxies decoding attributes on access, see objects.lazy
+            int_ids: Decode Snowflake ids, here and in meta, into ints and lists of them into array('q')
+            expansions: Requested expansions; the specialized decoders also read the keys
+                they make the API return, e.g. author_id
+
+        Returns:
+            ResponseData with data and includes decoded into models
+        """
+        errors = None
+        if 'errors' in data:
+            errors = [Errors.from_dict(error) for error in data['errors']]
+        items = data.get('data')
+        if not raw and model is not None:
+            items = decode_items(model, items, fields, trusted, lazy, int_ids, expansions)
+        includes = Includes.from_dict(data.get('includes'), raw, fields, trusted, lazy, int_ids, expansions)
+        if includes is not None and not raw:
+            link_includes(items, includes)
+            link_includes(includes.tweets, includes)
+        meta = Meta.from_dict(data.get('meta'))
+        if int_ids and meta is not None:
+            convert_ids(meta)
         return cls(
-            data=data.get('data'),
-            includes=Includes.from_dict(data.get('includes')),
-            meta=Meta.from_dict(data.get('meta')),
-            errors=Errors.from_dict(data.get('errors'))
-        )
\ No newline at end of file
+            data=items,
+            includes=includes,
+            meta=meta,
+            errors=errors
+        )
+
+
+def link_includes(items, includes: Includes) -> None:
+    """Points decoded tweets at the includes of their response, so tweet.author and friends resolve"""
+    if items is None:
+        return
+    for item in items if isinstance(items, list) else (items,):
+        if isinstance(item, Tweet):
+            item.__includes__ = includes
+
+
+def include_key(item: dict) -> str | None:
+    """Returns the identifier of an includes item: media are keyed by media_key, everything else by id"""
+    if 'media_key' in item:
+        return item['media_key']
+    return item.get('id')
+
+
+def merge_response_dicts(pages: list[dict | None]) -> dict | None:
+    """
+    Merges raw response bodies of one request split into several calls
+
+    Args:
+        pages: Decoded JSON bodies, None for calls that returned no new data
+
+    Returns:
+        Single body with data concatenated, includes deduplicated by
+        id/media_key and errors concatenated, or None if every page was empty.
+        Meta is dropped because it only describes a single call.
+    """
+    pages = [page for page in pages if page is not None]
+    if not pages:
+        return None
+    if len(pages) == 1:
+        return pages[0]
+
+    data = None
+    includes: dict[str, list[dict]] = {}
+    seen: dict[str, set] = {}
+    errors = []
+    for page in pages:
+        page_data = page.get('data')
+        if page_data is not None:
+            if data is None:
+                data = []
+            if isinstance(page_data, list):
+                data.extend(page_data)
+            else:
+                data.append(page_data)
+        for collection, items in page.get('includes', {}).items():
+            merged = includes.setdefault(collection, [])
+            keys = seen.setdefault(collection, set())
+            for item in items:
+                key = include_key(item)
+                if key is None:
+                    merged.append(item)
+                elif key not in keys:
+                    keys.add(key)
+                    merged.append(item)
+        errors.extend(page.get('errors', []))
+
+    merged_page: dict = {}
+    if data is not None:
+        merged_page['data'] = data
+    if includes:
+        merged_page['includes'] = includes
+    if errors:
+        merged_page['errors'] = errors
+    return merged_page
+
+def error_resource_id(error: dict) -> str | None:
+    """Returns the id a partial error refers to, e.g. a tweet id that was not found"""
+    return error.get('resource_id', error.get('value'))
+
+
+def select_ids(page: dict | None, ids: set[str]) -> dict | None:
+    """
+    Extracts the part of a lookup response body that answers the given ids
+
+    Args:
+        page: Raw response body of a lookup, None for no new data
+        ids: Ids to keep
+
+    Returns:
+        Body with only the data items and errors of those ids. Includes are kept
+        whole, so they may also hold objects expanded for other ids.
+    """
+    if page is None:
+        return None
+    selected: dict = {}
+    if 'data' in page:
+        selected['data'] = [item for item in page['data'] if item.get('id') in ids]
+    if 'includes' in page:
+        selected['includes'] = page['includes']
+    errors = [error for error in page.get('errors', []) if error_resource_id(error) in ids]
+    if errors:
+        selected['errors'] = errors
+    return selected
+
+
+def order_by_ids(page: dict | None, ids: list[str]) -> dict | None:
+    """Returns the body with its data items in the order the ids were requested in, leaving the input untouched"""
+    if page is None or not isinstance(page.get('data'), list):
+        return page
+    positions = {id: position for position, id in enumerate(ids)}
+    data = sorted(page['data'], key=lambda item: positions.get(item.get('id'), len(positions)))
+    return {**page, 'data': data}
@@ -0,0 +1,261 @@
+import copy
+import pickle
+import unittest
+from dataclasses import asdict, fields
+# Field comes through decoders so it is the enum the decoders look fields up by
+from decoders import Field
+from fields import TweetField
+from resp_data import ResponseData, data_model, endpoint_models, include_models, merge_response_dicts, order_by_ids, select_ids
+
+class TestResponseData(unittest.TestCase):
+    def setUp(self):
+        self.page_1 = {
+            'data': [
+                {'id': '1', 'text': 'one', 'author_id': '10'}
+            ],
+            'includes': {
+                'users': [
+                    {'id': '10', 'name': 'Ten', 'username': 'ten'}
+                ],
+                'media': [
+                    {'media_key': '3_1', 'type': 'photo'}
+                ]
+            },
+            'errors': [{
+                'value': '9',
+                'detail': 'Could not find tweet with ids: [9].',
+                'title': 'Not Found Error',
+                'resource_type': 'tweet',
+                'parameter': 'ids',
+                'resource_id': '9',
+                'type': 'https://api.twitter.com/2/problems/resource-not-found'
+            }]
+        }
+        self.page_2 = {
+            'data': [
+                {'id': '2', 'text': 'two', 'author_id': '10'}
+            ],
+            'includes': {
+                'users': [
+                    {'id': '10', 'name': 'Ten', 'username': 'ten'},
+                    {'id': '11', 'name': 'Eleven', 'username': 'eleven'}
+                ],
+                'media': [
+                    {'media_key': '3_1', 'type': 'photo'},
+                    {'media_key': '3_2', 'type': 'video'}
+                ]
+            },
+            'errors': [{
+                'value': '8',
+                'title': 'Not Found Error',
+                'resource_id': '8',
+                'type': 'https://api.twitter.com/2/problems/resource-not-found'
+            }]
+        }
+
+    def test_errors_from_dict(self):
+        response = ResponseData.from_dict({'errors': self.page_1['errors']})
+        self.assertIsNone(response.data)
+        self.assertEqual(len(response.errors), 1)
+        self.assertEqual(response.errors[0].title, 'Not Found Error')
+
+    def test_merge_data(self):
+        merged = merge_response_dicts([self.page_1, self.page_2])
+        self.assertEqual([tweet['id'] for tweet in merged['data']], ['1', '2'])
+
+    def test_merge_deduplicates_includes(self):
+        merged = merge_response_dicts([self.page_1, self.page_2])
+        self.assertEqual([user['id'] for user in merged['includes']['users']], ['10', '11'])
+        self.assertEqual([media['media_key'] for media in merged['includes']['media']], ['3_1', '3_2'])
+
+    def test_merge_concatenates_errors(self):
+        merged = merge_response_dicts([self.page_1, self.page_2])
+        self.assertEqual([error['value'] for error in merged['errors']], ['9', '8'])
+
+    def test_merge_skips_empty_pages(self):
+        self.assertIsNone(merge_response_dicts([None, None]))
+        self.assertIs(merge_response_dicts([None, self.page_1]), self.page_1)
+
+    def test_merge_errors_only(self):
+        merged = merge_response_dicts([{'errors': [{'value': '1'}]}, {'errors': [{'value': '2'}]}])
+        self.assertNotIn('data', merged)
+        self.assertEqual(len(merged['errors']), 2)
+
+    def test_select_ids(self):
+        selected = select_ids(self.page_1, {'9'})
+        self.assertEqual(selected['data'], [])
+        self.assertEqual(len(selected['errors']), 1)
+        self.assertIs(selected['includes'], self.page_1['includes'])
+
+        selected = select_ids(self.page_1, {'1'})
+        self.assertEqual([tweet['id'] for tweet in selected['data']], ['1'])
+        self.assertNotIn('errors', selected)
+
+    def test_order_by_ids(self):
+        merged = merge_response_dicts([self.page_2, self.page_1])
+        ordered = order_by_ids(merged, ['1', '2'])
+        self.assertEqual([tweet['id'] for tweet in ordered['data']], ['1', '2'])
+        self.assertIsNone(order_by_ids(None, ['1']))
+
+    def test_data_model(self):
+        self.assertEqual(data_model('tweets').__name__, 'Tweet')
+        self.assertEqual(data_model('tweets/1460323737035677698').__name__, 'Tweet')
+        self.assertEqual(data_model('tweets/search/recent').__name__, 'Tweet')
+        self.assertEqual(data_model('users/2244994945/tweets').__name__, 'Tweet')
+        self.assertEqual(data_model('tweets/1460323737035677698/liking_users').__name__, 'User')
+        self.assertEqual(data_model('users/by/username/tweets').__name__, 'User')
+        self.assertEqual(data_model('users/2244994945/followers').__name__, 'User')
+        self.assertIsNone(data_model('tweets/counts/recent'))
+        self.assertIsNone(data_model('usage/tweets'))
+
+    def test_typed_from_dict(self):
+        body = {
+            'data': [{
+                'id': '1',
+                'text': 'one',
+                'author_id': '10',
+                'created_at': '2024-03-14T09:26:53.000Z',
+                'edit_history_tweet_ids': ['1'],
+                'lang': 'en',
+                'possibly_sensitive': False,
+                'public_metrics': {'retweet_count': 1, 'reply_count': 2, 'like_count': 3, 'quote_count': 4}
+            }],
+            'includes': {
+                'users': [{
+                    'id': '10',
+                    'name': 'Ten',
+                    'username': 'ten',
+                    'created_at': '2013-12-14T04:35:55.000Z',
+                    'description': '',
+                    'protected': False,
+                    'verified': False,
+                    'public_metrics': {'followers_count': 1, 'following_count': 2, 'tweet_count': 3, 'listed_count': 4}
+                }],
+                'media': [{'media_key': '3_1', 'type': 'photo'}]
+            }
+        }
+        response = ResponseData.from_dict(body, data_model('tweets'))
+        self.assertEqual(type(response.data[0]).__name__, 'Tweet')
+        self.assertEqual(type(response.includes.users[0]).__name__, 'User')
+        self.assertEqual(type(response.includes.media[0]).__name__, 'Media')
+        self.assertIsNone(response.includes.polls)
+
+        response = ResponseData.from_dict(body, data_model('tweets'), raw=True)
+        self.assertIs(response.data, body['data'])
+        self.assertIs(response.includes.users, body['includes']['users'])
+
+    def user(self, id, username):
+        return {
+            'id': id,
+            'name': username.title(),
+            'username': username,
+            'created_at': '2013-12-14T04:35:55.000Z',
+            'description': '',
+            'protected': False,
+            'verified': False,
+            'public_metrics': {'followers_count': 1, 'following_count': 2, 'tweet_count': 3, 'listed_count': 4}
+        }
+
+    def test_expansions(self):
+        body = {
+            'data': [{
+                'id': '1',
+                'text': 'one',
+                'author_id': '10',
+                'created_at': '2024-03-14T09:26:53.000Z',
+                'edit_history_tweet_ids': ['1'],
+                'attachments': {'media_keys': ['3_2', '3_9', '3_1'], 'poll_ids': ['5']},
+                'referenced_tweets': [{'type': 'quoted', 'id': '2'}],
+                'geo': {'place_id': 'p1'}
+            }],
+            'includes': {
+                'users': [self.user('10', 'ten'), self.user('11', 'eleven')],
+                'tweets': [{
+                    'id': '2',
+                    'text': 'two',
+                    'author_id': '11',
+                    'created_at': '2024-03-14T09:20:00.000Z',
+                    'edit_history_tweet_ids': ['2']
+                }],
+                'media': [{'media_key': '3_1', 'type': 'photo'}, {'media_key': '3_2', 'type': 'video'}],
+                'polls': [{'id': '5', 'options': [{'position': 1, 'label': 'a', 'votes': 0}], 'voting_status': 'open'}],
+                'places': [{
+                    'id': 'p1',
+                    'full_name': 'Somewhere, Anywhere',
+                    'name': 'Somewhere',
+                    'place_type': 'city',
+                    'country': 'Anywhere',
+                    'country_code': 'AW'
+                }]
+            }
+        }
+        response = ResponseData.from_dict(body, data_model('tweets'))
+        tweet = response.data[0]
+        self.assertEqual(tweet.author.username, 'ten')
+        # Missing media keys are skipped, the others keep the tweet's order
+        self.assertEqual([media.media_key for media in tweet.media], ['3_2', '3_1'])
+        self.assertEqual(tweet.referenced['quoted'].text, 'two')
+        self.assertEqual(tweet.referenced['quoted'].author.username, 'eleven')
+        self.assertEqual(tweet.poll.id, '5')
+        self.assertEqual(tweet.place.name, 'Somewhere')
+        self.assertIsNone(response.includes.user('12'))
+        # The link to the includes isn't a dataclass field, so it stays out of asdict,
+        # equality and copies, which don't hold on to the response
+        self.assertNotIn('__includes__', [field.name for field in fields(tweet)])
+        self.assertEqual(asdict(tweet)['attachments'], {'media_keys': ['3_2', '3_9', '3_1'], 'poll_ids': ['5']})
+        self.assertEqual(tweet, type(tweet).from_dict(body['data'][0]))
+        self.assertIsNone(copy.copy(tweet).author)
+        self.assertIsNone(pickle.loads(pickle.dumps(tweet)).author)
+        lazy = ResponseData.from_dict(body, data_model('tweets'), lazy=True).data[0]
+        self.assertEqual(lazy.author.username, 'ten')
+        self.assertIsNone(pickle.loads(pickle.dumps(lazy)).author)
+        # Each index is built once and reused
+        index = response.includes.index('users')
+        self.assertIs(response.includes.index('users'), index)
+
+        response = ResponseData.from_dict(body, data_model('tweets'), raw=True)
+        self.assertEqual(response.includes.user('11')['username'], 'eleven')
+        self.assertEqual(response.includes.media_item('3_2')['type'], 'video')
+
+    # Items with only the fields the API returns when none are requested, by model name
+    default_field_items = {
+        'Tweet': {'id': '1', 'text': 'one', 'edit_history_tweet_ids': ['1']},
+        'User': {'id': '10', 'name': 'Ten', 'username': 'ten'},
+        'Space': {'id': '1DXxyRYNejbKM', 'state': 'live'},
+        'List': {'id': '1146654567674912769', 'name': 'Developers'},
+        'Community': {'id': '1146654567674912770', 'name': 'Python'},
+        'DirectMessageEvent': {'id': '1580705921830768647', 'event_type': 'MessageCreate', 'text': 'Hello'},
+        'Media': {'media_key': '3_1', 'type': 'photo'},
+        'Poll': {'id': '5', 'options': [{'position': 1, 'label': 'a', 'votes': 0}]},
+        'Place': {'id': 'p1', 'full_name': 'Somewhere, Anywhere'}
+    }
+
+    def test_default_fields(self):
+        for fields in ({}, None):
+            for name, model in endpoint_models.items():
+                item = self.default_field_items[model.__name__]
+                response = ResponseData.from_dict({'data': [item]}, model, fields=fields)
+                self.assertIs(type(response.data[0]), model, name)
+                self.assertEqual(getattr(response.data[0], 'id', None) or response.data[0].media_key, item.get('id', item.get('media_key')))
+            includes = {collection: [self.default_field_items[model.__name__]] for collection, model in include_models.items()}
+            response = ResponseData.from_dict({'data': [self.default_field_items['Tweet']], 'includes': includes}, data_model('tweets'), fields=fields)
+            for collection, model in include_models.items():
+                self.assertIs(type(getattr(response.includes, collection)[0]), model, collection)
+        self.assertIs(data_model('spaces/1DXxyRYNejbKM'), endpoint_models['spaces'])
+        self.assertIs(data_model('dm_conversations/with/2244994945/dm_events'), endpoint_models['dm_events'])
+
+    def test_default_field_expansions(self):
+        tweet = dict(self.default_field_items['Tweet'], attachments={'poll_ids': ['5']}, geo={'place_id': 'p1'})
+        body = {
+            'data': [tweet],
+            'includes': {'polls': [self.default_field_items['Poll']], 'places': [self.default_field_items['Place']]}
+        }
+        fields = {Field.TWEET: [TweetField.ATTACHMENTS, TweetField.GEO]}
+        tweet = ResponseData.from_dict(body, data_model('tweets'), fields=fields).data[0]
+        self.assertIsNone(tweet.poll.voting_status)
+        self.assertEqual(tweet.poll.options[0].label, 'a')
+        self.assertEqual(tweet.place.full_name, 'Somewhere, Anywhere')
+        self.assertIsNone(tweet.place.place_type)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Snowflake ids hold, from the highest bit down: 41 bits of milliseconds since
+# twitter_epoch, 5 bits of datacenter, 5 bits of worker and a 12-bit sequence.
+# Tweets from before November 2010 and older accounts have sequential ids that carry no time.
+twitter_epoch = 1288834974657
+timestamp_shift = 22
+datacenter_shift = 17
+worker_shift = 12
+datacenter_mask = 0x1F
+worker_mask = 0x1F
+sequence_mask = 0xFFF
+
+unix_epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+millisecond = timedelta(milliseconds=1)
+
+
+@dataclass(slots=True, frozen=True)
+class Snowflake:
+    id: int
+    created_at: datetime
+    datacenter_id: int
+    worker_id: int
+    sequence: int
+
+    @classmethod
+    def from_id(cls, id: int | str) -> 'Snowflake':
+        id = int(id)
+        return cls(
+            id=id,
+            created_at=created_at(id),
+            datacenter_id=(id >> datacenter_shift) & datacenter_mask,
+            worker_id=(id >> worker_shift) & worker_mask,
+            sequence=id & sequence_mask
+        )
+
+
+def timestamp_ms(id: int | str) -> int:
+    """Returns the Unix time in milliseconds at which an id was generated"""
+    return (int(id) >> timestamp_shift) + twitter_epoch
+
+
+def created_at(id: int | str) -> datetime:
+    """Returns the UTC time at which an id was generated, the created_at of its tweet, user or DM"""
+    return unix_epoch + timestamp_ms(id) * millisecond
+
+
+def min_id(time: datetime) -> int:
+    """
+    Returns the smallest id that can be generated at a time
+
+    Args:
+        time: Timezone-aware datetime; naive ones are taken as UTC
+
+    Returns:
+        Id with the time's millisecond and every other bit zero
+    """
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone.utc)
+    milliseconds = (time - unix_epoch) // millisecond - twitter_epoch
+    if milliseconds < 0:
+        raise ValueError(f"{time} is before the Snowflake epoch")
+    return milliseconds << timestamp_shift
+
+
+def id_bounds(start: datetime = None, end: datetime = None) -> dict[str, str]:
+    """
+    Returns since_id and until_id parameters selecting ids generated in [start, end)
+
+    Both parameters are exclusive, so since_id is the largest id before start
+    and until_id the smallest id at end.
+
+    Args:
+        start: Earliest time, None for no lower bound
+        end: Time after the last one, None for no upper bound
+
+    Returns:
+        Query parameters to merge into other_params, e.g. {"since_id": "...", "until_id": "..."}
+    """
+    params = {}
+    if start is not None:
+        params['since_id'] = str(min_id(start) - 1)
+    if end is not None:
+        params['until_id'] = str(min_id(end))
+    return params
+
+
+def to_ids(ids) -> 'np.ndarray':
+    """Returns ids as an int64 array, converting decimal strings"""
+    if np is None:
+        raise ImportError("Vectorized Snowflake functions need numpy")
+    ids = np.asarray(ids)
+    if ids.dtype.kind in 'USO':
+        ids = ids.astype(np.int64)
+    return ids
+
+
+def timestamps(ids) -> 'np.ndarray':
+    """Returns the generation time of every id as datetime64[ms] in UTC"""
+    return ((to_ids(ids) >> timestamp_shift) + twitter_epoch).astype('datetime64[ms]')
+
+
+def datacenter_ids(ids) -> 'np.ndarray':
+    return (to_ids(ids) >> datacenter_shift) & datacenter_mask
+
+
+def worker_ids(ids) -> 'np.ndarray':
+    return (to_ids(ids) >> worker_shift) & worker_mask
+
+
+def sequences(ids) -> 'np.ndarray':
+    return to_ids(ids) & sequence_mask
+
+
+def time_mask(ids, start: datetime = None, end: datetime = None) -> 'np.ndarray':
+    """
+    Returns a boolean mask of the ids generated in [start, end)
+
+    Ids are compared with the bounds directly, without converting them to times.
+    """
+    ids = to_ids(ids)
+    mask = np.ones(len(ids), dtype=bool)
+    if start is not None:
+        mask &= ids >= min_id(start)
+    if end is not None:
+        mask &= ids < min_id(end)
+    return mask
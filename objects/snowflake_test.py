@@ -0,0 +1,56 @@
+import unittest
+from datetime import datetime, timezone
+import numpy as np
+from snowflake import Snowflake, created_at, id_bounds, min_id, sequences, time_mask, timestamps, worker_ids
+
+class TestSnowflake(unittest.TestCase):
+    def setUp(self):
+        # Tweet created at 2021-11-15T19:08:05.000Z
+        self.id = 1460323737035677698
+
+    def test_from_id(self):
+        snowflake = Snowflake.from_id(str(self.id))
+        self.assertEqual(snowflake.id, self.id)
+        self.assertEqual(snowflake.created_at, datetime(2021, 11, 15, 19, 8, 5, 69000, tzinfo=timezone.utc))
+        self.assertEqual(snowflake.datacenter_id, 10)
+        self.assertEqual(snowflake.worker_id, 18)
+        self.assertEqual(snowflake.sequence, 2)
+
+    def test_min_id(self):
+        time = created_at(self.id)
+        self.assertLessEqual(min_id(time), self.id)
+        self.assertEqual(created_at(min_id(time)), time)
+        self.assertGreater(min_id(time.replace(microsecond=70000)), self.id)
+        self.assertEqual(min_id(datetime(2021, 11, 15, 19, 8, 5)), min_id(datetime(2021, 11, 15, 19, 8, 5, tzinfo=timezone.utc)))
+        with self.assertRaises(ValueError):
+            min_id(datetime(2010, 1, 1, tzinfo=timezone.utc))
+
+    def test_id_bounds(self):
+        start = datetime(2021, 11, 15, 19, 8, 5, tzinfo=timezone.utc)
+        end = datetime(2021, 11, 15, 19, 8, 6, tzinfo=timezone.utc)
+        bounds = id_bounds(start, end)
+        # Both bounds are exclusive
+        self.assertLess(int(bounds['since_id']), self.id)
+        self.assertLess(self.id, int(bounds['until_id']))
+        self.assertEqual(int(bounds['since_id']) + 1, min_id(start))
+        self.assertEqual(id_bounds(end=end), {'until_id': bounds['until_id']})
+
+    def test_vectorized(self):
+        ids = np.array([self.id, min_id(datetime(2024, 1, 1, tzinfo=timezone.utc)) + 5], dtype=np.int64)
+        self.assertEqual(timestamps(ids).tolist(), [
+            datetime(2021, 11, 15, 19, 8, 5, 69000),
+            datetime(2024, 1, 1)
+        ])
+        self.assertEqual(timestamps([str(self.id)])[0], np.datetime64('2021-11-15T19:08:05.069'))
+        self.assertEqual(worker_ids(ids).tolist(), [18, 0])
+        self.assertEqual(sequences(ids).tolist(), [2, 5])
+
+    def test_time_mask(self):
+        ids = np.array([self.id, min_id(datetime(2024, 1, 1, tzinfo=timezone.utc))], dtype=np.int64)
+        mask = time_mask(ids, datetime(2022, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(mask.tolist(), [False, True])
+        mask = time_mask(ids, end=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(mask.tolist(), [True, False])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from objects.timestamps import parse_time
 
 class SpaceState(Enum):
     LIVE = "live"
     SCHEDULED = "scheduled"
     ENDED = "ended"
 
-@dataclass
+@dataclass(slots=True)
 class Space:
     # Required fields
     id: str
@@ -46,17 +47,14 @@ class Space:
         
         for field in datetime_fields:
             if field in data and data[field]:
-                datetime_fields[field] = datetime.strptime(
-                    data[field],
-                    '%Y-%m-%dT%H:%M:%S.%fZ'
-                )
+                datetime_fields[field] = parse_time(data[field])
         
         # Convert state string to enum
         state = SpaceState(data['state'])
         
-        # Handle array fields with empty list defaults
+        # Handle array fields, None unless requested
         array_fields = {
-            'host_ids': data.get('host_ids', []),
+            'host_ids': data.get('host_ids'),
             'invited_user_ids': data.get('invited_user_ids'),
             'speaker_ids': data.get('speaker_ids'),
             'topic_ids': data.get('topic_ids')
@@ -66,9 +64,9 @@ class Space:
             # Required fields
             id=data['id'],
             state=state,
-            title=data['title'],
+            title=data.get('title'),
             host_ids=array_fields['host_ids'],
-            participant_count=data['participant_count'],
+            participant_count=data.get('participant_count'),
             
             # Optional timestamp fields
             created_at=datetime_fields['created_at'],
@@ -84,6 +82,6 @@ class Space:
             
             # Optional scalar fields
             lang=data.get('lang'),
-            is_ticketed=data.get('is_ticketed', False),
+            is_ticketed=data.get('is_ticketed'),
             subscriber_count=data.get('subscriber_count')
         )
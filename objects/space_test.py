@@ -1,5 +1,5 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from space import Space, SpaceState
 
 class TestSpace(unittest.TestCase):
@@ -32,10 +32,10 @@ class TestSpace(unittest.TestCase):
         self.assertEqual(self.space.state, SpaceState.LIVE)
         
         # Test datetime conversions
-        expected_created = datetime(2023, 1, 1, 12, 0, 0)
+        expected_created = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
         self.assertEqual(self.space.created_at, expected_created)
         
-        expected_ended = datetime(2023, 1, 1, 13, 0, 0)
+        expected_ended = datetime(2023, 1, 1, 13, 0, 0, tzinfo=timezone.utc)
         self.assertEqual(self.space.ended_at, expected_ended)
 
     def test_optional_attributes(self):
@@ -53,11 +53,11 @@ class TestSpace(unittest.TestCase):
     def test_datetime_fields(self):
         """Test all datetime field conversions"""
         expected_times = {
-            'created_at': datetime(2023, 1, 1, 12, 0, 0),
-            'ended_at': datetime(2023, 1, 1, 13, 0, 0),
-            'scheduled_start': datetime(2023, 1, 1, 11, 45, 0),
-            'started_at': datetime(2023, 1, 1, 12, 0, 0),
-            'updated_at': datetime(2023, 1, 1, 13, 0, 0)
+            'created_at': datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+            'ended_at': datetime(2023, 1, 1, 13, 0, 0, tzinfo=timezone.utc),
+            'scheduled_start': datetime(2023, 1, 1, 11, 45, 0, tzinfo=timezone.utc),
+            'started_at': datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc),
+            'updated_at': datetime(2023, 1, 1, 13, 0, 0, tzinfo=timezone.utc)
         }
         
         for field, expected_time in expected_times.items():
@@ -90,7 +90,7 @@ class TestSpace(unittest.TestCase):
         # Test required fields
         self.assertEqual(space.id, '1DXxyRYNejbKM')
         self.assertEqual(space.state, SpaceState.LIVE)
-        self.assertEqual(space.created_at, datetime(2023, 1, 1, 12, 0, 0))
+        self.assertEqual(space.created_at, datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc))
         
         # Test that optional fields are None
         self.assertIsNone(space.ended_at)
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# The API writes every timestamp as UTC with milliseconds, e.g. 2024-03-14T09:26:53.000Z
+timestamp_length = len('2024-03-14T09:26:53.000Z')
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parses an API timestamp into a timezone-aware UTC datetime
+
+    Args:
+        value: Timestamp in the API's format, e.g. "2024-03-14T09:26:53.000Z"
+
+    Returns:
+        datetime with tzinfo=timezone.utc
+
+    Raises:
+        ValueError: If value isn't in the API's format
+    """
+    # The shape check keeps fromisoformat from accepting the other ISO 8601 forms it knows
+    if len(value) != timestamp_length or value[10] != 'T' or value[19] != '.' or value[23] != 'Z':
+        raise ValueError(f"Invalid timestamp {value!r}, expected YYYY-MM-DDTHH:MM:SS.sssZ")
+    return datetime.fromisoformat(value)
+
+
+# Positions of the fixed characters of a timestamp
+separators = {4: '-', 7: '-', 10: 'T', 13: ':', 16: ':', 19: '.', 23: 'Z'}
+
+
+def parse_times(values) -> 'np.ndarray':
+    """
+    Parses many API timestamps at once into NumPy datetime64[ms] values in UTC
+
+    Args:
+        values: Timestamps in the API's format; None becomes NaT
+
+    Returns:
+        datetime64[ms] array
+
+    Raises:
+        ValueError: If a value isn't in the API's format
+    """
+    if np is None:
+        raise ImportError("parse_times needs numpy")
+    values = list(values)
+    missing = None
+    if None in values:
+        missing = np.array([value is None for value in values], dtype=bool)
+        values = ['1970-01-01T00:00:00.000Z' if value is None else value for value in values]
+    # One byte more than a timestamp, so longer strings show up instead of being cut
+    strings = np.array(values, dtype=f'S{timestamp_length + 1}')
+    chars = strings.view(np.uint8).reshape(len(strings), timestamp_length + 1)
+    expected = np.frombuffer(''.join(separators.values()).encode() + b'\0', dtype=np.uint8)
+    if (chars[:, [*separators, timestamp_length]] != expected).any():
+        raise ValueError("Invalid timestamp, expected YYYY-MM-DDTHH:MM:SS.sssZ")
+    # Without the Z numpy reads the timestamps as UTC, checking digits and ranges
+    times = strings.astype(f'S{timestamp_length - 1}').astype('datetime64[ms]')
+    if missing is not None:
+        times[missing] = np.datetime64('NaT', 'ms')
+    return times
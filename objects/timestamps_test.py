@@ -0,0 +1,36 @@
+import unittest
+from datetime import datetime, timezone
+import numpy as np
+from timestamps import parse_time, parse_times
+
+class TestTimestamps(unittest.TestCase):
+    def test_parse_time(self):
+        parsed = parse_time('2024-03-14T09:26:53.123Z')
+        self.assertEqual(parsed, datetime(2024, 3, 14, 9, 26, 53, 123000, tzinfo=timezone.utc))
+        self.assertIs(parsed.tzinfo, timezone.utc)
+
+    def test_parse_time_invalid(self):
+        for value in ['2023-01-01', '2023-01-01T12:00:00Z', '2023-01-01T12:00:00.000+00:00', '2023-01-01 12:00:00.000Z', '2023-02-30T12:00:00.000Z']:
+            with self.assertRaises(ValueError):
+                parse_time(value)
+
+    def test_parse_times(self):
+        parsed = parse_times(['2024-03-14T09:26:53.123Z', None, '2024-02-29T23:59:59.999Z'])
+        self.assertEqual(parsed.dtype, np.dtype('datetime64[ms]'))
+        self.assertEqual(parsed[0], np.datetime64('2024-03-14T09:26:53.123'))
+        self.assertTrue(np.isnat(parsed[1]))
+        self.assertEqual(parsed[2], np.datetime64('2024-02-29T23:59:59.999'))
+        self.assertEqual(len(parse_times([])), 0)
+
+    def test_parse_times_matches_parse_time(self):
+        values = ['2024-03-14T09:26:53.123Z', '1999-12-31T23:59:59.000Z']
+        expected = [np.datetime64(parse_time(value).replace(tzinfo=None), 'ms') for value in values]
+        self.assertEqual(parse_times(values).tolist(), [value.tolist() for value in expected])
+
+    def test_parse_times_invalid(self):
+        for value in ['2023-01-01', '2023-01-01T12:00:00.000Z0', '2023-01-01 12:00:00.000Z', '2023-02-30T12:00:00.000Z', '2023-01-01T24:00:00.000Z']:
+            with self.assertRaises(ValueError):
+                parse_times(['2024-03-14T09:26:53.123Z', value])
+
+if __name__ == '__main__':
+    unittest.main()
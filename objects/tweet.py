@@ -1,9 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
 from enum import Enum
+from objects.intern import Interner, intern_str
+from objects.timestamps import parse_time
 
 
-@dataclass
+@dataclass(slots=True)
 class PublicMetrics:
     retweet_count: int
     reply_count: int
@@ -11,14 +13,14 @@ class PublicMetrics:
     quote_count: int
 
 
-@dataclass
+@dataclass(slots=True)
 class NonPublicMetrics:
     impression_count: int
     url_link_clicks: int
     user_profile_clicks: int
 
 
-@dataclass
+@dataclass(slots=True)
 class OrganicMetrics:
     impression_count: int
     like_count: int
@@ -28,7 +30,7 @@ class OrganicMetrics:
     user_profile_clicks: int
 
 
-@dataclass
+@dataclass(slots=True)
 class PromotedMetrics:
     impression_count: int
     like_count: int
@@ -38,25 +40,38 @@ class PromotedMetrics:
     user_profile_clicks: int
 
 
-@dataclass
+# Domains and entities are shared between tweets by the interners below, so they are frozen
+@dataclass(slots=True, frozen=True)
 class Domain:
     id: str
     name: str
     description: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ContextEntityAnnotation:
     id: str
     name: str
     description: str | None = None
 
 
-@dataclass
+# The same few thousand domains and entities annotate most tweets
+domains = Interner(lambda data: Domain(**data), ('id', 'name', 'description'))
+context_entities = Interner(lambda data: ContextEntityAnnotation(**data), ('id', 'name', 'description'))
+
+
+@dataclass(slots=True)
 class ContextAnnotation:
     domain: Domain
     entity: ContextEntityAnnotation
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ContextAnnotation':
+        return cls(
+            domain=domains(data['domain']),
+            entity=context_entities(data['entity'])
+        )
+
 
 class AnnotationType(Enum):
     PERSON = "Person"
@@ -66,7 +81,7 @@ class AnnotationType(Enum):
     OTHER = "Other"
 
 
-@dataclass
+@dataclass(slots=True)
 class EntityAnnotation:
     # All fields are optional
     start: int | None = None
@@ -91,47 +106,60 @@ class EntityAnnotation:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ReferencedTweet:
     reference_type: str
     id: str
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ReferencedTweet':
+        # The API calls reference_type 'type'
+        return cls(reference_type=intern_str(data['type']), id=data['id'])
+
 
-@dataclass
+@dataclass(slots=True)
 class EditControls:
     edits_remaining: int
     is_edit_eligible: bool
     editable_until: datetime
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EditControls':
+        return cls(
+            edits_remaining=data['edits_remaining'],
+            is_edit_eligible=data['is_edit_eligible'],
+            editable_until=parse_time(data['editable_until'])
+        )
+
 
-@dataclass
+@dataclass(slots=True)
 class Withheld:
     copyright: bool
     country_codes: list[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class Cashtag:
     start: int
     end: int  # Exclusive
     tag: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Hashtag:
     start: int
     end: int  # Exclusive
     tag: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Mention:
     start: int
     end: int  # Exclusive
     tag: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Url:
     start: int
     end: int  # Exclusive
@@ -144,7 +172,7 @@ class Url:
     unwound_url: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Entities:
     # All fields are optional as tweets may not have all types of entities
     annotations: list[EntityAnnotation] | None = None
@@ -158,16 +186,7 @@ class Entities:
         # Convert annotations if present
         annotations = None
         if 'annotations' in data:
-            annotations = [
-                EntityAnnotation(
-                    start=ann['start'],
-                    end=ann['end'],
-                    probability=ann['probability'],
-                    type=ann['type'],
-                    normalized_text=ann['normalized_text']
-                )
-                for ann in data['annotations']
-            ]
+            annotations = [EntityAnnotation.from_dict(ann) for ann in data['annotations']]
         
         # Convert cashtags if present
         cashtags = None
@@ -176,7 +195,7 @@ class Entities:
                 Cashtag(
                     start=tag['start'],
                     end=tag['end'],
-                    tag=tag['tag']
+                    tag=intern_str(tag['tag'])
                 )
                 for tag in data['cashtags']
             ]
@@ -188,7 +207,7 @@ class Entities:
                 Hashtag(
                     start=tag['start'],
                     end=tag['end'],
-                    tag=tag['tag']
+                    tag=intern_str(tag['tag'])
                 )
                 for tag in data['hashtags']
             ]
@@ -200,7 +219,7 @@ class Entities:
                 Mention(
                     start=mention['start'],
                     end=mention['end'],
-                    tag=mention['tag']
+                    tag=intern_str(mention['tag'])
                 )
                 for mention in data['mentions']
             ]
@@ -232,8 +251,27 @@ class Entities:
         )
 
 
-@dataclass
-class Tweet:
+class Linked:
+    """
+    Base of models resolving expansions through the includes of their response
+
+    The includes are kept in a slot of their own rather than a dataclass field,
+    so fields(), asdict, equality, copies and pickles leave them out and never
+    reach the whole response. ResponseData sets the slot when it links a page.
+    """
+    __slots__ = ('__includes__',)
+
+    def __linked__(self):
+        """Returns the includes the model was linked to, None when it wasn't"""
+        return getattr(self, '__includes__', None)
+
+    def __reduce__(self):
+        # Copies and pickles are rebuilt from the data fields alone, unlinked
+        return type(self), tuple(getattr(self, field.name) for field in fields(self))
+
+
+@dataclass(slots=True)
+class Tweet(Linked):
     # Required fields
     id: str
     text: str
@@ -257,14 +295,72 @@ class Tweet:
     promoted_metrics: PromotedMetrics | None = None
     reply_settings: str | None = None
     withheld: Withheld | None = None
+    geo: dict | None = None
+
+    @property
+    def author(self):
+        """The included User who posted the tweet, with the author_id expansion"""
+        includes = self.__linked__()
+        if includes is None or self.author_id is None:
+            return None
+        return includes.user(self.author_id)
+
+    @property
+    def in_reply_to_user(self):
+        """The included User replied to, with the in_reply_to_user_id expansion"""
+        includes = self.__linked__()
+        if includes is None or self.in_reply_to_user_id is None:
+            return None
+        return includes.user(self.in_reply_to_user_id)
+
+    @property
+    def media(self) -> list:
+        """The included Media attached to the tweet, with the attachments.media_keys expansion"""
+        includes = self.__linked__()
+        if includes is None or not self.attachments:
+            return []
+        return includes.find_all('media', self.attachments.get('media_keys', ()))
+
+    @property
+    def poll(self):
+        """The included Poll of the tweet, with the attachments.poll_ids expansion"""
+        includes = self.__linked__()
+        if includes is None or not self.attachments or not self.attachments.get('poll_ids'):
+            return None
+        return includes.poll(self.attachments['poll_ids'][0])
+
+    @property
+    def place(self):
+        """The included Place the tweet is tagged with, with the geo.place_id expansion"""
+        includes = self.__linked__()
+        if includes is None or not self.geo or 'place_id' not in self.geo:
+            return None
+        return includes.place(self.geo['place_id'])
+
+    @property
+    def referenced(self) -> dict[str, 'Tweet']:
+        """The included tweets this one quotes, retweets or replies to, by reference type"""
+        includes = self.__linked__()
+        if includes is None or not self.referenced_tweets:
+            return {}
+        tweets = {}
+        for reference in self.referenced_tweets:
+            tweet = includes.tweet(reference.id)
+            if tweet is not None:
+                tweets[reference.reference_type] = tweet
+        return tweets
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Tweet':
-        # Convert datetime strings
-        created_at = datetime.strptime(data['created_at'], '%Y-%m-%dT%H:%M:%S.%fZ')
+        # Convert datetime strings, only sent when requested with tweet.fields
+        created_at = None
+        if 'created_at' in data:
+            created_at = parse_time(data['created_at'])
         
-        # Convert metrics
-        public_metrics = PublicMetrics(**data['public_metrics'])
+        # Convert metrics if present
+        public_metrics = None
+        if 'public_metrics' in data:
+            public_metrics = PublicMetrics(**data['public_metrics'])
         
         # Convert entities if present
         entities = None
@@ -274,31 +370,17 @@ class Tweet:
         # Convert context annotations
         context_annotations = None
         if 'context_annotations' in data:
-            context_annotations = []
-            for annotation in data['context_annotations']:
-                domain = Domain(**annotation['domain'])
-                entity = ContextEntityAnnotation(**annotation['entity'])
-                context_annotations.append(ContextAnnotation(domain=domain, entity=entity))
+            context_annotations = [ContextAnnotation.from_dict(annotation) for annotation in data['context_annotations']]
         
         # Convert referenced tweets
         referenced_tweets = None
         if 'referenced_tweets' in data:
-            referenced_tweets = []
-            for tweet in data['referenced_tweets']:
-                # Rename 'type' to 'reference_type' in referenced tweet data
-                tweet_data = tweet.copy()
-                tweet_data['reference_type'] = tweet_data.pop('type')
-                referenced_tweets.append(ReferencedTweet(**tweet_data))
+            referenced_tweets = [ReferencedTweet.from_dict(tweet) for tweet in data['referenced_tweets']]
         
         # Convert edit controls
         edit_controls = None
         if 'edit_controls' in data:
-            edit_data = data['edit_controls']
-            edit_data['editable_until'] = datetime.strptime(
-                edit_data['editable_until'], 
-                '%Y-%m-%dT%H:%M:%S.%fZ'
-            )
-            edit_controls = EditControls(**edit_data)
+            edit_controls = EditControls.from_dict(data['edit_controls'])
         
         # Convert metrics if present
         non_public_metrics = None
@@ -321,11 +403,11 @@ class Tweet:
         return cls(
             id=data['id'],
             text=data['text'],
-            author_id=data['author_id'],
+            author_id=data.get('author_id'),
             created_at=created_at,
-            lang=data['lang'],
+            lang=intern_str(data.get('lang')),
             edit_history_tweet_ids=data['edit_history_tweet_ids'],
-            possibly_sensitive=data['possibly_sensitive'],
+            possibly_sensitive=data.get('possibly_sensitive'),
             public_metrics=public_metrics,
             entities=entities,
             context_annotations=context_annotations,
@@ -337,6 +419,7 @@ class Tweet:
             non_public_metrics=non_public_metrics,
             organic_metrics=organic_metrics,
             promoted_metrics=promoted_metrics,
-            reply_settings=data.get('reply_settings'),
-            withheld=withheld
+            reply_settings=intern_str(data.get('reply_settings')),
+            withheld=withheld,
+            geo=data.get('geo')
         )
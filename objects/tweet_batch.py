@@ -0,0 +1,172 @@
+from collections.abc import Callable, Iterator
+from datetime import datetime
+import numpy as np
+from objects import decoders, snowflake
+from objects.timestamps import parse_times
+from objects.tweet import Tweet
+
+
+# Integer columns and the public_metrics key each one comes from
+metric_columns = ('retweet_count', 'reply_count', 'like_count', 'quote_count')
+
+# Array columns of a batch, lang_codes being the dictionary-encoded lang
+columns = ('ids', 'author_ids', 'created_at', *metric_columns, 'lang_codes')
+
+# Value of integer columns for tweets that don't have them, e.g. metrics that weren't requested
+missing = -1
+
+# Default row decoder, reading whichever keys each tweet has
+decode_tweet = decoders.decoder(Tweet)
+
+
+class TweetBatch:
+    """
+    Tweets stored column by column in NumPy arrays
+
+    Columns:
+        ids: int64 tweet ids
+        author_ids: int64 author ids, -1 when author_id wasn't requested
+        created_at: datetime64[ms] in UTC, NaT when created_at wasn't requested
+        retweet_count, reply_count, like_count, quote_count: int64 public metrics, -1 when missing
+        lang_codes: int32 index of each tweet's language in langs, -1 when missing
+        langs: Distinct languages of the batch
+
+    The JSON objects are kept alongside, so Tweet objects are built only for
+    the rows that are asked for.
+    """
+    __slots__ = ('ids', 'author_ids', 'created_at', 'retweet_count', 'reply_count', 'like_count', 'quote_count', 'lang_codes', 'langs', 'items', 'decode')
+
+    def __init__(self, ids: np.ndarray, author_ids: np.ndarray, created_at: np.ndarray, metrics: dict[str, np.ndarray], lang_codes: np.ndarray, langs: np.ndarray, items: np.ndarray, decode: Callable[[dict], Tweet] = decode_tweet):
+        self.ids = ids
+        self.author_ids = author_ids
+        self.created_at = created_at
+        self.retweet_count = metrics['retweet_count']
+        self.reply_count = metrics['reply_count']
+        self.like_count = metrics['like_count']
+        self.quote_count = metrics['quote_count']
+        self.lang_codes = lang_codes
+        self.langs = langs
+        self.items = items
+        self.decode = decode
+
+    @classmethod
+    def from_dicts(cls, items: list[dict], decode: Callable[[dict], Tweet] = decode_tweet) -> 'TweetBatch':
+        """
+        Builds a batch from tweet JSON objects, e.g. the data of a response
+
+        Args:
+            items: Tweet dictionaries as returned by the API
+            decode: Turns one dictionary into a Tweet when a row is asked for,
+                e.g. a decoder from objects.decoders
+
+        Returns:
+            TweetBatch with one row per item
+        """
+        count = len(items)
+        ids = np.fromiter((int(item['id']) for item in items), dtype=np.int64, count=count)
+        author_ids = np.fromiter((int(item.get('author_id', missing)) for item in items), dtype=np.int64, count=count)
+        created_at = parse_times([item.get('created_at') for item in items])
+        metrics = {}
+        for column in metric_columns:
+            metrics[column] = np.fromiter(
+                (item['public_metrics'][column] if 'public_metrics' in item else missing for item in items),
+                dtype=np.int64,
+                count=count
+            )
+        # Dictionary-encode languages: each distinct value is stored once
+        codes: dict[str, int] = {}
+        lang_codes = np.fromiter(
+            (codes.setdefault(item['lang'], len(codes)) if 'lang' in item else missing for item in items),
+            dtype=np.int32,
+            count=count
+        )
+        langs = np.array(list(codes), dtype=object)
+        objects = np.empty(count, dtype=object)
+        objects[:] = items
+        return cls(ids, author_ids, created_at, metrics, lang_codes, langs, objects, decode)
+
+    @classmethod
+    def from_response(cls, body: dict, decode: Callable[[dict], Tweet] = decode_tweet) -> 'TweetBatch':
+        """Builds a batch from the data of a decoded response body, empty when it has none"""
+        return cls.from_dicts(body.get('data') or [], decode)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        """
+        Returns the Tweet of one row, or a new batch for a slice, boolean mask or index array
+        """
+        if isinstance(index, (int, np.integer)):
+            return self.decode(self.items[index])
+        metrics = {column: getattr(self, column)[index] for column in metric_columns}
+        return TweetBatch(self.ids[index], self.author_ids[index], self.created_at[index], metrics, self.lang_codes[index], self.langs, self.items[index], self.decode)
+
+    def __iter__(self) -> Iterator[Tweet]:
+        decode = self.decode
+        for item in self.items:
+            yield decode(item)
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a column by name, 'lang' decodes the language codes into strings"""
+        if name == 'lang':
+            return self.lang()
+        if name not in columns:
+            raise ValueError(f"Unknown column {name}")
+        return getattr(self, name)
+
+    def lang(self) -> np.ndarray:
+        """Returns the language of every row, None where it's missing"""
+        langs = np.append(self.langs, None)
+        # Missing codes are -1, which picks the trailing None
+        return langs[self.lang_codes]
+
+    def lang_mask(self, *langs: str) -> np.ndarray:
+        """Returns a boolean mask of the rows in any of the languages"""
+        codes = [index for index, lang in enumerate(self.langs) if lang in langs]
+        return np.isin(self.lang_codes, codes)
+
+    def filter(self, mask: np.ndarray) -> 'TweetBatch':
+        """Returns the rows where mask is True, e.g. batch.filter(batch.like_count > 100)"""
+        return self[np.asarray(mask, dtype=bool)]
+
+    def sort(self, by: str, descending: bool = False) -> 'TweetBatch':
+        """
+        Returns the rows ordered by a column, ties keep their order
+
+        'lang' groups the rows by language, in the order languages first appear.
+        """
+        values = self.lang_codes if by == 'lang' else self.column(by)
+        if descending:
+            return self[descending_order(values)]
+        return self[np.argsort(values, kind='stable')]
+
+    def top_k(self, by: str, k: int) -> 'TweetBatch':
+        """Returns the k rows with the highest values of a column, highest first; none when k <= 0"""
+        values = self.column(by)
+        if k <= 0:
+            return self[:0]
+        if k >= len(values):
+            return self.sort(by, descending=True)
+        # Partition to find the k largest in linear time, then sort only those
+        top = np.argpartition(values, len(values) - k)[len(values) - k:]
+        return self[top[descending_order(values[top])]]
+
+    def id_times(self) -> np.ndarray:
+        """Returns the creation time of every row read from its id, even when created_at wasn't requested"""
+        return snowflake.timestamps(self.ids)
+
+    def between(self, start: datetime = None, end: datetime = None) -> 'TweetBatch':
+        """Returns the rows created in [start, end), compared by id without parsing any time"""
+        return self[snowflake.time_mask(self.ids, start, end)]
+
+    def tweets(self) -> list[Tweet]:
+        """Decodes every row into a Tweet"""
+        return list(self)
+
+
+def descending_order(values: np.ndarray) -> np.ndarray:
+    """Returns the indexes ordering values from highest to lowest, ties in their original order"""
+    last = len(values) - 1
+    # A stable sort of the reversed values, read backwards, keeps equal values in order
+    return last - np.argsort(values[::-1], kind='stable')[::-1]
@@ -0,0 +1,92 @@
+import unittest
+from datetime import datetime, timezone
+import numpy as np
+from tweet_batch import TweetBatch
+
+class TestTweetBatch(unittest.TestCase):
+    def setUp(self):
+        def tweet(id, likes, lang, created_at):
+            return {
+                'id': str(id),
+                'text': f'tweet {id}',
+                'author_id': str(id * 10),
+                'created_at': created_at,
+                'edit_history_tweet_ids': [str(id)],
+                'lang': lang,
+                'public_metrics': {'retweet_count': 1, 'reply_count': 2, 'like_count': likes, 'quote_count': 3}
+            }
+        self.body = {
+            'data': [
+                tweet(1, 50, 'en', '2024-03-14T09:26:53.000Z'),
+                tweet(2, 10, 'ja', '2024-03-14T09:26:54.000Z'),
+                tweet(3, 70, 'en', '2024-03-14T09:26:55.000Z'),
+                tweet(4, 10, 'es', '2024-03-14T09:26:56.000Z'),
+                {'id': '5', 'text': 'default fields only', 'edit_history_tweet_ids': ['5']}
+            ]
+        }
+        self.batch = TweetBatch.from_response(self.body)
+
+    def test_columns(self):
+        self.assertEqual(self.batch.ids.dtype, np.int64)
+        self.assertEqual(self.batch.ids.tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(self.batch.author_ids.tolist(), [10, 20, 30, 40, -1])
+        self.assertEqual(self.batch.like_count.tolist(), [50, 10, 70, 10, -1])
+        self.assertEqual(self.batch.created_at[0], np.datetime64('2024-03-14T09:26:53.000'))
+        self.assertTrue(np.isnat(self.batch.created_at[4]))
+
+    def test_lang_dictionary(self):
+        self.assertEqual(self.batch.langs.tolist(), ['en', 'ja', 'es'])
+        self.assertEqual(self.batch.lang_codes.tolist(), [0, 1, 0, 2, -1])
+        self.assertEqual(self.batch.lang().tolist(), ['en', 'ja', 'en', 'es', None])
+        self.assertEqual(self.batch.lang_mask('en', 'es').tolist(), [True, False, True, True, False])
+
+    def test_filter(self):
+        popular = self.batch.filter(self.batch.like_count > 20)
+        self.assertEqual(popular.ids.tolist(), [1, 3])
+        self.assertEqual(popular.lang().tolist(), ['en', 'en'])
+        self.assertEqual(len(self.batch.filter(self.batch.lang_mask('fr'))), 0)
+
+    def test_sort(self):
+        self.assertEqual(self.batch.sort('like_count').ids.tolist(), [5, 2, 4, 1, 3])
+        self.assertEqual(self.batch.sort('like_count', descending=True).ids.tolist(), [3, 1, 2, 4, 5])
+
+    def test_top_k(self):
+        self.assertEqual(self.batch.top_k('like_count', 2).ids.tolist(), [3, 1])
+        self.assertEqual(self.batch.top_k('like_count', 10).ids.tolist(), [3, 1, 2, 4, 5])
+        for k in (0, -1):
+            top = self.batch.top_k('like_count', k)
+            self.assertEqual(len(top), 0)
+            self.assertEqual(top.like_count.tolist(), [])
+
+    def test_tweets_on_demand(self):
+        tweet = self.batch[2]
+        self.assertEqual(tweet.id, '3')
+        self.assertEqual(tweet.public_metrics.like_count, 70)
+        self.assertEqual([tweet.id for tweet in self.batch.top_k('like_count', 2)], ['3', '1'])
+
+    def test_default_field_rows(self):
+        tweet = self.batch[4]
+        self.assertEqual(tweet.text, 'default fields only')
+        self.assertIsNone(tweet.author_id)
+        self.assertIsNone(tweet.created_at)
+        self.assertIsNone(tweet.public_metrics)
+        batch = TweetBatch.from_response({'data': [{'id': '6', 'text': 'a', 'edit_history_tweet_ids': ['6']}]})
+        self.assertEqual(batch[0].edit_history_tweet_ids, ['6'])
+        self.assertEqual([tweet.id for tweet in batch], ['6'])
+
+    def test_between(self):
+        batch = TweetBatch.from_dicts([
+            {'id': '1460323737035677698', 'text': 'a', 'edit_history_tweet_ids': []},
+            {'id': '1745000000000000000', 'text': 'b', 'edit_history_tweet_ids': []}
+        ])
+        self.assertEqual(batch.id_times()[0], np.datetime64('2021-11-15T19:08:05.069'))
+        self.assertEqual(batch.between(datetime(2022, 1, 1, tzinfo=timezone.utc)).ids.tolist(), [1745000000000000000])
+        self.assertEqual(batch.between(end=datetime(2022, 1, 1, tzinfo=timezone.utc)).ids.tolist(), [1460323737035677698])
+
+    def test_empty(self):
+        batch = TweetBatch.from_response({'meta': {'result_count': 0}})
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(len(batch.top_k('like_count', 3)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from tweet import (
     Tweet, PublicMetrics, NonPublicMetrics, OrganicMetrics, PromotedMetrics,
     Domain, ContextEntityAnnotation, ContextAnnotation, ReferencedTweet, EditControls,
@@ -122,7 +122,7 @@ class TestTweet(unittest.TestCase):
         self.assertEqual(self.tweet.edit_history_tweet_ids, ['1234567890'])
         
         # Test datetime conversion
-        expected_dt = datetime(2023, 1, 1, 12, 0, 0)
+        expected_dt = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
         self.assertEqual(self.tweet.created_at, expected_dt)
         self.assertIsInstance(self.tweet.created_at, datetime)
 
@@ -134,6 +134,14 @@ class TestTweet(unittest.TestCase):
         self.assertEqual(self.tweet.conversation_id, '1234567890')
         self.assertEqual(self.tweet.reply_settings, 'everyone')
 
+    def test_slots(self):
+        """Test models keep attributes in slots instead of a __dict__"""
+        self.assertFalse(hasattr(self.tweet, '__dict__'))
+        self.assertFalse(hasattr(self.tweet.public_metrics, '__dict__'))
+        self.assertFalse(hasattr(self.tweet.entities, '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.tweet.unknown = 1
+
     def test_public_metrics(self):
         """Test public metrics handling"""
         self.assertIsInstance(self.tweet.public_metrics, PublicMetrics)
@@ -200,7 +208,7 @@ class TestTweet(unittest.TestCase):
         edit_controls = self.tweet.edit_controls
         self.assertEqual(edit_controls.edits_remaining, 5)
         self.assertTrue(edit_controls.is_edit_eligible)
-        expected_dt = datetime(2023, 1, 1, 13, 0, 0)
+        expected_dt = datetime(2023, 1, 1, 13, 0, 0, tzinfo=timezone.utc)
         self.assertEqual(edit_controls.editable_until, expected_dt)
 
     def test_metrics(self):
@@ -264,7 +272,8 @@ class TestTweet(unittest.TestCase):
 
     def test_missing_required_fields(self):
         """Test that missing required fields raise appropriate errors"""
-        required_fields = ['id', 'text', 'author_id', 'created_at', 'edit_history_tweet_ids']
+        # author_id and created_at are only sent when requested
+        required_fields = ['id', 'text', 'edit_history_tweet_ids']
         
         for field in required_fields:
             invalid_data = self.tweet_data.copy()
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
+from objects.timestamps import parse_time
 
-@dataclass
+@dataclass(slots=True)
 class UrlEntity:
     start: int
     end: int
@@ -9,42 +10,91 @@ class UrlEntity:
     expanded_url: str
     display_url: str
 
-@dataclass
+@dataclass(slots=True)
 class HashtagEntity:
     start: int
     end: int
     tag: str
 
-@dataclass
+@dataclass(slots=True)
 class MentionEntity:
     start: int
     end: int
     tag: str
 
-@dataclass
+@dataclass(slots=True)
 class CashtagEntity:
     start: int
     end: int
     tag: str
 
-@dataclass
+@dataclass(slots=True)
 class UserEntities:
     url: dict[str, list[UrlEntity]] | None = None
     description: dict[str, list[UrlEntity | HashtagEntity | MentionEntity | CashtagEntity]] | None = None
 
-@dataclass
+    @classmethod
+    def from_dict(cls, data: dict | None) -> 'UserEntities':
+        if not data:
+            return cls()
+        entities = {}
+        # Handle URL entities
+        if 'url' in data:
+            url_entities = [
+                UrlEntity(**url_data)
+                for url_data in data['url']['urls']
+            ]
+            entities['url'] = {'urls': url_entities}
+        
+        # Handle description entities
+        if 'description' in data:
+            desc_entities = {}
+            
+            # Handle URLs in description
+            if 'urls' in data['description']:
+                desc_entities['urls'] = [
+                    UrlEntity(**url_data)
+                    for url_data in data['description']['urls']
+                ]
+            
+            # Handle hashtags in description
+            if 'hashtags' in data['description']:
+                desc_entities['hashtags'] = [
+                    HashtagEntity(**hashtag_data)
+                    for hashtag_data in data['description']['hashtags']
+                ]
+            
+            # Handle mentions in description
+            if 'mentions' in data['description']:
+                desc_entities['mentions'] = [
+                    MentionEntity(**mention_data)
+                    for mention_data in data['description']['mentions']
+                ]
+            
+            # Handle cashtags in description
+            if 'cashtags' in data['description']:
+                desc_entities['cashtags'] = [
+                    CashtagEntity(**cashtag_data)
+                    for cashtag_data in data['description']['cashtags']
+                ]
+            
+            entities['description'] = desc_entities
+        
+        return cls(**entities)
+
+@dataclass(slots=True)
 class UserPublicMetrics:
     followers_count: int
     following_count: int
     tweet_count: int
     listed_count: int
 
-@dataclass
+@dataclass(slots=True)
 class Withheld:
     country_codes: list[str]
     scope: str | None = None
 
-@dataclass
+@dataclass(slots=True)
 class User:
     # Required fields
     id: str
@@ -67,58 +117,20 @@ class User:
 
     @classmethod
     def from_dict(cls, data: dict) -> 'User':
-        # Convert datetime string
-        created_at = datetime.strptime(data['created_at'], '%Y-%m-%dT%H:%M:%S.%fZ')
+        # Convert datetime string, only sent when requested with user.fields
+        created_at = None
+        if 'created_at' in data:
+            created_at = parse_time(data['created_at'])
         
         # Convert entities
-        entities = {}
+        user_entities = None
         if 'entities' in data:
-            # Handle URL entities
-            if 'url' in data['entities']:
-                url_entities = [
-                    UrlEntity(**url_data)
-                    for url_data in data['entities']['url']['urls']
-                ]
-                entities['url'] = {'urls': url_entities}
-            
-            # Handle description entities
-            if 'description' in data['entities']:
-                desc_entities = {}
-                
-                # Handle URLs in description
-                if 'urls' in data['entities']['description']:
-                    desc_entities['urls'] = [
-                        UrlEntity(**url_data)
-                        for url_data in data['entities']['description']['urls']
-                    ]
-                
-                # Handle hashtags in description
-                if 'hashtags' in data['entities']['description']:
-                    desc_entities['hashtags'] = [
-                        HashtagEntity(**hashtag_data)
-                        for hashtag_data in data['entities']['description']['hashtags']
-                    ]
-                
-                # Handle mentions in description
-                if 'mentions' in data['entities']['description']:
-                    desc_entities['mentions'] = [
-                        MentionEntity(**mention_data)
-                        for mention_data in data['entities']['description']['mentions']
-                    ]
-                
-                # Handle cashtags in description
-                if 'cashtags' in data['entities']['description']:
-                    desc_entities['cashtags'] = [
-                        CashtagEntity(**cashtag_data)
-                        for cashtag_data in data['entities']['description']['cashtags']
-                    ]
-                
-                entities['description'] = desc_entities
-        
-        user_entities = UserEntities(**entities)
+            user_entities = UserEntities.from_dict(data['entities'])
         
         # Convert public metrics
-        public_metrics = UserPublicMetrics(**data['public_metrics'])
+        public_metrics = None
+        if 'public_metrics' in data:
+            public_metrics = UserPublicMetrics(**data['public_metrics'])
         
         # Convert withheld if present
         withheld = None
@@ -130,9 +142,9 @@ class User:
             name=data['name'],
             username=data['username'],
             created_at=created_at,
-            description=data['description'],
-            protected=data['protected'],
-            verified=data['verified'],
+            description=data.get('description'),
+            protected=data.get('protected'),
+            verified=data.get('verified'),
             entities=user_entities,
             public_metrics=public_metrics,
             url=data.get('url'),
@@ -1,5 +1,5 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from user import (
     User, UrlEntity, HashtagEntity, MentionEntity, CashtagEntity,
     UserEntities, UserPublicMetrics, Withheld
@@ -91,7 +91,7 @@ class TestUser(unittest.TestCase):
 
     def test_created_at(self):
         """Test datetime conversion"""
-        expected_datetime = datetime(2013, 12, 14, 4, 35, 55)
+        expected_datetime = datetime(2013, 12, 14, 4, 35, 55, tzinfo=timezone.utc)
         self.assertEqual(self.user.created_at, expected_datetime)
 
     def test_public_metrics(self):
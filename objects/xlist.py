@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
+from objects.timestamps import parse_time
 
-@dataclass
+@dataclass(slots=True)
 class List:
     # Required fields
     id: str
@@ -20,18 +21,15 @@ class List:
         # Convert datetime string to datetime object
         created_at = None
         if 'created_at' in data and data['created_at']:
-            created_at = datetime.strptime(
-                data['created_at'],
-                '%Y-%m-%dT%H:%M:%S.%fZ'
-            )
+            created_at = parse_time(data['created_at'])
         
         return cls(
             id=data['id'],
             name=data['name'],
-            owner_id=data['owner_id'],
-            private=data['private'],
-            follower_count=data['follower_count'],
-            member_count=data['member_count'],
+            owner_id=data.get('owner_id'),
+            private=data.get('private'),
+            follower_count=data.get('follower_count'),
+            member_count=data.get('member_count'),
             created_at=created_at,
             description=data.get('description')
         )
@@ -1,5 +1,5 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timezone
 from object.xlist import List
 
 class TestList(unittest.TestCase):
@@ -33,7 +33,7 @@ class TestList(unittest.TestCase):
 
     def test_created_at(self):
         """Test datetime conversion"""
-        expected_datetime = datetime(2013, 12, 14, 4, 35, 55)
+        expected_datetime = datetime(2013, 12, 14, 4, 35, 55, tzinfo=timezone.utc)
         self.assertEqual(self.list.created_at, expected_datetime)
 
     def test_minimal_list(self):
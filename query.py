@@ -0,0 +1,92 @@
+from array import array
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from urllib.parse import quote
+
+from objects.expansions import ArgExpansions
+from objects.fields import ArgFields, Field
+
+
+def encode(value) -> str:
+    """Percent-encodes one query value, Enums by their value"""
+    if isinstance(value, Enum):
+        value = value.value
+    return quote(str(value), safe='')
+
+
+def encode_list(values) -> str:
+    """Percent-encodes each value and joins them with literal commas"""
+    return ','.join([encode(value) for value in values])
+
+
+@dataclass(frozen=True)
+class PreparedQuery:
+    """
+    Fields and expansions compiled once into an encoded query fragment
+
+    Pass it as the fields argument of Client methods to reuse the fragment
+    on every call.
+    """
+    fields: tuple[tuple[Field, tuple[Enum, ...]], ...]
+    expansions: tuple[Enum, ...]
+    fragment: str  # e.g. "tweet.fields=created_at,lang&expansions=author_id"
+
+    def field_values(self, field: Field) -> tuple[Enum, ...]:
+        """Returns the values requested for one field set, empty if none were"""
+        for key, values in self.fields:
+            if key == field:
+                return values
+        return ()
+
+
+@lru_cache(maxsize=1024)
+def compile_query(fields: tuple[tuple[Field, tuple[Enum, ...]], ...], expansions: tuple[Enum, ...]) -> PreparedQuery:
+    queries = [f"{encode(key)}={encode_list(values)}" for key, values in fields]
+    if expansions:
+        queries.append(f"expansions={encode_list(expansions)}")
+    return PreparedQuery(fields=fields, expansions=expansions, fragment='&'.join(queries))
+
+
+def prepare(fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None) -> PreparedQuery:
+    """
+    Compiles fields and expansions into a PreparedQuery, cached by their contents
+
+    Args:
+        fields: Fields to request, or an already prepared query which is returned as is
+            unless expansions are given too
+        expansions: Expansions to request, added to those of a prepared query
+
+    Returns:
+        Immutable PreparedQuery shared by every call with the same fields and expansions
+    """
+    if isinstance(fields, PreparedQuery):
+        if not expansions:
+            return fields
+        return compile_query(fields.fields, tuple(dict.fromkeys((*fields.expansions, *expansions))))
+    frozen_fields = tuple((key, tuple(values)) for key, values in fields.items() if values) if fields else ()
+    return compile_query(frozen_fields, tuple(expansions) if expansions else ())
+
+
+def encode_params(other_params: dict | None) -> str:
+    """
+    Encodes free-form query parameters
+
+    Args:
+        other_params: Parameters by name or Enum; lists, tuples and arrays are
+            joined with commas and falsy values are skipped
+
+    Returns:
+        Encoded query fragment, e.g. "query=from%3AXDevelopers%20%23api&max_results=100"
+    """
+    if not other_params:
+        return ''
+    queries: list[str] = []
+    for key, value in other_params.items():
+        if not value:
+            continue
+        if isinstance(value, (list, tuple, array)):
+            queries.append(f"{encode(key)}={encode_list(value)}")
+        else:
+            queries.append(f"{encode(key)}={encode(value)}")
+    return '&'.join(queries)
@@ -0,0 +1,36 @@
+import unittest
+from client import build_url
+from objects.expansions import TweetPayloadExpansion
+from objects.fields import Field, TweetField, UserField
+from query import prepare
+
+class TestPrepare(unittest.TestCase):
+    def setUp(self):
+        self.fields = {Field.TWEET: [TweetField.CREATED_AT, TweetField.LANG], Field.USER: []}
+
+    def test_prepare(self):
+        query = prepare(self.fields, [TweetPayloadExpansion.AUTHOR_ID])
+        self.assertEqual(query.fragment, 'tweet.fields=created_at,lang&expansions=author_id')
+        self.assertIs(query, prepare(self.fields, [TweetPayloadExpansion.AUTHOR_ID]))
+        self.assertEqual(query.field_values(Field.TWEET), (TweetField.CREATED_AT, TweetField.LANG))
+        self.assertEqual(query.field_values(Field.USER), ())
+        self.assertEqual(prepare().fragment, '')
+
+    def test_prepared_query_is_reused(self):
+        query = prepare(self.fields)
+        self.assertIs(prepare(query), query)
+        self.assertIs(prepare(query, []), query)
+
+    def test_expansions_are_added_to_a_prepared_query(self):
+        query = prepare(self.fields, [TweetPayloadExpansion.AUTHOR_ID])
+        merged = prepare(query, [TweetPayloadExpansion.AUTHOR_ID, TweetPayloadExpansion.REFERENCED_TWEETS_ID])
+        self.assertEqual(merged.expansions, (TweetPayloadExpansion.AUTHOR_ID, TweetPayloadExpansion.REFERENCED_TWEETS_ID))
+        self.assertEqual(merged.fields, query.fields)
+        self.assertIs(merged, prepare(self.fields, [TweetPayloadExpansion.AUTHOR_ID, TweetPayloadExpansion.REFERENCED_TWEETS_ID]))
+        self.assertEqual(
+            build_url('tweets', ['1'], prepare({Field.USER: [UserField.USERNAME]}), [TweetPayloadExpansion.AUTHOR_ID]),
+            'https://api.x.com/2/tweets?ids=1&user.fields=username&expansions=author_id'
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+
+# X API rate limits are counted over 15 minute windows
+default_window_seconds = 15 * 60
+
+
+def endpoint_key(url: str) -> str:
+    """
+    Normalizes a request URL into the endpoint its rate limit applies to
+
+    Args:
+        url: Full request URL, or its path starting with the API version
+
+    Returns:
+        Path with ids replaced by ':id', e.g. '2/users/:id/tweets'
+    """
+    version, *segments = urlsplit(url).path.strip('/').split('/')
+    return '/'.join([version] + [':id' if segment.isdigit() else segment for segment in segments])
+
+
+def token_key(token: str) -> str:
+    """Returns a stable key for a bearer token without keeping the token itself"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class RateLimitWindow:
+    limit: int
+    remaining: int  # Negative while requests are queued for a later window
+    reset: float  # Epoch seconds
+
+    @classmethod
+    def from_headers(cls, headers) -> 'RateLimitWindow':
+        """
+        Creates a RateLimitWindow from x-rate-limit-* response headers
+
+        Args:
+            headers: Case-insensitive response headers
+
+        Returns:
+            RateLimitWindow, or None if the response carries no rate limit headers
+        """
+        limit = headers.get('x-rate-limit-limit')
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+        if limit is None or remaining is None or reset is None:
+            return None
+        return cls(
+            limit=int(limit),
+            remaining=int(remaining),
+            reset=float(reset)
+        )
+
+
+class RateLimitScheduler:
+    """
+    Tracks rate limit windows per token and endpoint from response headers and
+    schedules requests so they are sent only when the window has room for them.
+
+    Thread safe; one scheduler can be shared by several clients and by the sync
+    and async clients at the same time.
+    """
+
+    def __init__(self, window_seconds: float = default_window_seconds):
+        self.__window_seconds__ = window_seconds
+        self.__windows__: dict[tuple[str, str], RateLimitWindow] = {}
+        self.__lock__ = threading.Lock()
+
+    def __roll__(self, window: RateLimitWindow, now: float) -> None:
+        # Start the windows that began since the last look, paying off queued requests first
+        while now >= window.reset:
+            window.reset += self.__window_seconds__
+            window.remaining = min(window.remaining + window.limit, window.limit)
+
+    def window(self, token: str, endpoint: str) -> RateLimitWindow | None:
+        with self.__lock__:
+            window = self.__windows__.get((token, endpoint))
+            if window is None:
+                return None
+            self.__roll__(window, time.time())
+            return RateLimitWindow(window.limit, window.remaining, window.reset)
+
+    def reserve(self, token: str, endpoint: str) -> float:
+        """
+        Reserves a slot for one request
+
+        Args:
+            token: Token key, see token_key
+            endpoint: Endpoint key, see endpoint_key
+
+        Returns:
+            Seconds to wait before sending the request, 0 if it can be sent now
+        """
+        with self.__lock__:
+            window = self.__windows__.get((token, endpoint))
+            if window is None:
+                # Nothing known yet, the first response will tell us the limits
+                return 0.0
+            now = time.time()
+            self.__roll__(window, now)
+            window.remaining -= 1
+            if window.remaining >= 0:
+                return 0.0
+            # Queued requests fill upcoming windows in order
+            queued = -window.remaining
+            windows_ahead = (queued - 1) // max(window.limit, 1)
+            return window.reset - now + windows_ahead * self.__window_seconds__
+
+    def release(self, token: str, endpoint: str) -> None:
+        """Gives back a slot taken by reserve for a request that will not be sent"""
+        with self.__lock__:
+            window = self.__windows__.get((token, endpoint))
+            if window is not None:
+                window.remaining = min(window.remaining + 1, window.limit)
+
+    def update(self, token: str, endpoint: str, headers) -> None:
+        """
+        Updates the window of an endpoint from the headers of a response
+
+        Args:
+            token: Token key, see token_key
+            endpoint: Endpoint key, see endpoint_key
+            headers: Case-insensitive response headers
+        """
+        observed = RateLimitWindow.from_headers(headers)
+        if observed is None:
+            return
+        with self.__lock__:
+            window = self.__windows__.get((token, endpoint))
+            if window is None:
+                self.__windows__[(token, endpoint)] = observed
+                return
+            now = time.time()
+            if observed.reset <= now:
+                # Response from a window that has already ended
+                return
+            self.__roll__(window, now)
+            window.limit = observed.limit
+            window.reset = observed.reset
+            # Keep slots reserved by requests that are still in flight or queued
+            window.remaining = min(window.remaining, observed.remaining)
+
+    def wait(self, token: str, endpoint: str) -> None:
+        """Blocks until a request to the endpoint may be sent"""
+        delay = self.reserve(token, endpoint)
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,91 @@
+import time
+import unittest
+from ratelimit import RateLimitScheduler, RateLimitWindow, endpoint_key, token_key
+
+class TestRateLimit(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = RateLimitScheduler(window_seconds=900)
+        self.endpoint = endpoint_key('https://api.x.com/2/tweets')
+
+    def headers(self, limit: int, remaining: int, reset: float) -> dict:
+        return {
+            'x-rate-limit-limit': str(limit),
+            'x-rate-limit-remaining': str(remaining),
+            'x-rate-limit-reset': str(int(reset))
+        }
+
+    def test_endpoint_key(self):
+        self.assertEqual(endpoint_key('https://api.x.com/2/users/2244994945/tweets?max_results=10'), '2/users/:id/tweets')
+        self.assertEqual(endpoint_key('/2/tweets/search/recent'), '2/tweets/search/recent')
+        self.assertEqual(endpoint_key('https://api.x.com/2/tweets?ids=1,2'), '2/tweets')
+
+    def test_token_key(self):
+        self.assertEqual(token_key('secret'), token_key('secret'))
+        self.assertNotEqual(token_key('secret'), token_key('other'))
+        self.assertNotIn('secret', token_key('secret'))
+        self.assertEqual(len(token_key('secret')), 16)
+
+    def test_window_from_headers(self):
+        window = RateLimitWindow.from_headers(self.headers(300, 299, 1700000000))
+        self.assertEqual(window, RateLimitWindow(limit=300, remaining=299, reset=1700000000.0))
+        # Every header is needed
+        self.assertIsNone(RateLimitWindow.from_headers({'x-rate-limit-limit': '300', 'x-rate-limit-remaining': '299'}))
+        self.assertIsNone(RateLimitWindow.from_headers({}))
+
+    def test_unknown_endpoint_is_not_delayed(self):
+        for _ in range(10):
+            self.assertEqual(self.scheduler.reserve('token', self.endpoint), 0.0)
+        self.assertIsNone(self.scheduler.window('token', self.endpoint))
+
+    def test_exhausted_window_delays_until_reset(self):
+        reset = time.time() + 60
+        self.scheduler.update('token', self.endpoint, self.headers(2, 1, reset))
+        self.assertEqual(self.scheduler.reserve('token', self.endpoint), 0.0)
+        delay = self.scheduler.reserve('token', self.endpoint)
+        self.assertAlmostEqual(delay, reset - time.time(), delta=1)
+        # Requests queued beyond the next window wait for the one after
+        self.scheduler.reserve('token', self.endpoint)
+        delay = self.scheduler.reserve('token', self.endpoint)
+        self.assertAlmostEqual(delay, reset - time.time() + 900, delta=1)
+
+    def test_release_gives_back_a_slot(self):
+        self.scheduler.update('token', self.endpoint, self.headers(1, 0, time.time() + 60))
+        self.assertGreater(self.scheduler.reserve('token', self.endpoint), 0)
+        self.scheduler.release('token', self.endpoint)
+        self.assertEqual(self.scheduler.window('token', self.endpoint).remaining, 0)
+
+    def test_windows_are_per_token_and_endpoint(self):
+        reset = time.time() + 60
+        self.scheduler.update('token', self.endpoint, self.headers(1, 0, reset))
+        self.assertGreater(self.scheduler.reserve('token', self.endpoint), 0)
+        self.assertEqual(self.scheduler.reserve('other', self.endpoint), 0.0)
+        self.assertEqual(self.scheduler.reserve('token', endpoint_key('/2/users')), 0.0)
+
+    def test_window_rolls_over_after_reset(self):
+        self.scheduler.update('token', self.endpoint, self.headers(5, 0, time.time() - 1))
+        window = self.scheduler.window('token', self.endpoint)
+        self.assertEqual(window.remaining, 5)
+        self.assertGreater(window.reset, time.time())
+        self.assertEqual(self.scheduler.reserve('token', self.endpoint), 0.0)
+
+    def test_update_keeps_reserved_slots(self):
+        reset = time.time() + 60
+        self.scheduler.update('token', self.endpoint, self.headers(10, 10, reset))
+        for _ in range(3):
+            self.scheduler.reserve('token', self.endpoint)
+        # A response sent before the reservations still reports 9 remaining
+        self.scheduler.update('token', self.endpoint, self.headers(10, 9, reset))
+        self.assertEqual(self.scheduler.window('token', self.endpoint).remaining, 7)
+        # The server counting fewer remaining wins
+        self.scheduler.update('token', self.endpoint, self.headers(10, 2, reset))
+        self.assertEqual(self.scheduler.window('token', self.endpoint).remaining, 2)
+
+    def test_update_ignores_ended_windows_and_missing_headers(self):
+        reset = time.time() + 60
+        self.scheduler.update('token', self.endpoint, self.headers(10, 8, reset))
+        self.scheduler.update('token', self.endpoint, self.headers(10, 0, time.time() - 5))
+        self.scheduler.update('token', self.endpoint, {})
+        self.assertEqual(self.scheduler.window('token', self.endpoint).remaining, 8)
+
+if __name__ == '__main__':
+    unittest.main()
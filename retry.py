@@ -0,0 +1,120 @@
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+
+def default_status_retries() -> dict[int, int]:
+    return {
+        429: 3,  # Rate limited, the scheduler waits for the window reset
+        500: 3,
+        502: 5,
+        503: 5,
+        504: 5
+    }
+
+
+def retry_after(headers) -> float | None:
+    """
+    Reads the Retry-After header of a response
+
+    Args:
+        headers: Case-insensitive response headers, None when there was no response
+
+    Returns:
+        Seconds the server asks to wait, None if it doesn't say
+    """
+    value = headers.get('retry-after') if headers is not None else None
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    # The other form is an HTTP date
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    # Maximum number of retries per HTTP status; other statuses fail immediately
+    status_retries: dict[int, int] = field(default_factory=default_status_retries)
+    # Maximum number of retries after connection errors and timeouts
+    network_retries: int = 3
+    # Exponential backoff: base_delay * multiplier ** retry, capped at max_delay
+    base_delay: float = 0.5
+    multiplier: float = 2.0
+    max_delay: float = 60.0
+    # Fraction of each delay that is randomized, 1.0 is "full jitter"
+    jitter: float = 1.0
+    # Total seconds a call may take including every wait, None for no limit
+    deadline: float | None = None
+
+    def max_retries(self, status_code: int | None) -> int:
+        """Returns the retry limit for a status, None meaning a network error"""
+        if status_code is None:
+            return self.network_retries
+        return self.status_retries.get(status_code, 0)
+
+    def backoff(self, retry: int) -> float:
+        """Returns the delay before the given retry (0 based) with jitter applied"""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** retry)
+        return delay * (1 - self.jitter * random.random())
+
+    def budget(self) -> 'RetryBudget':
+        return RetryBudget(self)
+
+
+class RetryBudget:
+    """Retry bookkeeping for a single call: retries used and the call deadline"""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.retries = 0
+        self.deadline = None if policy.deadline is None else time.monotonic() + policy.deadline
+
+    def allows(self, delay: float) -> bool:
+        """Returns whether waiting delay seconds still leaves the call within its deadline"""
+        return self.deadline is None or time.monotonic() + delay <= self.deadline
+
+    def timeout(self, timeout: float | None) -> float | None:
+        """
+        Returns the timeout of the next attempt, cut short so the attempt ends by the deadline
+
+        Args:
+            timeout: Timeout the client was configured with, None for no limit
+
+        Raises:
+            TimeoutError: The deadline has already passed
+        """
+        if self.deadline is None:
+            return timeout
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Call deadline passed")
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def next_delay(self, status_code: int | None, headers=None) -> float | None:
+        """
+        Decides whether a failed attempt is retried
+
+        Args:
+            status_code: HTTP status of the failed attempt, None for a network error
+            headers: Response headers of the failed attempt; a Retry-After header
+                sets the shortest delay
+
+        Returns:
+            Seconds to wait before retrying, or None if the call should give up
+        """
+        if self.retries >= self.policy.max_retries(status_code):
+            return None
+        delay = self.policy.backoff(self.retries)
+        server_delay = retry_after(headers)
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+        if not self.allows(delay):
+            return None
+        self.retries += 1
+        return delay
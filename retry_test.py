@@ -0,0 +1,78 @@
+import time
+import unittest
+from email.utils import formatdate
+from retry import RetryBudget, RetryPolicy, retry_after
+
+class TestRetry(unittest.TestCase):
+    def test_backoff_without_jitter(self):
+        policy = RetryPolicy(base_delay=0.5, multiplier=2.0, max_delay=3.0, jitter=0.0)
+        self.assertEqual([policy.backoff(retry) for retry in range(5)], [0.5, 1.0, 2.0, 3.0, 3.0])
+
+    def test_backoff_bounds_with_jitter(self):
+        policy = RetryPolicy(base_delay=1.0, multiplier=2.0, max_delay=10.0, jitter=0.5)
+        for retry in range(8):
+            ceiling = min(10.0, 2.0 ** retry)
+            for _ in range(50):
+                delay = policy.backoff(retry)
+                self.assertGreaterEqual(delay, ceiling * 0.5)
+                self.assertLessEqual(delay, ceiling)
+        full_jitter = RetryPolicy(base_delay=1.0, max_delay=10.0)
+        for _ in range(50):
+            self.assertTrue(0 <= full_jitter.backoff(3) <= 8.0)
+
+    def test_retry_limits(self):
+        budget = RetryBudget(RetryPolicy(status_retries={503: 2}, network_retries=1, base_delay=0.0))
+        self.assertEqual(budget.next_delay(503), 0.0)
+        self.assertEqual(budget.next_delay(503), 0.0)
+        self.assertIsNone(budget.next_delay(503))
+        # Statuses without retries fail at once
+        self.assertIsNone(RetryBudget(RetryPolicy()).next_delay(400))
+        self.assertEqual(RetryBudget(RetryPolicy(network_retries=1, base_delay=0.0)).next_delay(None), 0.0)
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after({'retry-after': '120'}), 120.0)
+        later = retry_after({'retry-after': formatdate(time.time() + 30, usegmt=True)})
+        self.assertAlmostEqual(later, 30, delta=2)
+        # Dates in the past mean retry now
+        self.assertEqual(retry_after({'retry-after': formatdate(time.time() - 30, usegmt=True)}), 0.0)
+        self.assertIsNone(retry_after({'retry-after': 'soon'}))
+        self.assertIsNone(retry_after({}))
+        self.assertIsNone(retry_after(None))
+
+    def test_retry_after_sets_the_shortest_delay(self):
+        policy = RetryPolicy(base_delay=0.5, jitter=0.0)
+        self.assertEqual(RetryBudget(policy).next_delay(503, {'retry-after': '7'}), 7.0)
+        # A shorter Retry-After doesn't cut the backoff
+        self.assertEqual(RetryBudget(policy).next_delay(503, {'retry-after': '0'}), 0.5)
+        self.assertEqual(RetryBudget(policy).next_delay(503, {}), 0.5)
+
+    def test_retry_after_past_the_deadline_gives_up(self):
+        budget = RetryBudget(RetryPolicy(deadline=5.0, jitter=0.0))
+        self.assertIsNone(budget.next_delay(503, {'retry-after': '60'}))
+
+    def test_deadline(self):
+        budget = RetryBudget(RetryPolicy(deadline=10.0, base_delay=20.0, jitter=0.0))
+        self.assertTrue(budget.allows(5.0))
+        self.assertFalse(budget.allows(15.0))
+        # The backoff would end after the deadline
+        self.assertIsNone(budget.next_delay(503))
+        self.assertTrue(RetryBudget(RetryPolicy()).allows(1e9))
+
+    def test_attempt_timeout_ends_by_the_deadline(self):
+        self.assertEqual(RetryBudget(RetryPolicy()).timeout(30), 30)
+        self.assertIsNone(RetryBudget(RetryPolicy()).timeout(None))
+        budget = RetryBudget(RetryPolicy(deadline=2.0))
+        self.assertLessEqual(budget.timeout(30), 2.0)
+        self.assertLessEqual(budget.timeout(None), 2.0)
+        self.assertEqual(budget.timeout(0.5), 0.5)
+
+    def test_expired_deadline(self):
+        budget = RetryBudget(RetryPolicy(deadline=1.0, base_delay=0.0))
+        budget.deadline = time.monotonic() - 1
+        self.assertFalse(budget.allows(0))
+        self.assertIsNone(budget.next_delay(503))
+        with self.assertRaises(TimeoutError):
+            budget.timeout(30)
+
+if __name__ == '__main__':
+    unittest.main()
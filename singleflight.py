@@ -0,0 +1,168 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the call,
+    callers arriving while it is in flight wait for its result instead of
+    starting their own. Thread safe.
+    """
+
+    def __init__(self):
+        self.__calls__: dict[Hashable, Future] = {}
+        self.__lock__ = threading.Lock()
+        self.hits = 0  # Callers that joined a call already in flight
+        self.misses = 0  # Callers that had to start a call
+
+    def stats(self) -> dict[str, int]:
+        with self.__lock__:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'in_flight': len(self.__calls__)
+            }
+
+    def claim(self, keys: Iterable[Hashable]) -> tuple[dict[Hashable, Future], dict[Hashable, Future]]:
+        """
+        Claims keys for a call
+
+        Args:
+            keys: Distinct keys the caller needs
+
+        Returns:
+            Futures the caller now leads and must settle with resolve, and
+            futures of keys already in flight that the caller can wait on
+        """
+        leading: dict[Hashable, Future] = {}
+        joined: dict[Hashable, Future] = {}
+        with self.__lock__:
+            for key in keys:
+                future = self.__calls__.get(key)
+                if future is None:
+                    future = Future()
+                    self.__calls__[key] = future
+                    leading[key] = future
+                    self.misses += 1
+                else:
+                    joined[key] = future
+                    self.hits += 1
+        return leading, joined
+
+    def resolve(self, futures: dict[Hashable, Future], result=None, error: BaseException = None) -> None:
+        """Settles led futures with a result or an error and ends their flight"""
+        with self.__lock__:
+            for key in futures:
+                self.__calls__.pop(key, None)
+        for future in futures.values():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def do[T](self, key: Hashable, call: Callable[[], T]) -> T:
+        """Runs call, or waits for the identical call already in flight and returns its result"""
+        leading, joined = self.claim([key])
+        if joined:
+            return joined[key].result()
+        try:
+            result = call()
+        except BaseException as error:
+            self.resolve(leading, error=error)
+            raise
+        self.resolve(leading, result)
+        return result
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines on one event loop: the first caller of a key
+    starts the call in its own task, callers arriving while it is in flight
+    await the same task
+
+    Every caller awaits the task through asyncio.shield, so a caller that is
+    cancelled, e.g. by a wait_for timeout, leaves the call running for the
+    others. The task itself is cancelled once no caller is waiting for it.
+    """
+
+    def __init__(self):
+        self.__calls__: dict[Hashable, asyncio.Future] = {}
+        self.__waiters__: dict[asyncio.Future, int] = {}
+        self.hits = 0  # Callers that joined a call already in flight
+        self.misses = 0  # Callers that had to start a call
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'in_flight': len(self.__calls__)
+        }
+
+    def claim[T](self, keys: Iterable[Hashable], call: Callable[[list[Hashable]], Awaitable[T]]) -> tuple[asyncio.Future | None, dict[Hashable, asyncio.Future]]:
+        """
+        Claims keys for a call
+
+        Args:
+            keys: Distinct keys the caller needs
+            call: Makes the call for the keys that aren't in flight yet
+
+        Returns:
+            Task running call for the keys the caller now leads, None if every
+            key was in flight, and tasks of keys already in flight. Await them
+            with wait.
+        """
+        leading: list[Hashable] = []
+        joined: dict[Hashable, asyncio.Future] = {}
+        for key in keys:
+            future = self.__calls__.get(key)
+            if future is None:
+                leading.append(key)
+                self.misses += 1
+            else:
+                joined[key] = future
+                self.hits += 1
+        if not leading:
+            return None, joined
+        task = asyncio.ensure_future(call(leading))
+        for key in leading:
+            self.__calls__[key] = task
+        task.add_done_callback(lambda _: self.__end__(task))
+        return task, joined
+
+    def __end__(self, task: asyncio.Future) -> None:
+        """Ends the flight of every key a task answers"""
+        for key in [key for key, future in self.__calls__.items() if future is task]:
+            del self.__calls__[key]
+
+    async def wait(self, futures: Iterable[asyncio.Future]) -> list:
+        """
+        Awaits tasks returned by claim
+
+        Args:
+            futures: Distinct tasks the caller needs the results of
+
+        Returns:
+            Their results, in order
+        """
+        futures = list(futures)
+        for future in futures:
+            self.__waiters__[future] = self.__waiters__.get(future, 0) + 1
+        try:
+            return await asyncio.gather(*map(asyncio.shield, futures))
+        finally:
+            for future in futures:
+                waiters = self.__waiters__.pop(future) - 1
+                if waiters:
+                    self.__waiters__[future] = waiters
+                elif not future.done():
+                    # Nobody needs the call anymore; new callers start their own
+                    self.__end__(future)
+                    future.cancel()
+
+    async def do[T](self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Awaits call, or the identical call already in flight, and returns its result"""
+        task, joined = self.claim([key], lambda keys: call())
+        result, = await self.wait([task or joined[key]])
+        return result
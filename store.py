@@ -0,0 +1,159 @@
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+
+import json_backend
+
+
+# Seconds a stored object stays fresh, by requested field. An object lives as
+# long as the shortest TTL of the fields it was requested with.
+default_ttls: dict[str, float] = {
+    # Counters change with every like, view and follow
+    'public_metrics': 5 * 60,
+    'non_public_metrics': 5 * 60,
+    'organic_metrics': 5 * 60,
+    'promoted_metrics': 5 * 60,
+    # Tweets can be edited for an hour after they're posted
+    'edit_controls': 60 * 60,
+    # Profiles are edited now and then
+    'description': 24 * 60 * 60,
+    'location': 24 * 60 * 60,
+    'pinned_tweet_id': 24 * 60 * 60,
+    'profile_image_url': 24 * 60 * 60,
+    'protected': 24 * 60 * 60,
+    'url': 24 * 60 * 60,
+    'verified': 24 * 60 * 60,
+    'withheld': 24 * 60 * 60,
+    'connection_status': 60 * 60
+}
+
+# Fields that aren't listed, including the defaults such as text, rarely change
+default_ttl = 30 * 24 * 60 * 60
+
+# SQLite's limit on ? parameters is 999 in older versions
+max_parameters = 900
+
+schema = """
+CREATE TABLE IF NOT EXISTS objects (
+    kind TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    id TEXT NOT NULL,
+    body BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (kind, spec, id)
+) WITHOUT ROWID
+"""
+
+
+class LookupStore:
+    """
+    Persistent read-through store of looked up objects, e.g. tweets and users, keyed by id
+
+    Objects are kept in a SQLite database in WAL mode, so any number of
+    processes can read it while one writes. Each object is stored with the
+    fields it was requested with, and is served again only to lookups asking
+    for the same fields until the shortest TTL of those fields has passed.
+    Thread safe, each thread uses its own connection.
+    """
+
+    def __init__(self, path: str, ttls: dict[str, float] = None, ttl: float = default_ttl, busy_timeout: float = 5.0):
+        """
+        Args:
+            path: SQLite database file, created if missing
+            ttls: Seconds objects requested with a field stay fresh, by field name,
+                merged over default_ttls
+            ttl: Seconds for fields without a TTL of their own
+            busy_timeout: Seconds to wait for another process's write to finish
+        """
+        self.path = path
+        self.ttls = {**default_ttls, **(ttls or {})}
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout
+        self.hits = 0
+        self.misses = 0
+        self.__local__ = threading.local()
+        self.__lock__ = threading.Lock()
+        connection = self.__connection__()
+        # WAL lets readers in other processes go on while a batch is written
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(schema)
+        connection.commit()
+
+    def __connection__(self) -> sqlite3.Connection:
+        connection = getattr(self.__local__, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout)
+            # With WAL, NORMAL only syncs at checkpoints and stays safe from corruption
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.__local__.connection = connection
+        return connection
+
+    def lifetime(self, fields: Iterable[str]) -> float:
+        """Returns the seconds an object requested with fields stays fresh"""
+        return min((self.ttls.get(field, self.ttl) for field in fields), default=self.ttl)
+
+    def get(self, kind: str, fields: Iterable[str], ids: list[str]) -> dict[str, dict]:
+        """
+        Returns the fresh stored objects among ids
+
+        Args:
+            kind: Lookup endpoint the objects come from, e.g. "tweets" or "users"
+            fields: Fields the lookup requests for these objects
+            ids: Ids to look for
+
+        Returns:
+            JSON objects by id; ids missing or stale aren't included
+        """
+        spec = ','.join(sorted(fields))
+        now = time.time()
+        connection = self.__connection__()
+        found: dict[str, dict] = {}
+        for start in range(0, len(ids), max_parameters):
+            chunk = ids[start:start + max_parameters]
+            rows = connection.execute(
+                f"SELECT id, body FROM objects WHERE kind = ? AND spec = ? AND expires_at > ? AND id IN ({','.join('?' * len(chunk))})",
+                (kind, spec, now, *chunk)
+            )
+            for id, body in rows:
+                found[id] = json_backend.loads(body)
+        with self.__lock__:
+            self.hits += len(found)
+            self.misses += len(ids) - len(found)
+        return found
+
+    def put(self, kind: str, fields: Iterable[str], items: list[dict]) -> None:
+        """
+        Stores objects returned by a lookup, all in one transaction
+
+        Args:
+            kind: Lookup endpoint the objects come from
+            fields: Fields the lookup requested
+            items: JSON objects of the response's data
+        """
+        if not items:
+            return
+        fields = list(fields)
+        spec = ','.join(sorted(fields))
+        expires_at = time.time() + self.lifetime(fields)
+        rows = [(kind, spec, item['id'], json_backend.dumps(item), expires_at) for item in items]
+        connection = self.__connection__()
+        with connection:
+            connection.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?)", rows)
+
+    def purge(self) -> int:
+        """Deletes the objects that are no longer fresh and returns how many were deleted"""
+        connection = self.__connection__()
+        with connection:
+            return connection.execute("DELETE FROM objects WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def stats(self) -> dict[str, int]:
+        with self.__lock__:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        """Closes the calling thread's connection"""
+        connection = getattr(self.__local__, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.__local__.connection = None
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import json_backend
+import store
+from async_client import AsyncClient
+from fake_api import FakeApi, new_client, tweet
+from objects.fields import Field, TweetField
+from store import LookupStore
+
+class TestLookupStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = LookupStore(os.path.join(self.directory.name, 'objects.db'))
+        self.now = 1_700_000_000.0
+        patcher = mock.patch.object(store.time, 'time', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        self.store.put('tweets', ['lang'], [tweet('1', lang='en'), tweet('2', lang='ja')])
+        found = self.store.get('tweets', ['lang'], ['1', '2', '3'])
+        self.assertEqual(found, {'1': tweet('1', lang='en'), '2': tweet('2', lang='ja')})
+        # Objects are only served to lookups asking for the same fields
+        self.assertEqual(self.store.get('tweets', ['lang', 'public_metrics'], ['1']), {})
+        self.assertEqual(self.store.get('users', ['lang'], ['1']), {})
+
+    def test_backends(self):
+        for name in json_backend.backends:
+            with self.subTest(name), mock.patch.object(json_backend, 'dumps', json_backend.encoders[name]):
+                self.store.put('tweets', [], [tweet('1', note='café')])
+                self.assertEqual(self.store.get('tweets', [], ['1'])['1']['note'], 'café')
+
+    def test_expiry_by_field_ttl(self):
+        self.assertEqual(self.store.lifetime(['lang']), store.default_ttl)
+        self.assertEqual(self.store.lifetime(['lang', 'public_metrics']), 5 * 60)
+        self.store.put('tweets', ['lang'], [tweet('1', lang='en')])
+        self.store.put('tweets', ['lang', 'public_metrics'], [tweet('1', lang='en', public_metrics={'like_count': 1})])
+        self.now += 5 * 60 + 1
+        # The metrics went stale, the language didn't
+        self.assertEqual(self.store.get('tweets', ['lang', 'public_metrics'], ['1']), {})
+        self.assertEqual(list(self.store.get('tweets', ['lang'], ['1'])), ['1'])
+        self.assertEqual(self.store.purge(), 1)
+        self.now += store.default_ttl
+        self.assertEqual(self.store.get('tweets', ['lang'], ['1']), {})
+
+    def test_custom_ttls(self):
+        custom = LookupStore(os.path.join(self.directory.name, 'custom.db'), ttls={'lang': 10}, ttl=60)
+        self.assertEqual(custom.lifetime(['lang', 'source']), 10)
+        self.assertEqual(custom.lifetime(['source']), 60)
+        self.assertEqual(custom.lifetime([]), 60)
+        custom.close()
+
+    def test_stats(self):
+        self.store.put('tweets', [], [tweet('1')])
+        self.store.get('tweets', [], ['1', '2'])
+        self.store.get('tweets', [], ['1'])
+        self.assertEqual(self.store.stats(), {'hits': 2, 'misses': 1})
+
+class TestClientStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = LookupStore(os.path.join(self.directory.name, 'objects.db'))
+        self.api = FakeApi(item=lambda path, item_id, query: tweet(item_id, lang='en'))
+        self.client = new_client(api=self.api, store=self.store)
+
+    def tearDown(self):
+        self.client.close()
+        self.store.close()
+        self.directory.cleanup()
+
+    @property
+    def sent(self) -> list[str]:
+        return self.api.urls
+
+    def test_only_missing_ids_reach_the_api(self):
+        fields = {Field.TWEET: [TweetField.LANG]}
+        self.client.lookup_tweets(['1', '2'], fields)
+        response = self.client.lookup_tweets(['3', '2', '1', '3'], fields)
+        self.assertEqual(self.sent, [
+            'https://api.x.com/2/tweets?ids=1,2&tweet.fields=lang',
+            'https://api.x.com/2/tweets?ids=3&tweet.fields=lang'
+        ])
+        self.assertEqual([item.id for item in response.data], ['3', '2', '1'])
+        self.assertEqual(response.data[1].lang, 'en')
+        # Other fields aren't served from the objects stored with lang
+        self.client.lookup_tweets(['1'])
+        self.assertEqual(self.sent[-1], 'https://api.x.com/2/tweets?ids=1')
+        self.assertEqual(self.store.stats(), {'hits': 2, 'misses': 4})
+
+class TestAsyncClientStore(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = LookupStore(os.path.join(self.directory.name, 'objects.db'))
+        self.api = FakeApi()
+        self.client = new_client(AsyncClient, self.api, store=self.store)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.store.close()
+        self.directory.cleanup()
+
+    @property
+    def sent(self) -> list[str]:
+        return self.api.urls
+
+    async def test_only_missing_ids_reach_the_api(self):
+        await self.client.lookup_tweets(['1', 2, '1'])
+        response = await self.client.lookup_tweets([2, '3'])
+        self.assertEqual(self.sent, ['https://api.x.com/2/tweets?ids=1,2', 'https://api.x.com/2/tweets?ids=3'])
+        self.assertEqual([item.id for item in response.data], ['2', '3'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+
+import requests
+import json_backend
+from client import ApiError, Client, build_url
+from query import PreparedQuery, prepare
+from objects.decoders import field_decoder
+from objects.errors import Errors
+from objects.expansions import ArgExpansions
+from objects.fields import ArgFields
+from objects.resp_data import Includes, link_includes
+from objects.tweet import Tweet
+
+
+# Reconnect backoff documented for the filtered stream:
+# network errors back off linearly by 250ms up to 16s,
+# HTTP errors exponentially from 5s up to 320s,
+# 429 responses exponentially from 1 minute
+network_backoff_step = 0.25
+network_backoff_max = 16.0
+http_backoff_start = 5.0
+http_backoff_max = 320.0
+rate_limit_backoff_start = 60.0
+
+network_errors = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+# The API sends a keep-alive newline every 20 seconds, so a longer silence means a stalled connection
+connect_timeout = 10.0
+read_timeout = 30.0
+
+
+@dataclass
+class StreamEvent:
+    tweet: Tweet | None
+    includes: Includes | None = None
+    matching_rules: list[dict] | None = None
+    errors: list[Errors] | None = None
+    # Set, with the line as received, when the line couldn't be decoded
+    decode_error: Exception | None = None
+    line: bytes | None = None
+
+
+class FilteredStream:
+    """
+    Long-lived consumer of the filtered stream
+
+    A reader thread reads newline-delimited JSON from the connection as it
+    arrives, skips keep-alive heartbeats, decodes each line into a StreamEvent
+    and puts it into a bounded queue. When the queue is full the reader stops
+    reading, so a slow consumer slows the connection down instead of growing
+    memory. Dropped connections are reopened with the documented backoff.
+    Tweets and includes are decoded for the requested fields; a line that
+    can't be decoded becomes an event carrying decode_error instead of
+    ending the stream.
+    """
+
+    def __init__(self, client: Client, fields: ArgFields | PreparedQuery = None, expansions: ArgExpansions = None, *, path: str = "tweets/search/stream", queue_size: int = 1000, decode: Callable[[dict], Tweet] = None):
+        self.__client__ = client
+        self.__url__ = build_url(path, None, fields, expansions)
+        query = prepare(fields, expansions)
+        self.__fields__ = dict(query.fields)
+        self.__expansions__ = query.expansions
+        self.__decode__ = decode or field_decoder(Tweet, self.__fields__, expansions=self.__expansions__)
+        self.__events__: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.__stop__ = threading.Event()
+        self.__response__: requests.Response | None = None
+        self.__thread__: threading.Thread | None = None
+        self.__done__ = object()
+        self.reconnects = 0
+
+    def __enter__(self) -> 'FilteredStream':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def __iter__(self) -> Iterator[StreamEvent]:
+        while True:
+            event = self.__events__.get()
+            if event is self.__done__:
+                return
+            if isinstance(event, BaseException):
+                raise event
+            yield event
+
+    def start(self) -> None:
+        if self.__thread__ is not None:
+            return
+        self.__thread__ = threading.Thread(target=self.__run__, name="filtered stream", daemon=True)
+        self.__thread__.start()
+
+    def stop(self) -> None:
+        """Closes the connection and ends iteration once the queued events are consumed"""
+        self.__stop__.set()
+        response = self.__response__
+        if response is not None:
+            # Unblocks a reader waiting on the socket
+            response.close()
+
+    def __put__(self, event) -> bool:
+        while not self.__stop__.is_set():
+            try:
+                self.__events__.put(event, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __event__(self, line: bytes) -> StreamEvent:
+        try:
+            message = json_backend.loads(line)
+            errors = None
+            if 'errors' in message:
+                errors = [Errors.from_dict(error) for error in message['errors']]
+            tweet = self.__decode__(message['data']) if 'data' in message else None
+            includes = Includes.from_dict(message.get('includes'), fields=self.__fields__, expansions=self.__expansions__)
+        except Exception as error:
+            return StreamEvent(tweet=None, decode_error=error, line=line)
+        if includes is not None:
+            link_includes(tweet, includes)
+            link_includes(includes.tweets, includes)
+        return StreamEvent(
+            tweet=tweet,
+            includes=includes,
+            matching_rules=message.get('matching_rules'),
+            errors=errors
+        )
+
+    def __read__(self, response: requests.Response) -> None:
+        for line in response.iter_lines(chunk_size=None):
+            if self.__stop__.is_set():
+                return
+            if not line.strip():
+                # Keep-alive heartbeat
+                continue
+            if not self.__put__(self.__event__(line)):
+                return
+
+    def __run__(self) -> None:
+        network_delay = 0.0
+        http_delay = 0.0
+        try:
+            while not self.__stop__.is_set():
+                try:
+                    response = self.__client__.__open_stream__(self.__url__, (connect_timeout, read_timeout))
+                except network_errors:
+                    network_delay = min(network_delay + network_backoff_step, network_backoff_max)
+                    self.__wait__(network_delay)
+                    continue
+                self.__response__ = response
+                with response:
+                    status_code = response.status_code
+                    if status_code == 200:
+                        network_delay = 0.0
+                        http_delay = 0.0
+                        try:
+                            self.__read__(response)
+                        except network_errors:
+                            if self.__stop__.is_set():
+                                return
+                        # The connection ended: reconnect like after a network error
+                        network_delay = min(network_delay + network_backoff_step, network_backoff_max)
+                        self.__wait__(network_delay)
+                        continue
+                    if status_code == 429:
+                        http_delay = max(http_delay * 2, rate_limit_backoff_start)
+                    elif status_code >= 500:
+                        http_delay = min(max(http_delay * 2, http_backoff_start), http_backoff_max)
+                    else:
+                        # Authentication, missing rules (409) and other client errors won't fix themselves
+                        raise ApiError(status_code, response.headers)
+                self.__wait__(http_delay)
+        except BaseException as error:
+            self.__put__(error)
+        finally:
+            self.__response__ = None
+            self.__put_done__()
+
+    def __wait__(self, delay: float) -> None:
+        self.reconnects += 1
+        self.__stop__.wait(delay)
+
+    def __put_done__(self) -> None:
+        # The consumer may have stopped reading, so never block on the final marker
+        while True:
+            try:
+                self.__events__.put(self.__done__, timeout=0.1)
+                return
+            except queue.Full:
+                if self.__stop__.is_set():
+                    try:
+                        self.__events__.get_nowait()
+                    except queue.Empty:
+                        pass
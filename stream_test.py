@@ -0,0 +1,153 @@
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+import requests
+import stream
+from client import ApiError
+from objects.expansions import TweetPayloadExpansion
+from objects.fields import Field, TweetField, UserField
+from stream import FilteredStream
+
+def line(tweet_id: str, **fields) -> bytes:
+    return json.dumps({
+        'data': {'id': tweet_id, 'text': f'tweet {tweet_id}', 'edit_history_tweet_ids': [tweet_id], **fields},
+        'matching_rules': [{'id': '1', 'tag': 'python'}]
+    }).encode()
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, lines: list[bytes] = (), error: Exception = None):
+        self.status_code = status_code
+        self.headers = {}
+        self.lines = list(lines)
+        self.error = error
+        self.read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def iter_lines(self, chunk_size=None):
+        for item in self.lines:
+            self.read += 1
+            yield item
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        pass
+
+class FakeClient:
+    """Answers each connection with the next response, or raises it; idles once they run out"""
+
+    def __init__(self, responses: list):
+        self.responses = list(responses)
+        self.opened = 0
+
+    def __open_stream__(self, url: str, timeout: tuple[float, float]):
+        self.opened += 1
+        if not self.responses:
+            time.sleep(0.01)
+            return FakeResponse()
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+class TestFilteredStream(unittest.TestCase):
+    def setUp(self):
+        # Reconnect without the documented delays
+        for name in ('network_backoff_step', 'http_backoff_start', 'rate_limit_backoff_start'):
+            patcher = mock.patch.object(stream, name, 0.001)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def events(self, filtered: FilteredStream, count: int) -> list:
+        events = []
+        with filtered:
+            for event in filtered:
+                events.append(event)
+                if len(events) == count:
+                    break
+        return events
+
+    def test_default_fields(self):
+        includes = {'users': [{'id': '2244994945', 'name': 'X Developers', 'username': 'XDevelopers'}]}
+        message = json.loads(line('1', author_id='2244994945'))
+        message['includes'] = includes
+        client = FakeClient([FakeResponse(lines=[b'\r\n', json.dumps(message).encode()])])
+        fields = {Field.TWEET: [TweetField.AUTHOR_ID], Field.USER: [UserField.USERNAME]}
+        event, = self.events(FilteredStream(client, fields), 1)
+        self.assertEqual(event.tweet.id, '1')
+        self.assertIsNone(event.tweet.created_at)
+        self.assertEqual(event.tweet.author.username, 'XDevelopers')
+        self.assertEqual(event.matching_rules, [{'id': '1', 'tag': 'python'}])
+        self.assertIsNone(event.decode_error)
+
+    def test_expansions_only(self):
+        message = json.loads(line('1', author_id='2244994945', referenced_tweets=[{'type': 'quoted', 'id': '2'}]))
+        message['includes'] = {
+            'users': [{'id': '2244994945', 'name': 'X Developers', 'username': 'XDevelopers'}],
+            'tweets': [json.loads(line('2', author_id='2244994945'))['data']]
+        }
+        client = FakeClient([FakeResponse(lines=[json.dumps(message).encode()])])
+        expansions = [TweetPayloadExpansion.REFERENCED_TWEETS_AUTHOR_ID, TweetPayloadExpansion.AUTHOR_ID]
+        event, = self.events(FilteredStream(client, expansions=expansions), 1)
+        self.assertEqual(event.tweet.author.username, 'XDevelopers')
+        self.assertEqual(event.tweet.referenced_tweets[0].id, '2')
+        self.assertEqual(event.includes.tweets[0].author_id, '2244994945')
+
+    def test_decode_failures_become_events(self):
+        client = FakeClient([FakeResponse(lines=[line('1'), b'{"data": ', b'{"data": {"id": "2"}}', line('3')])])
+        events = self.events(FilteredStream(client), 4)
+        self.assertEqual([event.tweet.id if event.tweet else None for event in events], ['1', None, None, '3'])
+        self.assertIsInstance(events[1].decode_error, ValueError)
+        self.assertEqual(events[1].line, b'{"data": ')
+        # The tweet is missing text and edit_history_tweet_ids
+        self.assertIsInstance(events[2].decode_error, ValueError)
+        self.assertEqual(client.opened, 1)
+
+    def test_reconnect(self):
+        client = FakeClient([
+            FakeResponse(lines=[line('1')], error=requests.exceptions.ChunkedEncodingError()),
+            requests.ConnectionError(),
+            FakeResponse(503),
+            FakeResponse(429),
+            FakeResponse(lines=[line('2')])
+        ])
+        filtered = FilteredStream(client)
+        events = self.events(filtered, 2)
+        self.assertEqual([event.tweet.id for event in events], ['1', '2'])
+        self.assertGreaterEqual(client.opened, 5)
+        self.assertGreaterEqual(filtered.reconnects, 4)
+
+    def test_client_errors_end_the_stream(self):
+        filtered = FilteredStream(FakeClient([FakeResponse(lines=[line('1')]), FakeResponse(401)]))
+        with filtered:
+            iterator = iter(filtered)
+            self.assertEqual(next(iterator).tweet.id, '1')
+            with self.assertRaises(ApiError) as raised:
+                next(iterator)
+        self.assertEqual(raised.exception.status_code, 401)
+
+    def test_backpressure(self):
+        response = FakeResponse(lines=[line(str(item)) for item in range(20)])
+        filtered = FilteredStream(FakeClient([response]), queue_size=2)
+        with filtered:
+            time.sleep(0.3)
+            # The queue is full and the reader holds one more line, waiting for room
+            self.assertEqual(response.read, 3)
+            ids = [event.tweet.id for _, event in zip(range(20), filtered)]
+        self.assertEqual(ids, [str(item) for item in range(20)])
+
+    def test_stop_ends_iteration(self):
+        filtered = FilteredStream(FakeClient([]))
+        filtered.start()
+        threading.Timer(0.05, filtered.stop).start()
+        self.assertEqual(list(filtered), [])
+
+if __name__ == '__main__':
+    unittest.main()